@@ -0,0 +1,64 @@
+"""Компактное представление постов, комментариев и авторов в JSON."""
+
+
+def user_data(user, counters=None):
+    data = {
+        'username': user.username,
+        'full_name': user.get_full_name(),
+    }
+    if counters is not None:
+        data.update(
+            posts_count=counters.posts_count,
+            followers_count=counters.followers_count,
+            following_count=counters.following_count,
+        )
+    return data
+
+
+def group_data(group):
+    return {
+        'slug': group.slug,
+        'title': group.title,
+        'description': group.description,
+        'posts_count': group.posts_count,
+    }
+
+
+def post_data(post):
+    return {
+        'id': post.pk,
+        'text': post.text,
+        'pub_date': post.pub_date.isoformat(),
+        'author': post.author.username,
+        'group': post.group.slug if post.group_id else None,
+        'image': post.image.url if post.image else None,
+        'comments_count': post.comments_count,
+    }
+
+
+def comment_data(comment):
+    return {
+        'id': comment.pk,
+        'author': comment.author.username,
+        'text': comment.text,
+        'created': comment.created.isoformat(),
+    }
+
+
+def page_data(request, page, serializer):
+    """Страница выборки с адресами соседних страниц по курсору."""
+    return {
+        'results': [serializer(obj) for obj in page.object_list],
+        'next': _page_link(request, 'after', page.next_cursor),
+        'previous': _page_link(request, 'before', page.previous_cursor),
+    }
+
+
+def _page_link(request, name, cursor):
+    if cursor is None:
+        return None
+    params = request.GET.copy()
+    for key in ('after', 'before', 'page'):
+        params.pop(key, None)
+    params[name] = cursor
+    return request.build_absolute_uri(f'{request.path}?{params.urlencode()}')
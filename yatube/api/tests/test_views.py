@@ -0,0 +1,194 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.testing import QueryBudgetTestMixin
+from posts import constants, timeline
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+@override_settings(QUERY_BUDGET_STRICT=True)
+class ApiTest(QueryBudgetTestMixin, TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(
+            username='author', first_name='Лев', last_name='Толстой'
+        )
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        cls.posts = [
+            Post.objects.create(
+                author=cls.author, group=cls.group, text=f'Пост {i}'
+            )
+            for i in range(constants.COUNT_POSTS_PAGE + 2)
+        ]
+        cls.post = cls.posts[-1]
+        Comment.objects.create(
+            post=cls.post, author=cls.reader, text='Комментарий'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def test_endpoints_return_json(self):
+        """Адреса API отдают JSON с данными страниц."""
+        urls = {
+            reverse('api:index'): 'results',
+            reverse('api:group_list', kwargs={'slug': 'group'}): 'group',
+            reverse('api:profile', kwargs={'username': 'author'}): 'author',
+            reverse('api:post_detail', kwargs={'post_id': self.post.pk}):
+                'text',
+            reverse('api:comments', kwargs={'post_id': self.post.pk}):
+                'results',
+            reverse('api:follow_index'): 'results',
+        }
+        for url, key in urls.items():
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response['Content-Type'], 'application/json')
+                self.assertIn(key, response.json())
+
+    def test_post_serialized_compactly(self):
+        """Пост передается плоским словарем без вложенных объектов."""
+        data = self.client.get(
+            reverse('api:post_detail', kwargs={'post_id': self.post.pk})
+        ).json()
+        self.assertEqual(data['author'], 'author')
+        self.assertEqual(data['group'], 'group')
+        self.assertEqual(data['comments_count'], 1)
+        self.assertIsNone(data['image'])
+
+    def test_cursor_pagination(self):
+        """Лента листается курсором, как и HTML-страницы."""
+        first = self.client.get(reverse('api:index')).json()
+        self.assertEqual(
+            len(first['results']), constants.COUNT_POSTS_PAGE
+        )
+        self.assertIsNone(first['previous'])
+        self.assertIn('after=', first['next'])
+        second = self.client.get(first['next']).json()
+        self.assertEqual(
+            [post['id'] for post in second['results']],
+            [post.pk for post in reversed(self.posts[:2])]
+        )
+        self.assertIsNone(second['next'])
+        back = self.client.get(second['previous']).json()
+        self.assertEqual(back['results'], first['results'])
+
+    def test_not_modified(self):
+        """Без изменений повторный запрос получает 304 без тела."""
+        url = reverse('api:group_list', kwargs={'slug': 'group'})
+        response = self.client.get(url)
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+        again = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again.content, b'')
+        since = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        self.assertEqual(since.status_code, 304)
+
+    def test_etag_changes_with_data(self):
+        """Новый пост, правка и комментарий меняют ETag."""
+        url = reverse('api:index')
+        group = reverse('api:group_list', kwargs={'slug': 'group'})
+        profile = reverse('api:profile', kwargs={'username': 'author'})
+        follow = reverse('api:follow_index')
+        Follow.objects.create(user=self.reader, author=self.author)
+        detail = reverse('api:post_detail', kwargs={'post_id': self.post.pk})
+        comments = reverse('api:comments', kwargs={'post_id': self.post.pk})
+        changes = (
+            # число комментариев выводится в постах лент
+            (url, lambda: Comment.objects.create(
+                post=self.post, author=self.reader, text='В ленте'
+            )),
+            (group, lambda: Comment.objects.create(
+                post=self.post, author=self.reader, text='В группе'
+            )),
+            (profile, lambda: Comment.objects.filter(
+                text='В группе'
+            ).delete()),
+            (follow, lambda: Comment.objects.create(
+                post=self.post, author=self.reader, text='В подписках'
+            )),
+            (url, lambda: Post.objects.create(
+                author=self.author, text='Новый'
+            )),
+            (url, lambda: self.posts[0].save()),
+            (detail, lambda: Comment.objects.create(
+                post=self.post, author=self.reader, text='Еще'
+            )),
+            (comments, lambda: Comment.objects.create(
+                post=self.post, author=self.author, text='Ответ'
+            )),
+        )
+        for address, change in changes:
+            with self.subTest(url=address):
+                etag = self.client.get(address)['ETag']
+                change()
+                response = self.client.get(address, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response['ETag'], etag)
+
+    def test_follow_and_unfollow(self):
+        """Подписка и отписка меняют ленту подписок."""
+        follow = reverse('api:profile_follow', kwargs={'username': 'author'})
+        response = self.client.post(follow)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json(), {'following': True})
+        self.assertTrue(Follow.objects.filter(
+            user=self.reader, author=self.author
+        ).exists())
+        feed = self.client.get(reverse('api:follow_index')).json()
+        self.assertEqual(feed['results'][0]['id'], self.post.pk)
+        self.client.post(
+            reverse('api:profile_unfollow', kwargs={'username': 'author'})
+        )
+        self.assertFalse(Follow.objects.filter(
+            user=self.reader, author=self.author
+        ).exists())
+
+    def test_errors_in_json(self):
+        """Ошибки отдаются в JSON с подходящим статусом."""
+        missing = self.client.get(
+            reverse('api:post_detail', kwargs={'post_id': 10 ** 6})
+        )
+        self.assertEqual(missing.status_code, 404)
+        self.assertIn('detail', missing.json())
+        wrong_method = self.client.post(reverse('api:index'))
+        self.assertEqual(wrong_method.status_code, 405)
+        anonymous = Client().get(reverse('api:follow_index'))
+        self.assertEqual(anonymous.status_code, 401)
+
+    def test_query_budgets(self):
+        """Первые страницы укладываются в бюджет запросов без N+1."""
+        urls = (
+            reverse('api:index'),
+            reverse('api:group_list', kwargs={'slug': 'group'}),
+            reverse('api:profile', kwargs={'username': 'author'}),
+            reverse('api:post_detail', kwargs={'post_id': self.post.pk}),
+            reverse('api:comments', kwargs={'post_id': self.post.pk}),
+            reverse('api:follow_index'),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 200)
+        # подписка на автора, чьи посты подмешиваются при чтении
+        Follow.objects.create(user=self.reader, author=self.author)
+        timeline.read_at_view_time(self.author.pk)
+        with self.subTest(url='merged follow feed'):
+            response = self.client.get(reverse('api:follow_index'))
+            self.assertEqual(
+                len(response.json()['results']), constants.COUNT_POSTS_PAGE
+            )
@@ -0,0 +1,214 @@
+"""
+JSON API лент, профилей, постов, комментариев и подписок.
+
+Адреса повторяют ``posts.urls``, страницы листаются тем же курсором
+(``?after=``/``?before=``), что и HTML. Ответы на GET несут ETag и
+Last-Modified и при неизменных данных отдают 304 без тела.
+"""
+from functools import wraps
+
+from django.db.models import Max
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+
+from core.db.replicas import replica_reads
+from core.query_budget import query_budget
+from posts import constants, counters, timeline, views as posts_views
+from posts.conditional import (
+    conditional, feed_validators, make_etag, post_validators
+)
+from posts.models import Follow, Group, Post, User
+from posts.paginators import COMMENT_ORDERING, paginate
+
+from .serializers import (
+    comment_data, group_data, page_data, post_data, user_data
+)
+
+
+def api_view(*methods, login_required=False):
+    """Проверяет метод и вход и отдает ошибки в JSON."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            allowed = set(methods) | ({'HEAD'} if 'GET' in methods else set())
+            if request.method not in allowed:
+                response = JsonResponse(
+                    {'detail': 'Метод не поддерживается.'}, status=405
+                )
+                response['Allow'] = ', '.join(sorted(allowed))
+                return response
+            if login_required and not request.user.is_authenticated:
+                return JsonResponse(
+                    {'detail': 'Нужно войти.'}, status=401
+                )
+            try:
+                return view(request, *args, **kwargs)
+            except Http404:
+                return JsonResponse({'detail': 'Не найдено.'}, status=404)
+        return wrapper
+    return decorator
+
+
+# в JSON лент есть число комментариев, которого нет в HTML
+COMMENT_SCOPES = ('comments',)
+
+
+def index_validators(request):
+    return feed_validators(
+        Post.objects.all(),
+        posts_views.index_scopes(request) + COMMENT_SCOPES,
+    )
+
+
+@api_view('GET')
+@replica_reads
+@query_budget(6)
+@conditional(index_validators)
+def index(request):
+    page = paginate(
+        request, Post.objects.select_related('author', 'group'),
+        count_pages=False,
+    )
+    return JsonResponse(page_data(request, page, post_data))
+
+
+def group_validators(request, slug):
+    scopes = posts_views.group_scopes(request, slug)
+    if scopes is None:
+        return None
+    return feed_validators(
+        Post.objects.filter(group__slug=slug), scopes + COMMENT_SCOPES
+    )
+
+
+@api_view('GET')
+@replica_reads
+@query_budget(7)
+@conditional(group_validators)
+def group_posts(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    page = paginate(
+        request, group.posts.select_related('author', 'group'),
+        count_pages=False,
+    )
+    return JsonResponse({
+        'group': group_data(group),
+        **page_data(request, page, post_data),
+    })
+
+
+def profile_validators(request, username):
+    scopes = posts_views.profile_scopes(request, username)
+    if scopes is None:
+        return None
+    # признак подписки зависит от того, кто спрашивает
+    return feed_validators(
+        Post.objects.filter(author__username=username),
+        scopes + COMMENT_SCOPES, request.user.pk,
+    )
+
+
+@api_view('GET')
+@replica_reads
+@query_budget(9)
+@conditional(profile_validators)
+def profile(request, username):
+    author = get_object_or_404(User, username=username)
+    page = paginate(
+        request, author.posts.select_related('author', 'group'),
+        count_pages=False,
+    )
+    following = request.user.is_authenticated and Follow.objects.filter(
+        user=request.user, author=author
+    ).exists()
+    return JsonResponse({
+        'author': user_data(author, counters.for_user(author)),
+        'following': following,
+        **page_data(request, page, post_data),
+    })
+
+
+def post_detail_validators(request, post_id):
+    return post_validators(post_id)
+
+
+@api_view('GET')
+@replica_reads
+@query_budget(4)
+@conditional(post_detail_validators)
+def post_detail(request, post_id):
+    post = get_object_or_404(
+        Post.objects.select_related('author', 'group'), pk=post_id
+    )
+    return JsonResponse(post_data(post))
+
+
+def comments_validators(request, post_id):
+    found = Post.objects.filter(pk=post_id).annotate(
+        latest=Max('comments__created')
+    ).values_list('comments_count', 'latest').first()
+    if found is None:
+        return None
+    count, latest = found
+    return make_etag(post_id, count, latest), latest
+
+
+@api_view('GET')
+@query_budget(6)
+@conditional(comments_validators)
+def post_comments(request, post_id):
+    post = get_object_or_404(Post, pk=post_id)
+    page = paginate(
+        request,
+        post.comments.select_related('author'),
+        constants.COUNT_COMMENTS_PAGE,
+        COMMENT_ORDERING,
+        count_pages=False,
+    )
+    return JsonResponse(page_data(request, page, comment_data))
+
+
+def follow_validators(request):
+    return feed_validators(
+        posts_views.follow_feed(request),
+        posts_views.follow_scopes(request) + COMMENT_SCOPES,
+        request.user.pk,
+    )
+
+
+# с авторами в режиме чтения страница выбирается из двух выборок
+@api_view('GET', login_required=True)
+@replica_reads
+@query_budget(6)
+@conditional(follow_validators)
+def follow_index(request):
+    posts = posts_views.follow_feed(request).select_related(
+        'author', 'group'
+    )
+    page = paginate(
+        request, posts, ordering=timeline.FEED_ORDERING, count_pages=False
+    )
+    return JsonResponse(page_data(request, page, post_data))
+
+
+@api_view('POST', login_required=True)
+@query_budget(10)
+def profile_follow(request, username):
+    author = get_object_or_404(User, username=username)
+    created = False
+    if request.user != author:
+        _, created = Follow.objects.get_or_create(
+            user=request.user, author=author
+        )
+    return JsonResponse(
+        {'following': request.user != author},
+        status=201 if created else 200,
+    )
+
+
+@api_view('POST', login_required=True)
+@query_budget(8)
+def profile_unfollow(request, username):
+    author = get_object_or_404(User, username=username)
+    Follow.objects.filter(user=request.user, author=author).delete()
+    return JsonResponse({'following': False})
@@ -3,3 +3,8 @@ from django.apps import AppConfig
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from . import metrics
+        from .db import sqlite  # noqa: F401
+        metrics.install()
@@ -0,0 +1,130 @@
+"""Общие функции команд нагрузочных замеров."""
+import time
+import tracemalloc
+
+from django.core.cache import cache
+from django.template.backends.django import Template
+
+from .query_budget import QueryRecorder
+
+try:
+    from .jinja import Template as JinjaTemplate
+except ImportError:
+    # Jinja2 не установлен
+    TEMPLATES = (Template,)
+else:
+    TEMPLATES = (Template, JinjaTemplate)
+
+# на сколько может вырасти метрика без признания регрессии, кроме доли
+# порога: мелкие колебания времени и памяти - шум, а не регрессия
+TOLERANCE = {'queries': 0, 'wall_ms': 2, 'render_ms': 1, 'peak_kib': 64}
+
+# метрики, которые не должны расти совсем
+EXACT = ('queries',)
+
+# метрики, не зависящие от машины: только они попадают в общий эталон
+# из репозитория, время и память сравниваются с эталоном этой машины
+PORTABLE = ('queries',)
+
+
+def percentile(values, share):
+    """Значение, ниже которого лежит доля share отсортированной выборки."""
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+class RenderTimer:
+    """
+    Суммарное время отрисовки шаблонов внутри блока.
+
+    Считаются только внешние вызовы: шаблон карточки, отрисованный
+    внутри страницы, входит во время страницы.
+    """
+
+    def __init__(self):
+        self.seconds = 0
+        self.depth = 0
+
+    def __enter__(self):
+        self.originals = {cls: cls.render for cls in TEMPLATES}
+        for cls, original in self.originals.items():
+            cls.render = self._timed(original)
+        return self
+
+    def __exit__(self, *exc_info):
+        for cls, original in self.originals.items():
+            cls.render = original
+
+    def _timed(self, original):
+        def render(template, *args, **kwargs):
+            self.depth += 1
+            started = time.perf_counter()
+            try:
+                return original(template, *args, **kwargs)
+            finally:
+                self.depth -= 1
+                if not self.depth:
+                    self.seconds += time.perf_counter() - started
+        return render
+
+
+def measure(request, repeat):
+    """
+    Замеряет request() - запрос к приложению - с пустым кэшем.
+
+    Время ответа и отрисовки - наименьшие из repeat повторов: минимум
+    меньше медианы зависит от фоновой нагрузки машины. Пик памяти
+    снимается отдельным повтором: tracemalloc замедляет выполнение.
+    """
+    walls, renders = [], []
+    for _ in range(repeat):
+        cache.clear()
+        with QueryRecorder() as queries, RenderTimer() as renders_timer:
+            started = time.perf_counter()
+            request()
+            walls.append(time.perf_counter() - started)
+        renders.append(renders_timer.seconds)
+    cache.clear()
+    tracemalloc.start()
+    try:
+        request()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        'queries': len(queries),
+        'wall_ms': round(min(walls) * 1000, 2),
+        'render_ms': round(min(renders) * 1000, 2),
+        'peak_kib': round(peak / 1024),
+    }
+
+
+def portable(results):
+    """Результаты без метрик, зависящих от машины."""
+    return {
+        scenario: {
+            metric: value for metric, value in metrics.items()
+            if metric in PORTABLE
+        }
+        for scenario, metrics in results.items()
+    }
+
+
+def compare(baseline, current, threshold):
+    """
+    Описания регрессий current относительно baseline.
+
+    Оба словаря - ``{сценарий: {метрика: значение}}``; сценарии и
+    метрики, которых нет в baseline, не сравниваются.
+    """
+    problems = []
+    for scenario, metrics in current.items():
+        before = baseline.get(scenario, {})
+        for metric, value in metrics.items():
+            old = before.get(metric)
+            if old is None:
+                continue
+            limit = old if metric in EXACT else old * (1 + threshold)
+            if value > limit and value - old > TOLERANCE.get(metric, 0):
+                problems.append(f'{scenario}: {metric} {old} -> {value}')
+    return problems
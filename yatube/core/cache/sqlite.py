@@ -0,0 +1,258 @@
+"""
+Общий для процессов кэш в файле SQLite.
+
+В отличие от LocMemCache, один файл видят все рабочие процессы
+на машине, поэтому страница, отрисованная одним процессом, попадает
+в кэш для всех. Внешний сервис не нужен.
+
+Параметры OPTIONS:
+MAX_ENTRIES - предельное число записей
+MAX_SIZE - предельный суммарный размер значений, байт
+CULL_EVERY - через сколько записей процесс проверяет пределы.
+При превышении пределов вытесняются давно не читавшиеся записи (LRU).
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+# предел числа параметров в одном запросе SQLite
+MAX_VARIABLES = 500
+
+# время последнего чтения обновляется не чаще раза в столько секунд,
+# чтобы чтение горячих ключей не превращалось в запись
+ACCESS_RESOLUTION = 10
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS cache ('
+    ' key TEXT PRIMARY KEY,'
+    ' value BLOB NOT NULL,'
+    ' expires REAL,'
+    ' accessed REAL NOT NULL,'
+    ' size INTEGER NOT NULL'
+    ') WITHOUT ROWID',
+    'CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed)',
+)
+
+
+class SQLiteCache(BaseCache):
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._path = location
+        self._max_size = int(options.get('MAX_SIZE', 64 * 1024 * 1024))
+        self._cull_every = int(options.get('CULL_EVERY', 100))
+        self._local = threading.local()
+
+    @property
+    def _db(self):
+        # соединения не переживают fork: заводим свое в каждом процессе
+        pid = os.getpid()
+        if getattr(self._local, 'pid', None) != pid:
+            directory = os.path.dirname(self._path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            db = sqlite3.connect(
+                self._path, timeout=30, isolation_level=None,
+                check_same_thread=False,
+            )
+            self._enable_wal(db)
+            db.execute('PRAGMA synchronous=NORMAL')
+            for statement in SCHEMA:
+                db.execute(statement)
+            self._local.db = db
+            self._local.pid = pid
+            self._local.writes = 0
+        return self._local.db
+
+    @staticmethod
+    def _enable_wal(db):
+        # смена режима журнала не ждет busy_timeout, поэтому при
+        # одновременном старте процессов повторяем ее сами
+        for attempt in range(50):
+            try:
+                mode = db.execute('PRAGMA journal_mode').fetchone()[0]
+                if mode != 'wal':
+                    db.execute('PRAGMA journal_mode=WAL')
+                return
+            except sqlite3.OperationalError:
+                time.sleep(0.01 * (attempt + 1))
+        db.execute('PRAGMA journal_mode=WAL')
+
+    @contextmanager
+    def _transaction(self):
+        db = self._db
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            yield db
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+        db.execute('COMMIT')
+
+    def _expiry(self, timeout):
+        return self.get_backend_timeout(timeout)
+
+    def _key(self, key, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    def get(self, key, default=None, version=None):
+        return self.get_many([key], version=version).get(key, default)
+
+    def get_many(self, keys, version=None):
+        keys = {self._key(key, version): key for key in keys}
+        if not keys:
+            return {}
+        now = time.time()
+        db_keys = list(keys)
+        rows = []
+        for start in range(0, len(db_keys), MAX_VARIABLES):
+            chunk = db_keys[start:start + MAX_VARIABLES]
+            rows += self._db.execute(
+                'SELECT key, value, expires, accessed FROM cache '
+                'WHERE key IN (%s)' % ', '.join('?' * len(chunk)),
+                chunk,
+            ).fetchall()
+        found, expired, touched = {}, [], []
+        for db_key, value, expires, accessed in rows:
+            if expires is not None and expires <= now:
+                expired.append(db_key)
+                continue
+            found[keys[db_key]] = pickle.loads(value)
+            if accessed < now - ACCESS_RESOLUTION:
+                touched.append((now, db_key))
+        if expired:
+            self._delete_keys(expired)
+        if touched:
+            self._db.executemany(
+                'UPDATE cache SET accessed = ? WHERE key = ?', touched
+            )
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.set_many({key: value}, timeout=timeout, version=version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        expires = self._expiry(timeout)
+        now = time.time()
+        rows = []
+        for key, value in data.items():
+            value = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+            rows.append(
+                (self._key(key, version), value, expires, now, len(value))
+            )
+        with self._transaction() as db:
+            db.executemany(
+                'INSERT OR REPLACE INTO cache '
+                '(key, value, expires, accessed, size) '
+                'VALUES (?, ?, ?, ?, ?)',
+                rows,
+            )
+        self._wrote(len(rows))
+        return []
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        value = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        now = time.time()
+        with self._transaction() as db:
+            db.execute(
+                'DELETE FROM cache WHERE key = ? AND expires <= ?',
+                (key, now)
+            )
+            added = db.execute(
+                'INSERT OR IGNORE INTO cache '
+                '(key, value, expires, accessed, size) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (key, value, self._expiry(timeout), now, len(value)),
+            ).rowcount == 1
+        if added:
+            self._wrote(1)
+        return added
+
+    def incr(self, key, delta=1, version=None):
+        key = self._key(key, version)
+        with self._transaction() as db:
+            row = db.execute(
+                'SELECT value FROM cache WHERE key = ? '
+                'AND (expires IS NULL OR expires > ?)',
+                (key, time.time())
+            ).fetchone()
+            if row is None:
+                raise ValueError("Key '%s' not found" % key)
+            value = pickle.loads(row[0]) + delta
+            db.execute(
+                'UPDATE cache SET value = ? WHERE key = ?',
+                (pickle.dumps(value, pickle.HIGHEST_PROTOCOL), key)
+            )
+        return value
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self._db.execute(
+            'UPDATE cache SET expires = ? WHERE key = ? '
+            'AND (expires IS NULL OR expires > ?)',
+            (self._expiry(timeout), self._key(key, version), time.time())
+        ).rowcount == 1
+
+    def has_key(self, key, version=None):
+        return self._db.execute(
+            'SELECT 1 FROM cache WHERE key = ? '
+            'AND (expires IS NULL OR expires > ?)',
+            (self._key(key, version), time.time())
+        ).fetchone() is not None
+
+    def delete(self, key, version=None):
+        self._delete_keys([self._key(key, version)])
+
+    def delete_many(self, keys, version=None):
+        self._delete_keys([self._key(key, version) for key in keys])
+
+    def clear(self):
+        self._db.execute('DELETE FROM cache')
+
+    def close(self, **kwargs):
+        # соединение живет весь процесс, как и LocMemCache
+        pass
+
+    def _delete_keys(self, keys):
+        self._db.executemany(
+            'DELETE FROM cache WHERE key = ?', [(key,) for key in keys]
+        )
+
+    def _wrote(self, count):
+        self._local.writes += count
+        if self._local.writes >= self._cull_every:
+            self._local.writes = 0
+            self._cull()
+
+    def _cull(self):
+        """Удаляет истекшие записи и вытесняет давно не читавшиеся."""
+        db = self._db
+        db.execute(
+            'DELETE FROM cache WHERE expires <= ?', (time.time(),)
+        )
+        entries, size = db.execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache'
+        ).fetchone()
+        over_limit = entries > self._max_entries or size > self._max_size
+        if over_limit and self._cull_frequency == 0:
+            self.clear()
+            return
+        while entries > self._max_entries or size > self._max_size:
+            # как и встроенные бэкенды, освобождаем сразу долю записей
+            batch = max(1, entries // self._cull_frequency)
+            db.execute(
+                'DELETE FROM cache WHERE key IN ('
+                ' SELECT key FROM cache ORDER BY accessed LIMIT ?)',
+                (batch,)
+            )
+            entries, size = db.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache'
+            ).fetchone()
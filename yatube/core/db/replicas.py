@@ -0,0 +1,95 @@
+"""
+Чтение с реплик базы данных.
+
+View, помеченные ``@replica_reads``, читают с одной из баз
+``DATABASE_REPLICAS``; все записи и остальные view идут в ``default``.
+После запроса, который записал что-то в базу (в том числе GET, как
+подписка на автора), пользователь получает cookie и
+``REPLICA_STICKY_SECONDS`` секунд читает с основной базы, чтобы сразу
+видеть свои посты, комментарии и подписки, даже если реплика отстает.
+"""
+import random
+import re
+import threading
+
+from django.conf import settings
+from django.db import connections
+
+STICKY_COOKIE = 'read_primary'
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+WRITE = re.compile(r'^(?:INSERT INTO|UPDATE|DELETE FROM) "(\w+)"')
+
+# служебные записи, которых пользователь не видит: сессии и ключи
+# миниатюр, созданных при показе страницы
+UNTRACKED_TABLES = ('django_session', 'thumbnail_kvstore')
+
+_state = threading.local()
+
+
+def replica_reads(view):
+    """Разрешает view читать с реплик."""
+    view.replica_reads = True
+    return view
+
+
+def _track_write(execute, sql, params, many, context):
+    match = WRITE.match(sql)
+    if match and match.group(1) not in UNTRACKED_TABLES:
+        _state.wrote = True
+    return execute(sql, params, many, context)
+
+
+def reading_from_replica():
+    return getattr(_state, 'replica', False)
+
+
+class ReplicaRouter:
+    """Направляет чтение в реплики только внутри view с @replica_reads."""
+
+    def db_for_read(self, model, **hints):
+        if reading_from_replica() and settings.DATABASE_REPLICAS:
+            return random.choice(settings.DATABASE_REPLICAS)
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # реплики содержат те же данные, что и основная база
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # схема попадает в реплики вместе с данными
+        return db not in settings.DATABASE_REPLICAS
+
+
+class ReplicaMiddleware:
+    """Включает чтение с реплик и закрепляет пишущих за основной базой."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        _state.replica = False
+        _state.wrote = False
+        try:
+            with connections['default'].execute_wrapper(_track_write):
+                response = self.get_response(request)
+        finally:
+            _state.replica = False
+        if _state.wrote:
+            response.set_cookie(
+                STICKY_COOKIE, '1',
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True,
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        _state.replica = (
+            getattr(view_func, 'replica_reads', False)
+            and request.method in SAFE_METHODS
+            and STICKY_COOKIE not in request.COOKIES
+        )
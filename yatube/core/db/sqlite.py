@@ -0,0 +1,52 @@
+"""Настройка новых соединений с SQLite и копирование базы в реплику."""
+import sqlite3
+import time
+
+from django.conf import settings
+from django.db import OperationalError
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+@receiver(connection_created)
+def configure_connection(sender, connection, **kwargs):
+    """Выполняет SQLITE_PRAGMAS для нового соединения SQLite."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            if name == 'journal_mode':
+                _set_journal_mode(cursor, value)
+            else:
+                cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def _set_journal_mode(cursor, mode):
+    # режим журнала хранится в файле базы: меняем, только если он другой,
+    # и повторяем при одновременном старте процессов, потому что смена
+    # режима не ждет busy_timeout
+    for attempt in range(50):
+        try:
+            cursor.execute('PRAGMA journal_mode')
+            if cursor.fetchone()[0].lower() != mode.lower():
+                cursor.execute(f'PRAGMA journal_mode = {mode}')
+            return
+        except OperationalError:
+            time.sleep(0.01 * (attempt + 1))
+    cursor.execute(f'PRAGMA journal_mode = {mode}')
+
+
+def replicate(source, target):
+    """
+    Копирует файл базы source в target средствами backup API.
+
+    Копия согласована: писатели source не блокируются дольше шага
+    копирования, а читатели target видят либо старую, либо новую базу.
+    """
+    src = sqlite3.connect(source)
+    dst = sqlite3.connect(target)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
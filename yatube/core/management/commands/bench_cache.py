@@ -0,0 +1,93 @@
+import multiprocessing
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils.module_loading import import_string
+
+from core.benchmarks import percentile
+
+BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'sqlite': 'core.cache.sqlite.SQLiteCache',
+}
+
+
+def _worker(args):
+    backend, location, options = args
+    cache = import_string(BACKENDS[backend])(
+        location, {'TIMEOUT': None, 'OPTIONS': {'MAX_ENTRIES': 10 ** 6}}
+    )
+    rng = random.Random(os.getpid())
+    pages = range(options['pages'])
+    # популярность страниц лент распределена по закону Ципфа
+    weights = [1 / (rank + 1) ** options['skew'] for rank in pages]
+    payload = 'x' * options['page_size']
+    hits, latencies = 0, []
+    requests = options['requests'] // options['workers']
+    for key in rng.choices(pages, weights, k=requests):
+        started = time.perf_counter()
+        page = cache.get(f'page:{key}')
+        if page is None:
+            # промах: страницу приходится отрисовать заново
+            time.sleep(options['render_ms'] / 1000)
+            cache.set(f'page:{key}', payload)
+        else:
+            hits += 1
+        latencies.append(time.perf_counter() - started)
+    return hits, latencies
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает долю попаданий и задержку кэша страниц '
+        'у LocMemCache и SQLiteCache при разном числе процессов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, nargs='+', default=[1, 4, 16]
+        )
+        parser.add_argument(
+            '--backends', nargs='+', choices=BACKENDS, default=list(BACKENDS)
+        )
+        parser.add_argument(
+            '--requests', type=int, default=16000,
+            help='Всего запросов, делятся поровну между процессами.'
+        )
+        parser.add_argument('--pages', type=int, default=500)
+        parser.add_argument('--skew', type=float, default=1.1)
+        parser.add_argument('--page-size', type=int, default=20000)
+        parser.add_argument('--render-ms', type=float, default=5.0)
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f'{"backend":<8} {"workers":>7} {"hit rate":>9} '
+            f'{"p50, ms":>8} {"p99, ms":>8} {"req/s":>9}'
+        )
+        for backend in options['backends']:
+            for workers in options['workers']:
+                self.stdout.write(self.run(backend, workers, options))
+
+    def run(self, backend, workers, options):
+        with tempfile.TemporaryDirectory() as directory:
+            location = os.path.join(directory, 'cache.sqlite3')
+            started = time.perf_counter()
+            with multiprocessing.get_context('fork').Pool(workers) as pool:
+                results = pool.map(
+                    _worker,
+                    [(backend, location, {**options, 'workers': workers})]
+                    * workers
+                )
+            elapsed = time.perf_counter() - started
+        hits = sum(result[0] for result in results)
+        latencies = [value for result in results for value in result[1]]
+        return (
+            f'{backend:<8} {workers:>7} {hits / len(latencies):>9.1%} '
+            f'{statistics.median(latencies) * 1000:>8.2f} '
+            f'{percentile(latencies, 0.99) * 1000:>8.2f} '
+            f'{len(latencies) / elapsed:>9.0f}'
+        )
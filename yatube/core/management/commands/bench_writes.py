@@ -0,0 +1,134 @@
+import multiprocessing
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+from django.test import Client
+from django.urls import reverse
+
+from core.benchmarks import percentile
+
+User = get_user_model()
+
+# настройки соединения до и после тюнинга
+MODES = {
+    'baseline': {'CONN_MAX_AGE': 0, 'SQLITE_PRAGMAS': {}},
+    'tuned': {
+        'CONN_MAX_AGE': 60,
+        'SQLITE_PRAGMAS': settings.SQLITE_PRAGMAS,
+    },
+}
+
+
+def _worker(args):
+    username, post_id, requests = args
+    client = Client()
+    client.force_login(User.objects.get(username=username))
+    comment_url = reverse('posts:add_comment', kwargs={'post_id': post_id})
+    create_url = reverse('posts:post_create')
+    latencies, errors = [], 0
+    for number in range(requests):
+        # писатели чередуют новые посты и комментарии
+        url = comment_url if number % 2 else create_url
+        started = time.perf_counter()
+        # тестовый Client отключает close_old_connections от сигналов
+        # начала и конца запроса; без них соединение жило бы при любом
+        # CONN_MAX_AGE, поэтому закрываем его так же, как обработчик
+        close_old_connections()
+        try:
+            response = client.post(url, {'text': f'Запись {number}'})
+            errors += response.status_code != 302
+        except Exception:
+            # например, database is locked после busy_timeout
+            errors += 1
+        finally:
+            close_old_connections()
+        latencies.append(time.perf_counter() - started)
+    connection.close()
+    return latencies, errors
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность post_create и add_comment '
+        'при одновременных писателях с настройками SQLite по умолчанию '
+        'и с WAL, PRAGMA и постоянными соединениями. '
+        'Работает с временной копией схемы, рабочая база не меняется.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, nargs='+', default=[1, 4, 8]
+        )
+        parser.add_argument(
+            '--modes', nargs='+', choices=MODES, default=list(MODES)
+        )
+        parser.add_argument(
+            '--requests', type=int, default=400,
+            help='Всего запросов, делятся поровну между процессами.'
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            self.stderr.write('Замер рассчитан на SQLite.')
+            return
+        # без debug toolbar и записи всех SQL, как в боевом профиле
+        settings.DEBUG = False
+        directory = tempfile.mkdtemp()
+        try:
+            template = os.path.join(directory, 'template.sqlite3')
+            self.use_database(template, MODES['baseline'])
+            call_command('migrate', verbosity=0)
+            for number in range(max(options['workers'])):
+                User.objects.create_user(username=f'writer{number}')
+            post_id = self.create_post()
+            self.stdout.write(
+                f'{"mode":<9} {"workers":>7} {"req/s":>8} '
+                f'{"p50, ms":>8} {"p99, ms":>8} {"errors":>7}'
+            )
+            for mode in options['modes']:
+                for workers in options['workers']:
+                    path = os.path.join(directory, f'{mode}.sqlite3')
+                    shutil.copy(template, path)
+                    self.use_database(path, MODES[mode])
+                    self.stdout.write(
+                        self.run(mode, workers, post_id, options)
+                    )
+        finally:
+            connection.close()
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def use_database(self, path, mode):
+        connection.close()
+        connection.settings_dict['NAME'] = path
+        connection.settings_dict['CONN_MAX_AGE'] = mode['CONN_MAX_AGE']
+        settings.SQLITE_PRAGMAS = mode['SQLITE_PRAGMAS']
+
+    def create_post(self):
+        from posts.models import Post
+        author = User.objects.get(username='writer0')
+        return Post.objects.create(author=author, text='Обсуждение').pk
+
+    def run(self, mode, workers, post_id, options):
+        requests = options['requests'] // workers
+        jobs = [(f'writer{n}', post_id, requests) for n in range(workers)]
+        # соединение родителя не должно достаться дочерним процессам
+        connection.close()
+        started = time.perf_counter()
+        with multiprocessing.get_context('fork').Pool(workers) as pool:
+            results = pool.map(_worker, jobs)
+        elapsed = time.perf_counter() - started
+        latencies = [value for result in results for value in result[0]]
+        errors = sum(result[1] for result in results)
+        return (
+            f'{mode:<9} {workers:>7} {len(latencies) / elapsed:>8.0f} '
+            f'{statistics.median(latencies) * 1000:>8.2f} '
+            f'{percentile(latencies, 0.99) * 1000:>8.2f} {errors:>7}'
+        )
@@ -0,0 +1,207 @@
+import multiprocessing
+import random
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+from core.benchmarks import percentile
+from posts.models import Comment, Group, Post
+from posts.synthetic import Zipf
+
+User = get_user_model()
+
+# доля запросов к каждому адресу: чтение лент преобладает над записью
+ROUTES = {
+    'index': 25,
+    'group_list': 15,
+    'profile': 15,
+    'post_detail': 25,
+    'follow_index': 10,
+    'search': 4,
+    'post_create': 2,
+    'add_comment': 4,
+}
+
+WRITES = ('post_create', 'add_comment')
+
+# сколько самых популярных объектов каждого вида берется в цели
+TARGETS = 10000
+
+
+def _targets():
+    """Популярные сообщества, авторы и посты - по убыванию популярности."""
+    return {
+        'groups': list(Group.objects.order_by('-posts_count').values_list(
+            'slug', flat=True
+        )[:TARGETS]),
+        'authors': list(User.objects.order_by(
+            '-counters__followers_count'
+        ).values_list('username', flat=True)[:TARGETS]),
+        'posts': list(Post.objects.order_by('-comments_count').values_list(
+            'pk', flat=True
+        )[:TARGETS]),
+        'words': list(Comment.objects.order_by('-pk').values_list(
+            'text', flat=True
+        )[:100]),
+    }
+
+
+class Requester:
+    """Выбирает адрес и цель запроса, как это делали бы посетители."""
+
+    def __init__(self, targets, routes, exponent, seed):
+        self.targets = targets
+        self.rng = random.Random(seed)
+        self.names = list(routes)
+        self.weights = [routes[name] for name in self.names]
+        self.pick = {
+            kind: Zipf(len(values), exponent, self.rng)
+            for kind, values in targets.items() if values
+        }
+
+    def _target(self, kind):
+        return self.targets[kind][self.pick[kind]()]
+
+    def request(self, client):
+        """Выполняет один запрос, возвращает адрес и успех."""
+        name = self.rng.choices(self.names, self.weights)[0]
+        route = f'posts:{name}'
+        if name == 'group_list':
+            url = reverse(route, kwargs={'slug': self._target('groups')})
+        elif name == 'profile':
+            url = reverse(route, kwargs={'username': self._target('authors')})
+        elif name in ('post_detail', 'add_comment'):
+            url = reverse(route, kwargs={'post_id': self._target('posts')})
+        elif name == 'search':
+            words = self._target('words').split()
+            url = reverse(route) + f'?q={self.rng.choice(words)}'
+        else:
+            url = reverse(route)
+        if name in WRITES:
+            response = client.post(url, {'text': 'Нагрузочный тест'})
+            return name, response.status_code == 302
+        return name, client.get(url).status_code == 200
+
+
+def _worker(args):
+    usernames, targets, routes, options, seed = args
+    clients = []
+    for user in User.objects.filter(username__in=usernames):
+        client = Client()
+        client.force_login(user)
+        clients.append(client)
+    clients = clients or [Client()]
+    requester = Requester(targets, routes, options['exponent'], seed)
+    rng = random.Random(seed)
+    latencies, errors = defaultdict(list), defaultdict(int)
+    deadline = time.perf_counter() + options['duration']
+    for _ in range(options['requests']):
+        if time.perf_counter() > deadline:
+            break
+        started = time.perf_counter()
+        try:
+            name, ok = requester.request(rng.choice(clients))
+        except Exception:
+            name, ok = 'error', False
+        latencies[name].append(time.perf_counter() - started)
+        errors[name] += not ok
+    return dict(latencies), dict(errors)
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагружает адреса приложения posts из нескольких процессов '
+        'и выводит задержки p50/p95/p99 и пропускную способность '
+        'по каждому адресу. Запросы проходят через все middleware, '
+        'но без сети. Запросы на запись меняют базу.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument(
+            '--duration', type=float, default=30,
+            help='Наибольшая длительность, секунд.'
+        )
+        parser.add_argument(
+            '--requests', type=int, default=10 ** 9,
+            help='Наибольшее число запросов каждого процесса.'
+        )
+        parser.add_argument(
+            '--sessions', type=int, default=20,
+            help='Вошедших пользователей на процесс.'
+        )
+        parser.add_argument('--exponent', type=float, default=1.1)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--read-only', action='store_true',
+            help='Не создавать посты и комментарии.'
+        )
+
+    def handle(self, *args, **options):
+        targets = _targets()
+        if not targets['posts']:
+            raise CommandError('База пуста: сначала выполните generate_data.')
+        routes = {
+            name: weight for name, weight in ROUTES.items()
+            if not (options['read_only'] and name in WRITES)
+        }
+        if not targets['groups']:
+            routes.pop('group_list')
+        if not targets['words']:
+            routes.pop('search')
+        # без debug toolbar и записи всех SQL, как в боевом профиле
+        settings.DEBUG = False
+        users = list(User.objects.order_by('?').values_list(
+            'username', flat=True
+        )[:options['workers'] * options['sessions']])
+        jobs = [
+            (
+                users[number::options['workers']], targets, routes, options,
+                options['seed'] + number,
+            )
+            for number in range(options['workers'])
+        ]
+        started = time.perf_counter()
+        if options['workers'] == 1:
+            results = [_worker(jobs[0])]
+        else:
+            # соединение родителя не должно достаться дочерним процессам
+            connection.close()
+            with multiprocessing.get_context('fork').Pool(
+                options['workers']
+            ) as pool:
+                results = pool.map(_worker, jobs)
+        self.report(results, time.perf_counter() - started)
+
+    def report(self, results, elapsed):
+        latencies, errors = defaultdict(list), defaultdict(int)
+        for worker_latencies, worker_errors in results:
+            for name, values in worker_latencies.items():
+                latencies[name] += values
+            for name, count in worker_errors.items():
+                errors[name] += count
+        self.stdout.write(
+            f'{"route":<20} {"requests":>8} {"req/s":>8} {"p50, ms":>8} '
+            f'{"p95, ms":>8} {"p99, ms":>8} {"errors":>7}'
+        )
+        total = 0
+        for name in sorted(latencies):
+            values = latencies[name]
+            total += len(values)
+            self.stdout.write(
+                f'{name:<20} {len(values):>8} {len(values) / elapsed:>8.1f} '
+                f'{percentile(values, 0.5) * 1000:>8.2f} '
+                f'{percentile(values, 0.95) * 1000:>8.2f} '
+                f'{percentile(values, 0.99) * 1000:>8.2f} '
+                f'{errors[name]:>7}'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Всего {total} запросов за {elapsed:.1f} с, '
+            f'{total / elapsed:.1f} запросов/с'
+        ))
@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core import profiling
+
+
+class Command(BaseCommand):
+    help = (
+        'Выдает токен профилирования запросов: параметр _profile '
+        'или заголовок X-Profile с ним профилирует один запрос.'
+    )
+
+    def handle(self, *args, **options):
+        token = profiling.make_token()
+        self.stdout.write(token)
+        self.stderr.write(
+            f'Профилирует один запрос в течение '
+            f'{settings.PROFILER_TOKEN_MAX_AGE} с. Пример: '
+            f'curl -H "X-Profile: {token}" http://localhost:8000/follow/'
+        )
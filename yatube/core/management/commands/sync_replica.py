@@ -0,0 +1,37 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.db.sqlite import replicate
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу SQLite в реплики из DATABASE_REPLICAS - '
+        'заменяет репликацию при локальной проверке чтения с реплик.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help='Повторять копирование раз в столько секунд.'
+        )
+
+    def handle(self, *args, **options):
+        databases = [settings.DATABASES['default']] + [
+            settings.DATABASES[alias] for alias in settings.DATABASE_REPLICAS
+        ]
+        if any(db['ENGINE'] != 'django.db.backends.sqlite3'
+               for db in databases):
+            raise CommandError('Копирование поддерживается только для SQLite.')
+        source = databases[0]['NAME']
+        while True:
+            for replica in databases[1:]:
+                replicate(source, replica['NAME'])
+            self.stdout.write(self.style.SUCCESS(
+                f'Реплик обновлено: {len(databases) - 1}'
+            ))
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
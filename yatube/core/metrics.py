@@ -0,0 +1,252 @@
+"""
+Метрики запросов в текстовом формате Prometheus.
+
+``MetricsMiddleware`` записывает для каждого имени адреса
+(``posts:index``, ``posts:profile`` и т. д.) гистограмму времени ответа,
+число и время SQL-запросов и время отрисовки шаблонов. Кэши сообщают
+попадания и промахи через ``cache_outcome``, миниатюры - время создания
+через ``thumbnail_timer``; вне запроса (в фоновых потоках) имя адреса -
+``background``.
+
+Метрики хранятся в памяти процесса: каждый рабочий процесс отдает свои
+на ``/metrics/``, как prometheus_client без multiprocess-режима.
+Адрес отдает метрики по токену ``METRICS_TOKEN`` в заголовке
+``Authorization: Bearer`` или сотрудникам; адрес клиента не проверяется,
+так как за обратным прокси он всегда локальный. Запись - несколько
+вызовов ``perf_counter`` и сложений под блокировкой, поэтому middleware
+можно держать включенной всегда.
+"""
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
+from django.template.backends.django import Template
+
+# границы корзин гистограмм, секунд
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+BACKGROUND = 'background'
+UNMATCHED = 'unmatched'
+
+_state = threading.local()
+_lock = threading.Lock()
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('\n', r'\n').replace(
+        '"', r'\"'
+    )
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(
+        f'{name}="{_escape(value)}"' for name, value in labels
+    ) + '}'
+
+
+class Counter:
+    """Счетчик, который только растет."""
+
+    kind = 'counter'
+
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        self.series = {}
+
+    def inc(self, value=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with _lock:
+            self.series[key] = self.series.get(key, 0) + value
+
+    def samples(self):
+        for labels, value in sorted(self.series.items()):
+            yield f'{self.name}{_format_labels(labels)} {value}'
+
+
+class Histogram:
+    """Гистограмма с накопительными корзинами, суммой и числом."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, buckets=BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = buckets
+        self.series = {}
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with _lock:
+            counts = self.series.get(key)
+            if counts is None:
+                # корзины, +Inf, затем сумма и число наблюдений
+                counts = self.series[key] = [0] * (len(self.buckets) + 3)
+            for number, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[number] += 1
+                    break
+            else:
+                counts[len(self.buckets)] += 1
+            counts[-2] += value
+            counts[-1] += 1
+
+    def samples(self):
+        for labels, counts in sorted(self.series.items()):
+            total = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                total += count
+                bucket_labels = labels + (('le', bound),)
+                yield (
+                    f'{self.name}_bucket{_format_labels(bucket_labels)} '
+                    f'{total}'
+                )
+            yield f'{self.name}_sum{_format_labels(labels)} {counts[-2]}'
+            yield f'{self.name}_count{_format_labels(labels)} {counts[-1]}'
+
+
+REQUEST_SECONDS = Histogram(
+    'yatube_request_duration_seconds', 'Время ответа на запрос.'
+)
+REQUESTS = Counter('yatube_requests_total', 'Число ответов по кодам.')
+DB_QUERIES = Counter('yatube_db_queries_total', 'Число SQL-запросов.')
+DB_SECONDS = Counter(
+    'yatube_db_query_seconds_total', 'Суммарное время SQL-запросов.'
+)
+RENDER_SECONDS = Counter(
+    'yatube_template_render_seconds_total',
+    'Суммарное время отрисовки шаблонов.',
+)
+CACHE = Counter(
+    'yatube_cache_requests_total', 'Попадания и промахи кэшей.'
+)
+THUMBNAIL_SECONDS = Histogram(
+    'yatube_thumbnail_seconds', 'Время создания миниатюры.'
+)
+
+REGISTRY = (
+    REQUEST_SECONDS, REQUESTS, DB_QUERIES, DB_SECONDS, RENDER_SECONDS,
+    CACHE, THUMBNAIL_SECONDS,
+)
+
+
+def render():
+    """Все метрики в текстовом формате Prometheus."""
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f'# HELP {metric.name} {metric.documentation}')
+        lines.append(f'# TYPE {metric.name} {metric.kind}')
+        with _lock:
+            lines.extend(metric.samples())
+    return '\n'.join(lines) + '\n'
+
+
+def reset():
+    """Обнуляет все метрики процесса."""
+    with _lock:
+        for metric in REGISTRY:
+            metric.series.clear()
+
+
+class RequestStats:
+    """Накопленные за запрос SQL и отрисовка шаблонов."""
+
+    def __init__(self, request):
+        self.request = request
+        self.queries = 0
+        self.db_seconds = 0
+        self.render_seconds = 0
+        self.render_depth = 0
+
+    @property
+    def view(self):
+        match = getattr(self.request, 'resolver_match', None)
+        return match.view_name if match else UNMATCHED
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += time.perf_counter() - started
+            self.queries += 1
+
+
+def _current_view():
+    stats = getattr(_state, 'stats', None)
+    return stats.view if stats else BACKGROUND
+
+
+def cache_outcome(name, outcome, count=1):
+    """Записывает исход обращения к кэшу name: hit, miss или stale."""
+    if count:
+        CACHE.inc(count, view=_current_view(), cache=name, outcome=outcome)
+
+
+@contextmanager
+def thumbnail_timer():
+    """Засекает время создания миниатюры."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        THUMBNAIL_SECONDS.observe(
+            time.perf_counter() - started, view=_current_view()
+        )
+
+
+def timed_render(render):
+    """Добавляет время отрисовки шаблона к метрикам запроса."""
+    def wrapper(template, *args, **kwargs):
+        stats = getattr(_state, 'stats', None)
+        if stats is None:
+            return render(template, *args, **kwargs)
+        # вложенные шаблоны (карточки постов) входят во время страницы
+        stats.render_depth += 1
+        started = time.perf_counter()
+        try:
+            return render(template, *args, **kwargs)
+        finally:
+            stats.render_depth -= 1
+            if not stats.render_depth:
+                stats.render_seconds += time.perf_counter() - started
+    wrapper.metrics_timed = True
+    return wrapper
+
+
+def install():
+    """Включает замер отрисовки шаблонов; вызывается при запуске."""
+    if not getattr(Template.render, 'metrics_timed', False):
+        Template.render = timed_render(Template.render)
+
+
+class MetricsMiddleware:
+    """Записывает время, SQL и отрисовку каждого запроса."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = _state.stats = RequestStats(request)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(stats))
+                response = self.get_response(request)
+        finally:
+            _state.stats = None
+        view = stats.view
+        REQUEST_SECONDS.observe(
+            time.perf_counter() - started, view=view, method=request.method
+        )
+        REQUESTS.inc(
+            view=view, method=request.method, status=response.status_code
+        )
+        DB_QUERIES.inc(stats.queries, view=view)
+        DB_SECONDS.inc(stats.db_seconds, view=view)
+        RENDER_SECONDS.inc(stats.render_seconds, view=view)
+        return response
@@ -0,0 +1,254 @@
+"""
+Выборочное профилирование запросов.
+
+``ProfilerMiddleware`` профилирует запрос, если в параметре ``_profile``
+или заголовке ``X-Profile`` передан подписанный токен (его выдают команда
+``profile_token`` и страница профилей; каждый токен профилирует один
+запрос) или если запрос попал в случайную
+выборку: в среднем один из ``PROFILER_SAMPLE_RATE`` (0 - выборки нет).
+
+Пока идет запрос, фоновый поток каждые ``PROFILER_INTERVAL`` секунд
+снимает стек потока запроса: view, ORM, шаблоны и сам Django. Стеки
+сохраняются в ``PROFILER_DIR`` в свернутом формате (``a;b;c 12``),
+который понимают flamegraph.pl, speedscope и inferno; рядом лежит JSON
+с адресом, пользователем и длительностью. Хранятся последние
+``PROFILER_MAX_FILES`` профилей.
+"""
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.utils import timezone
+
+SALT = 'core.profiling'
+PARAM = '_profile'
+HEADER = 'HTTP_X_PROFILE'
+
+NAME = re.compile(r'^[\w-]+$')
+
+_labels = {}
+
+
+def make_token():
+    """
+    Токен, включающий профилирование одного запроса.
+
+    Токен действует ``PROFILER_TOKEN_MAX_AGE`` секунд, пока им не
+    воспользовались.
+    """
+    return signing.TimestampSigner(salt=SALT).sign(uuid.uuid4().hex)
+
+
+def _valid(token):
+    try:
+        nonce = signing.TimestampSigner(salt=SALT).unsign(
+            token, max_age=settings.PROFILER_TOKEN_MAX_AGE
+        )
+    except signing.BadSignature:
+        return False
+    # первое использование занимает ключ в общем кэше, повтор - нет
+    return cache.add(
+        f'profiler-token:{nonce}', True, settings.PROFILER_TOKEN_MAX_AGE
+    )
+
+
+def _reason(request):
+    """Почему запрос профилируется, или None."""
+    token = request.GET.get(PARAM) or request.META.get(HEADER)
+    if token and _valid(token):
+        return 'token'
+    rate = settings.PROFILER_SAMPLE_RATE
+    if rate and random.randrange(rate) == 0:
+        return 'sample'
+    return None
+
+
+def _short_path(filename):
+    # самый длинный подходящий путь поиска модулей дает имя вроде
+    # django/db/models/query.py
+    prefixes = [path for path in sys.path if path and filename.startswith(
+        os.path.join(path, '')
+    )]
+    if not prefixes:
+        return filename
+    return os.path.relpath(filename, max(prefixes, key=len))
+
+
+def _label(code):
+    label = _labels.get(code)
+    if label is None:
+        label = _labels[code] = (
+            f'{code.co_name} ({_short_path(code.co_filename)}:'
+            f'{code.co_firstlineno})'
+        ).replace(';', ':')
+    return label
+
+
+def _fold(frame):
+    labels = []
+    while frame is not None:
+        labels.append(_label(frame.f_code))
+        frame = frame.f_back
+    return ';'.join(reversed(labels))
+
+
+class Sampler:
+    """Снимает стеки потока thread_id каждые interval секунд."""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name='profiler', daemon=True
+        )
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[_fold(frame)] += 1
+
+    def folded(self):
+        """Стеки в свернутом формате flame graph."""
+        return ''.join(
+            f'{stack} {count}\n' for stack, count in self.stacks.most_common()
+        )
+
+
+def _path(name, extension):
+    if not NAME.match(name):
+        raise ValueError(f'Недопустимое имя профиля: {name}')
+    return os.path.join(settings.PROFILER_DIR, f'{name}.{extension}')
+
+
+def save(request, response, sampler, reason, seconds):
+    """Записывает профиль запроса, возвращает его имя."""
+    os.makedirs(settings.PROFILER_DIR, exist_ok=True)
+    now = timezone.now()
+    name = f'{now:%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:8]}'
+    match = getattr(request, 'resolver_match', None)
+    user = getattr(request, 'user', None)
+    meta = {
+        'name': name,
+        'created': now.isoformat(),
+        'method': request.method,
+        'path': request.get_full_path(),
+        'view': match.view_name if match else None,
+        'user': user.pk if user is not None else None,
+        'status': response.status_code,
+        'reason': reason,
+        'duration_ms': round(seconds * 1000, 2),
+        'interval_ms': sampler.interval * 1000,
+        'samples': sum(sampler.stacks.values()),
+    }
+    with open(_path(name, 'folded'), 'w', encoding='utf-8') as stream:
+        stream.write(sampler.folded())
+    with open(_path(name, 'json'), 'w', encoding='utf-8') as stream:
+        json.dump(meta, stream, ensure_ascii=False)
+    _prune()
+    return name
+
+
+def _prune():
+    names = sorted(
+        filename[:-len('.json')]
+        for filename in os.listdir(settings.PROFILER_DIR)
+        if filename.endswith('.json')
+    )
+    for name in names[:-settings.PROFILER_MAX_FILES]:
+        for extension in ('json', 'folded'):
+            try:
+                os.remove(_path(name, extension))
+            except FileNotFoundError:
+                pass
+
+
+def profiles():
+    """Описания сохраненных профилей, новые первыми."""
+    if not os.path.isdir(settings.PROFILER_DIR):
+        return []
+    result = []
+    for filename in sorted(os.listdir(settings.PROFILER_DIR), reverse=True):
+        if filename.endswith('.json'):
+            with open(
+                os.path.join(settings.PROFILER_DIR, filename),
+                encoding='utf-8',
+            ) as stream:
+                result.append(json.load(stream))
+    return result
+
+
+def load(name):
+    """Описание и свернутые стеки профиля; FileNotFoundError, если нет."""
+    with open(_path(name, 'json'), encoding='utf-8') as stream:
+        meta = json.load(stream)
+    with open(_path(name, 'folded'), encoding='utf-8') as stream:
+        folded = stream.read()
+    return meta, folded
+
+
+def summarize(folded, limit=30):
+    """
+    Самые затратные функции профиля.
+
+    ``self`` - сколько раз функция была на вершине стека, ``total`` -
+    сколько раз она была в стеке вообще. Значения - (функция, число
+    выборок, доля), по убыванию.
+    """
+    own, total, samples = Counter(), Counter(), 0
+    for line in folded.splitlines():
+        stack, _, count = line.rpartition(' ')
+        count = int(count)
+        frames = stack.split(';')
+        samples += count
+        own[frames[-1]] += count
+        for frame in set(frames):
+            total[frame] += count
+    return {
+        kind: [
+            (frame, count, count / samples)
+            for frame, count in counter.most_common(limit)
+        ]
+        for kind, counter in (('self', own), ('total', total))
+    }
+
+
+class ProfilerMiddleware:
+    """Профилирует запросы с токеном и случайную выборку запросов."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        reason = _reason(request)
+        if reason is None:
+            return self.get_response(request)
+        started = time.perf_counter()
+        with Sampler(
+            threading.get_ident(), settings.PROFILER_INTERVAL
+        ) as sampler:
+            response = self.get_response(request)
+        response['X-Profile-Id'] = save(
+            request, response, sampler, reason,
+            time.perf_counter() - started,
+        )
+        return response
@@ -0,0 +1,130 @@
+"""
+Бюджет SQL-запросов для view и поиск N+1.
+
+View объявляет, сколько запросов ей можно сделать, декоратором
+``@query_budget(n)``. ``QueryBudgetMiddleware`` записывает запросы
+каждого обращения, отдает их число в заголовке ``X-Query-Count``
+и сообщает в лог о превышении бюджета и о запросах одной формы,
+повторенных ``QUERY_REPEAT_LIMIT`` раз и больше (признак N+1).
+При ``QUERY_BUDGET_STRICT = True`` вместо записи в лог поднимается
+``QueryBudgetExceeded`` - так тесты падают на лишних запросах.
+
+Запросы внутри ``unbudgeted()`` не считаются: это работа, которую в
+рабочем режиме делает не view, а фоновый поток.
+"""
+import logging
+import re
+import threading
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# одинаковые по форме запросы в таком количестве считаются N+1
+QUERY_REPEAT_LIMIT = 3
+
+# служебные команды транзакций не считаются
+SKIPPED = (
+    'BEGIN', 'COMMIT', 'ROLLBACK',
+    'SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT',
+)
+
+IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+
+_state = threading.local()
+
+
+class QueryBudgetExceeded(Exception):
+    """View сделала больше запросов, чем объявила, или повторяет запрос."""
+
+
+def query_budget(limit):
+    """Объявляет наибольшее число SQL-запросов view."""
+    def decorator(view):
+        view.query_budget = limit
+        return view
+    return decorator
+
+
+@contextmanager
+def unbudgeted():
+    """Не считает запросы блока в бюджет текущего обращения."""
+    paused = getattr(_state, 'paused', False)
+    _state.paused = True
+    try:
+        yield
+    finally:
+        _state.paused = paused
+
+
+def shape(sql):
+    """Форма запроса: текст без параметров и длины списков IN."""
+    return IN_LIST.sub('IN (...)', sql)
+
+
+class QueryRecorder:
+    """Записывает SQL, выполненный на всех базах, включая реплики."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        if not sql.startswith(SKIPPED) and not getattr(
+            _state, 'paused', False
+        ):
+            self.queries.append(sql)
+        return execute(sql, params, many, context)
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        return self._stack.__exit__(*exc_info)
+
+    def __len__(self):
+        return len(self.queries)
+
+    def repeated(self, limit=QUERY_REPEAT_LIMIT):
+        """Формы запросов, выполненные limit раз и больше."""
+        counts = Counter(shape(sql) for sql in self.queries)
+        return {sql: count for sql, count in counts.items() if count >= limit}
+
+    def problems(self, budget=None):
+        """Описания нарушений: превышение бюджета и повторы запросов."""
+        problems = []
+        if budget is not None and len(self) > budget:
+            problems.append(f'{len(self)} запросов при бюджете {budget}')
+        for sql, count in self.repeated().items():
+            problems.append(f'запрос повторен {count} раз: {sql}')
+        return problems
+
+
+class QueryBudgetMiddleware:
+    """Следит за числом и повторами SQL-запросов каждого обращения."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.query_budget = None
+        with QueryRecorder() as recorder:
+            response = self.get_response(request)
+        response['X-Query-Count'] = len(recorder)
+        problems = recorder.problems(request.query_budget)
+        if problems:
+            message = f'{request.method} {request.path}: ' + '; '.join(
+                problems
+            )
+            if settings.QUERY_BUDGET_STRICT:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget = getattr(view_func, 'query_budget', None)
@@ -0,0 +1,16 @@
+"""Вспомогательные проверки для тестов."""
+from contextlib import contextmanager
+
+from .query_budget import QueryRecorder
+
+
+class QueryBudgetTestMixin:
+    """Проверка числа SQL-запросов и повторов одной формы (N+1)."""
+
+    @contextmanager
+    def assertQueryBudget(self, budget=None):
+        with QueryRecorder() as recorder:
+            yield recorder
+        problems = recorder.problems(budget)
+        if problems:
+            self.fail('\n'.join(problems + recorder.queries))
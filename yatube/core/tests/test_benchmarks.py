@@ -0,0 +1,69 @@
+from django.template import engines
+from django.test import SimpleTestCase
+
+from core.benchmarks import RenderTimer, compare, portable
+
+BASELINE = {
+    'small/index': {
+        'queries': 6, 'wall_ms': 20.0, 'render_ms': 10.0, 'peak_kib': 500,
+    },
+}
+
+
+class CompareTest(SimpleTestCase):
+
+    def current(self, **metrics):
+        return {'small/index': {**BASELINE['small/index'], **metrics}}
+
+    def test_same_results_pass(self):
+        self.assertEqual(compare(BASELINE, self.current(), 0.25), [])
+
+    def test_any_extra_query_is_regression(self):
+        """Лишний SQL-запрос - регрессия при любом пороге."""
+        self.assertEqual(
+            compare(BASELINE, self.current(queries=7), 0.25),
+            ['small/index: queries 6 -> 7'],
+        )
+
+    def test_slowdown_past_threshold(self):
+        """Время и память сравниваются с порогом и допуском на шум."""
+        self.assertEqual(
+            compare(BASELINE, self.current(wall_ms=24.9), 0.25), []
+        )
+        self.assertEqual(
+            compare(BASELINE, self.current(wall_ms=26.0, peak_kib=700), 0.25),
+            [
+                'small/index: wall_ms 20.0 -> 26.0',
+                'small/index: peak_kib 500 -> 700',
+            ],
+        )
+        self.assertEqual(
+            compare(
+                {'s': {'render_ms': 0.5}}, {'s': {'render_ms': 1.2}}, 0.25
+            ),
+            [],
+        )
+
+    def test_portable_results_keep_only_queries(self):
+        """В общий эталон не попадают время и память этой машины."""
+        self.assertEqual(
+            portable(BASELINE), {'small/index': {'queries': 6}}
+        )
+
+    def test_unknown_scenarios_skipped(self):
+        current = {'large/index': {'queries': 100}}
+        self.assertEqual(compare(BASELINE, current, 0.25), [])
+
+
+class RenderTimerTest(SimpleTestCase):
+
+    def test_counts_outer_renders_once(self):
+        """Вложенная отрисовка входит во время внешней."""
+        engine = engines['django']
+        inner = engine.from_string('{{ value }}')
+        outer = engine.from_string('{{ render }}')
+        with RenderTimer() as timer:
+            outer.render({'render': lambda: inner.render({'value': 1})})
+            self.assertEqual(timer.depth, 0)
+        self.assertGreater(timer.seconds, 0)
+        self.assertEqual(inner.render({'value': 2}), '2')
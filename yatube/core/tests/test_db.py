@@ -0,0 +1,90 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import SimpleTestCase, override_settings
+
+from core.db.sqlite import replicate
+
+PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -20000,
+}
+
+
+class SQLitePragmasTest(SimpleTestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.db = DatabaseWrapper({
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.path.join(self.directory, 'db.sqlite3'),
+            'OPTIONS': {},
+            'TIME_ZONE': None,
+            'CONN_MAX_AGE': 0,
+            'AUTOCOMMIT': True,
+        })
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def pragma(self, name):
+        with self.db.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    @override_settings(SQLITE_PRAGMAS=PRAGMAS)
+    def test_new_connection_configured(self):
+        """Новое соединение получает PRAGMA из настроек."""
+        self.assertEqual(self.pragma('journal_mode'), 'wal')
+        # NORMAL = 1
+        self.assertEqual(self.pragma('synchronous'), 1)
+        self.assertEqual(self.pragma('busy_timeout'), 5000)
+        self.assertEqual(self.pragma('cache_size'), -20000)
+
+    @override_settings(SQLITE_PRAGMAS={})
+    def test_defaults_without_pragmas(self):
+        """Без настроек соединение остается с режимами SQLite."""
+        self.assertEqual(self.pragma('journal_mode'), 'delete')
+
+
+class ReplicateTest(SimpleTestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.primary = os.path.join(self.directory, 'primary.sqlite3')
+        self.replica = os.path.join(self.directory, 'replica.sqlite3')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def write(self, *statements):
+        db = sqlite3.connect(self.primary)
+        with db:
+            for statement in statements:
+                db.execute(statement)
+        db.close()
+
+    def replica_rows(self):
+        db = sqlite3.connect(self.replica)
+        rows = db.execute('SELECT text FROM post ORDER BY id').fetchall()
+        db.close()
+        return [text for text, in rows]
+
+    def test_replica_catches_up(self):
+        """Реплика получает схему и данные, а затем новые записи."""
+        self.write(
+            'CREATE TABLE post (id INTEGER PRIMARY KEY, text TEXT)',
+            "INSERT INTO post (text) VALUES ('первый')",
+        )
+        replicate(self.primary, self.replica)
+        self.assertEqual(self.replica_rows(), ['первый'])
+        self.write("INSERT INTO post (text) VALUES ('второй')")
+        self.assertEqual(self.replica_rows(), ['первый'])
+        replicate(self.primary, self.replica)
+        self.assertEqual(self.replica_rows(), ['первый', 'второй'])
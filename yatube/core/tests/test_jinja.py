@@ -0,0 +1,72 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from core.jinja import Template
+from posts import cards
+from posts.models import Group, Post
+
+User = get_user_model()
+
+JINJA2 = override_settings(
+    FEED_TEMPLATE_ENGINE='jinja2',
+    TEMPLATES=[settings.TEMPLATES[0], settings.JINJA2_TEMPLATES],
+)
+
+
+def _words(html):
+    return ' '.join(html.split())
+
+
+class JinjaFeedTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            username='author', first_name='Лев', last_name='Толстой'
+        )
+        cls.group = Group.objects.create(title='Классика', slug='classic')
+        cls.post = Post.objects.create(
+            author=cls.author, group=cls.group,
+            text='Все счастливые семьи\nпохожи друг на друга',
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_cards_match_django_templates(self):
+        """Карточки на Jinja2 совпадают с карточками Django до пробелов."""
+        request = RequestFactory().get('/')
+        posts = [self.post]
+        for view_name in ('posts:index', 'posts:profile'):
+            with self.subTest(view_name=view_name):
+                options = cards.card_options(view_name)
+                django_html = cards.render_html(posts, request, **options)
+                with JINJA2:
+                    jinja_html = cards.render_html(posts, request, **options)
+                self.assertEqual(
+                    _words(jinja_html[0]), _words(django_html[0])
+                )
+
+    @JINJA2
+    def test_feed_pages(self):
+        """Страницы лент отрисовываются шаблонами Jinja2."""
+        client = Client()
+        client.force_login(self.author)
+        pages = {
+            reverse('posts:index'): 'posts/index.html',
+            reverse('posts:group_list', args=['classic']):
+                'posts/group_list.html',
+            reverse('posts:profile', args=['author']): 'posts/profile.html',
+        }
+        for url, template in pages.items():
+            with self.subTest(url=url):
+                response = client.get(url)
+                self.assertEqual(response.templates[0].name, template)
+                self.assertIsInstance(response.templates[0], Template)
+                self.assertContains(
+                    response, 'Все счастливые семьи<br>похожи'
+                )
+                self.assertEqual(response.context['page_obj'][0], self.post)
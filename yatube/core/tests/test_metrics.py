@@ -0,0 +1,129 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from core import metrics
+from posts.models import Post
+
+User = get_user_model()
+
+
+class RegistryTest(SimpleTestCase):
+
+    def test_histogram_format(self):
+        """Корзины накопительные, с +Inf, суммой и числом."""
+        histogram = metrics.Histogram('h', 'Гистограмма.', buckets=(1, 2))
+        for value in (0.5, 1.5, 3):
+            histogram.observe(value, view='a"b')
+        self.assertEqual(list(histogram.samples()), [
+            'h_bucket{view="a\\"b",le="1"} 1',
+            'h_bucket{view="a\\"b",le="2"} 2',
+            'h_bucket{view="a\\"b",le="+Inf"} 3',
+            'h_sum{view="a\\"b"} 5.0',
+            'h_count{view="a\\"b"} 3',
+        ])
+
+    def test_counter_adds_by_labels(self):
+        counter = metrics.Counter('c', 'Счетчик.')
+        counter.inc(view='x', status=200)
+        counter.inc(2, status=200, view='x')
+        counter.inc(view='y', status=404)
+        self.assertEqual(list(counter.samples()), [
+            'c{status="200",view="x"} 3',
+            'c{status="404",view="y"} 1',
+        ])
+
+
+class MetricsMiddlewareTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(username='author')
+        Post.objects.create(author=author, text='Пост')
+
+    def setUp(self):
+        cache.clear()
+        metrics.reset()
+
+    def sample(self, metric, **labels):
+        """Значение серии metric с метками labels."""
+        for line in metrics.render().splitlines():
+            name, _, value = line.rpartition(' ')
+            if line.startswith('#') or not name.startswith(metric + '{'):
+                continue
+            if all(f'{key}="{item}"' in name for key, item in labels.items()):
+                return float(value)
+        return None
+
+    def test_records_request_by_url_name(self):
+        """Запрос к ленте попадает в метрики под именем адреса."""
+        self.client.get(reverse('posts:index'))
+        self.client.get(reverse('posts:index'))
+        self.assertEqual(self.sample(
+            'yatube_request_duration_seconds_count',
+            view='posts:index', method='GET',
+        ), 2)
+        self.assertEqual(self.sample(
+            'yatube_requests_total', view='posts:index', status=200
+        ), 2)
+        self.assertGreater(
+            self.sample('yatube_db_queries_total', view='posts:index'), 0
+        )
+        self.assertGreater(self.sample(
+            'yatube_template_render_seconds_total', view='posts:index'
+        ), 0)
+        self.assertEqual(self.sample(
+            'yatube_cache_requests_total',
+            view='posts:index', cache='feed_page', outcome='miss',
+        ), 1)
+        self.assertEqual(self.sample(
+            'yatube_cache_requests_total',
+            view='posts:index', cache='feed_page', outcome='hit',
+        ), 1)
+        self.assertEqual(self.sample(
+            'yatube_cache_requests_total',
+            view='posts:index', cache='post_card', outcome='miss',
+        ), 1)
+
+    def test_unresolved_url(self):
+        self.client.get('/unknown-page/')
+        self.assertEqual(self.sample(
+            'yatube_requests_total', view='unmatched', status=404
+        ), 1)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_endpoint_requires_token_or_staff(self):
+        """Метрики отдаются по токену или сотруднику."""
+        self.client.get(reverse('posts:index'))
+        response = self.client.get(
+            reverse('metrics'), HTTP_AUTHORIZATION='Bearer secret'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        self.assertIn(
+            b'# TYPE yatube_request_duration_seconds histogram',
+            response.content,
+        )
+        response = self.client.get(
+            reverse('metrics'), HTTP_AUTHORIZATION='Bearer wrong'
+        )
+        self.assertEqual(response.status_code, 404)
+        self.client.force_login(
+            User.objects.create_user(username='admin', is_staff=True)
+        )
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 200)
+
+    def test_endpoint_closed_behind_proxy(self):
+        """Запрос через локальный прокси без токена метрик не получает."""
+        response = self.client.get(
+            reverse('metrics'),
+            REMOTE_ADDR='127.0.0.1',
+            HTTP_X_FORWARDED_FOR='203.0.113.5',
+        )
+        self.assertEqual(response.status_code, 404)
+        with override_settings(METRICS_TOKEN=None):
+            response = self.client.get(
+                reverse('metrics'), HTTP_AUTHORIZATION='Bearer None'
+            )
+        self.assertEqual(response.status_code, 404)
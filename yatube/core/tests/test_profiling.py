@@ -0,0 +1,129 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core import profiling
+
+User = get_user_model()
+
+
+def busy_function(seconds):
+    finish = time.perf_counter() + seconds
+    while time.perf_counter() < finish:
+        pass
+
+
+class SamplerTest(TestCase):
+
+    def test_samples_current_thread(self):
+        """Стеки потока содержат выполняемую функцию и ее вызывающих."""
+        with profiling.Sampler(threading.get_ident(), 0.001) as sampler:
+            busy_function(0.1)
+        self.assertTrue(sampler.stacks)
+        stack, count = sampler.stacks.most_common(1)[0]
+        frames = stack.split(';')
+        self.assertTrue(frames[-1].startswith('busy_function ('))
+        self.assertTrue(
+            any(frame.startswith('test_samples_current_thread (')
+                for frame in frames)
+        )
+        self.assertIn(f'{stack} {count}\n', sampler.folded())
+
+    def test_summarize(self):
+        summary = profiling.summarize('a;b 3\na;c 1\n')
+        self.assertEqual(summary['self'][0], ('b', 3, 0.75))
+        self.assertEqual(summary['total'][0], ('a', 4, 1.0))
+
+
+class ProfilerMiddlewareTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.directory = tempfile.mkdtemp()
+        settings = override_settings(
+            PROFILER_DIR=self.directory, PROFILER_INTERVAL=0.001
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.addCleanup(shutil.rmtree, self.directory, True)
+        self.staff = User.objects.create_user(
+            username='staff', is_staff=True
+        )
+
+    def test_not_profiled_by_default(self):
+        response = self.client.get(reverse('posts:index'))
+        self.assertNotIn('X-Profile-Id', response)
+        response = self.client.get(
+            reverse('posts:index'), {profiling.PARAM: 'forged:token'}
+        )
+        self.assertNotIn('X-Profile-Id', response)
+        self.assertEqual(profiling.profiles(), [])
+
+    def test_token_profiles_request(self):
+        """Запрос с подписанным токеном профилируется и сохраняется."""
+        self.client.force_login(self.staff)
+        response = self.client.get(
+            reverse('posts:index'),
+            HTTP_X_PROFILE=profiling.make_token(),
+        )
+        name = response['X-Profile-Id']
+        meta, folded = profiling.load(name)
+        self.assertEqual(meta['view'], 'posts:index')
+        self.assertEqual(meta['user'], self.staff.pk)
+        self.assertEqual(meta['reason'], 'token')
+        self.assertEqual(meta['samples'], sum(
+            int(line.rpartition(' ')[2]) for line in folded.splitlines()
+        ))
+        self.assertEqual(
+            [profile['name'] for profile in profiling.profiles()], [name]
+        )
+
+    def test_token_used_once(self):
+        """Повтор токена не профилирует второй запрос."""
+        token = profiling.make_token()
+        url = reverse('posts:index')
+        response = self.client.get(url, HTTP_X_PROFILE=token)
+        self.assertIn('X-Profile-Id', response)
+        response = self.client.get(url, HTTP_X_PROFILE=token)
+        self.assertNotIn('X-Profile-Id', response)
+        self.assertEqual(len(profiling.profiles()), 1)
+
+    @override_settings(PROFILER_SAMPLE_RATE=1, PROFILER_MAX_FILES=2)
+    def test_random_sample_and_pruning(self):
+        """Выборка 1 из 1 профилирует все, старые профили удаляются."""
+        for _ in range(3):
+            response = self.client.get(reverse('posts:index'))
+            self.assertIn('X-Profile-Id', response)
+        self.assertEqual(len(profiling.profiles()), 2)
+        self.assertEqual(len(os.listdir(self.directory)), 4)
+
+    def test_browsing_only_for_staff(self):
+        response = self.client.get(
+            reverse('posts:index'), {profiling.PARAM: profiling.make_token()}
+        )
+        name = response['X-Profile-Id']
+        urls = (
+            reverse('core:profile_list'),
+            reverse('core:profile_detail', args=[name]),
+            reverse('core:profile_folded', args=[name]),
+        )
+        for url in urls:
+            self.assertEqual(self.client.get(url).status_code, 302)
+        self.client.force_login(self.staff)
+        response = self.client.get(urls[0])
+        self.assertContains(response, name)
+        response = self.client.get(urls[1])
+        self.assertContains(response, 'posts:index')
+        response = self.client.get(urls[2])
+        self.assertEqual(response.content.decode(), profiling.load(name)[1])
+        response = self.client.get(
+            reverse('core:profile_detail', args=['missing'])
+        )
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,72 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+
+from django.test import SimpleTestCase
+
+from core.cache.sqlite import SQLiteCache
+
+
+def _set_in_child(location):
+    SQLiteCache(location, {}).set('from-child', 42)
+
+
+class SQLiteCacheTest(SimpleTestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.location = os.path.join(self.directory, 'cache.sqlite3')
+        self.cache = SQLiteCache(self.location, {})
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_basic_operations(self):
+        """Запись, чтение, добавление, увеличение и удаление."""
+        self.cache.set('key', {'a': 1})
+        self.assertEqual(self.cache.get('key'), {'a': 1})
+        self.assertFalse(self.cache.add('key', 'other'))
+        self.assertTrue(self.cache.add('counter', 1))
+        self.assertEqual(self.cache.incr('counter', 2), 3)
+        with self.assertRaises(ValueError):
+            self.cache.incr('missing')
+        self.cache.delete('key')
+        self.assertIsNone(self.cache.get('key'))
+        self.assertEqual(
+            self.cache.get_many(['counter', 'key']), {'counter': 3}
+        )
+
+    def test_expired_value_is_missing(self):
+        """Истекшая запись не читается и может быть добавлена заново."""
+        self.cache.set('key', 'value', timeout=0)
+        self.assertIsNone(self.cache.get('key'))
+        self.assertTrue(self.cache.add('key', 'new'))
+        self.assertEqual(self.cache.get('key'), 'new')
+
+    def test_lru_eviction(self):
+        """При переполнении вытесняются давно не читавшиеся записи."""
+        cache = SQLiteCache(self.location, {'OPTIONS': {
+            'MAX_ENTRIES': 10, 'CULL_EVERY': 1, 'CULL_FREQUENCY': 2,
+        }})
+        cache.set('hot', 'value')
+        cache._db.execute(
+            'UPDATE cache SET accessed = ?', (time.time() + 100,)
+        )
+        for number in range(10):
+            cache.set(f'cold-{number}', 'value')
+        self.assertEqual(cache.get('hot'), 'value')
+        self.assertLessEqual(
+            cache._db.execute('SELECT COUNT(*) FROM cache').fetchone()[0],
+            10
+        )
+
+    def test_shared_between_processes(self):
+        """Запись из другого процесса видна в этом."""
+        process = multiprocessing.get_context('fork').Process(
+            target=_set_in_child, args=(self.location,)
+        )
+        process.start()
+        process.join()
+        self.assertEqual(self.cache.get('from-child'), 42)
@@ -0,0 +1,17 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'core'
+
+urlpatterns = [
+    path('profiles/', views.profile_list, name='profile_list'),
+    path(
+        'profiles/<str:name>/', views.profile_detail, name='profile_detail'
+    ),
+    path(
+        'profiles/<str:name>/folded/',
+        views.profile_folded,
+        name='profile_folded'
+    ),
+]
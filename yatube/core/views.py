@@ -1,4 +1,11 @@
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import Http404, HttpResponse
 from django.shortcuts import render
+from django.utils.crypto import constant_time_compare
+
+from . import metrics as request_metrics
+from . import profiling
 
 
 # страница ошибки 404
@@ -14,3 +21,62 @@ def csrf_failure(request, reason=''):
 # страница ошибки 500
 def server_error(request, reason=''):
     return render(request, 'core/500.html')
+
+
+def _metrics_allowed(request):
+    # адрес клиента не годится: за прокси все запросы идут с 127.0.0.1
+    token = settings.METRICS_TOKEN
+    if token and constant_time_compare(
+        request.META.get('HTTP_AUTHORIZATION', ''), f'Bearer {token}'
+    ):
+        return True
+    return request.user.is_active and request.user.is_staff
+
+
+# метрики процесса для Prometheus: по токену или сотруднику
+def metrics(request):
+    if not _metrics_allowed(request):
+        raise Http404
+    return HttpResponse(
+        request_metrics.render(),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
+
+
+def _load_profile(name):
+    try:
+        return profiling.load(name)
+    except (ValueError, FileNotFoundError):
+        raise Http404
+
+
+# сохраненные профили запросов и токен для новых
+@staff_member_required
+def profile_list(request):
+    return render(request, 'core/profile_list.html', {
+        'profiles': profiling.profiles(),
+        'token': profiling.make_token(),
+        'param': profiling.PARAM,
+        'max_age': settings.PROFILER_TOKEN_MAX_AGE,
+    })
+
+
+# самые затратные функции профиля
+@staff_member_required
+def profile_detail(request, name):
+    meta, folded = _load_profile(name)
+    return render(request, 'core/profile_detail.html', {
+        'meta': meta,
+        'summary': profiling.summarize(folded),
+    })
+
+
+# свернутые стеки для flamegraph.pl и speedscope
+@staff_member_required
+def profile_folded(request, name):
+    _, folded = _load_profile(name)
+    response = HttpResponse(folded, content_type='text/plain; charset=utf-8')
+    response['Content-Disposition'] = (
+        f'attachment; filename="{name}.folded"'
+    )
+    return response
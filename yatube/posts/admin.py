@@ -1,5 +1,6 @@
 from django.contrib import admin
 
+from . import search
 from .models import Post, Group, Comment
 
 
@@ -11,7 +12,7 @@ class PostAdmin(admin.ModelAdmin):
     Ключевые аргументы:
     list_display - поля из моделей Post и Group
     list_editable - виджет формы группы
-    search_fields - поиск по тексту поста
+    search_fields - поиск по тексту поста через поисковый индекс
     list_filter - фильтр по дате публикации.
     """
 
@@ -23,12 +24,24 @@ class PostAdmin(admin.ModelAdmin):
         'group',
     )
     list_editable = ('group',)
+    readonly_fields = ('comments_count',)
     search_fields = ('text',)
     list_filter = ('pub_date',)
     empty_value_display = '-пусто-'
 
+    def get_search_results(self, request, queryset, search_term):
+        # индекс вместо LIKE '%...%' по всей таблице
+        if not search_term:
+            return queryset, False
+        found = search.search(search_term).values('pk')
+        return queryset.filter(pk__in=found), False
 
-admin.site.register(Group, prepopulated_fields={'slug': ('title',)})
+
+admin.site.register(
+    Group,
+    prepopulated_fields={'slug': ('title',)},
+    readonly_fields=('posts_count',),
+)
 
 
 @admin.register(Comment)
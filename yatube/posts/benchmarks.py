@@ -0,0 +1,98 @@
+"""
+Замеры view приложения posts на данных разного объема.
+
+Данные каждого объема создает ``synthetic.Generator`` с постоянным
+seed, поэтому замеры на разных машинах и в разные дни сравнимы.
+Ленты открываются на самых тяжелых целях: самом большом сообществе,
+самом плодовитом авторе, посте с наибольшей веткой комментариев и
+у пользователя с наибольшим числом подписок.
+"""
+from django.contrib.auth import get_user_model
+from django.test import Client
+from django.urls import reverse
+
+from core.benchmarks import measure
+
+from . import bulk
+from .models import Group, Post
+from .synthetic import Generator
+
+User = get_user_model()
+
+SIZES = {
+    'small': {
+        'users': 50, 'groups': 5, 'posts': 500, 'follows': 500,
+        'comments': 1000, 'viral_posts': 1, 'viral_comments': 200,
+    },
+    'medium': {
+        'users': 500, 'groups': 20, 'posts': 5000, 'follows': 5000,
+        'comments': 10000, 'viral_posts': 2, 'viral_comments': 1000,
+    },
+    'large': {
+        'users': 5000, 'groups': 50, 'posts': 50000, 'follows': 50000,
+        'comments': 100000, 'viral_posts': 5, 'viral_comments': 2000,
+    },
+}
+
+VIEWS = (
+    'index', 'group_posts', 'profile', 'post_detail', 'follow_index',
+    'post_create', 'add_comment',
+)
+
+
+class BenchmarkError(Exception):
+    """View ответила не тем кодом, замер был бы бессмысленным."""
+
+
+def generate(size, seed=0):
+    """Наполняет пустую базу данными объема size."""
+    Generator(seed=seed, **SIZES[size]).run()
+    bulk.rebuild_derived()
+
+
+def _requests():
+    group = Group.objects.order_by('-posts_count').first()
+    author = User.objects.order_by('-counters__posts_count').first()
+    reader = User.objects.order_by('-counters__following_count').first()
+    post = Post.objects.order_by('-comments_count').first()
+    text = {'text': 'Замер'}
+    return reader, {
+        'index': ('get', reverse('posts:index'), None, 200),
+        'group_posts': (
+            'get', reverse('posts:group_list', args=[group.slug]), None, 200
+        ),
+        'profile': (
+            'get', reverse('posts:profile', args=[author.username]), None,
+            200
+        ),
+        'post_detail': (
+            'get', reverse('posts:post_detail', args=[post.pk]), None, 200
+        ),
+        'follow_index': ('get', reverse('posts:follow_index'), None, 200),
+        'post_create': ('post', reverse('posts:post_create'), text, 302),
+        'add_comment': (
+            'post', reverse('posts:add_comment', args=[post.pk]), text, 302
+        ),
+    }
+
+
+def run(repeat=5, views=VIEWS):
+    """Метрики ``core.benchmarks.measure`` для каждой view."""
+    reader, requests = _requests()
+    client = Client()
+    client.force_login(reader)
+    results = {}
+    for name in views:
+        method, url, data, status = requests[name]
+
+        def request():
+            response = getattr(client, method)(url, data)
+            if response.status_code != status:
+                raise BenchmarkError(
+                    f'{method.upper()} {url}: {response.status_code}'
+                )
+
+        # первый запрос прогревает шаблоны и соединение
+        request()
+        results[name] = measure(request, repeat)
+    return results
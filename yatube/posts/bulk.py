@@ -0,0 +1,166 @@
+"""
+Потоковый импорт и экспорт пользователей, сообществ, постов,
+комментариев и подписок.
+
+Каждая таблица - отдельный файл JSON Lines или CSV. Строки читаются
+и пишутся по одной, в памяти держится только текущая пачка, поэтому
+объем данных не ограничен памятью. Импорт пишет пачки ``bulk_create``
+в своих транзакциях и не вызывает сигналов: счетчики, ленты подписок
+и поисковый индекс пересобираются после загрузки (``rebuild_derived``).
+"""
+import csv
+import datetime
+import json
+from contextlib import contextmanager
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from . import counters, search, timeline
+from .models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+FORMATS = ('jsonl', 'csv')
+
+# таблицы в порядке загрузки: сначала те, на которые ссылаются другие
+TABLES = {
+    'users': (User, (
+        'id', 'username', 'password', 'first_name', 'last_name', 'email',
+        'is_active', 'is_staff', 'is_superuser', 'date_joined', 'last_login',
+    )),
+    'groups': (Group, ('id', 'title', 'slug', 'description')),
+    'posts': (Post, (
+        'id', 'text', 'pub_date', 'edited', 'author_id', 'group_id', 'image',
+    )),
+    'comments': (Comment, ('id', 'post_id', 'author_id', 'text', 'created')),
+    'follows': (Follow, ('id', 'user_id', 'author_id')),
+}
+
+
+def _dump(value):
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    return value
+
+
+def write_rows(stream, fields, rows, fmt):
+    """Пишет кортежи значений в поток, возвращает их число."""
+    written = 0
+    if fmt == 'csv':
+        writer = csv.writer(stream)
+        writer.writerow(fields)
+    for row in rows:
+        row = [_dump(value) for value in row]
+        if fmt == 'csv':
+            writer.writerow(row)
+        else:
+            stream.write(json.dumps(dict(zip(fields, row)),
+                                    ensure_ascii=False))
+            stream.write('\n')
+        written += 1
+    return written
+
+
+def read_rows(stream, fmt):
+    """Словари строк из потока по одной."""
+    if fmt == 'csv':
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+def export_table(name, stream, fmt, batch_size):
+    """Выгружает таблицу в поток по первичному ключу."""
+    model, fields = TABLES[name]
+    rows = model.objects.order_by('pk').values_list(*fields).iterator(
+        chunk_size=batch_size
+    )
+    return write_rows(stream, fields, rows, fmt)
+
+
+def _parse(model, fields, rows):
+    # значения из CSV - строки: приводим их полями модели
+    by_attname = {field.attname: field for field in model._meta.fields}
+    for row in rows:
+        values = {}
+        for name in fields:
+            if name not in row:
+                continue
+            field, value = by_attname[name], row[name]
+            if value is None or (value == '' and field.null):
+                values[name] = None
+            else:
+                values[name] = field.to_python(value)
+        yield model(**values)
+
+
+@contextmanager
+def _original_dates(model):
+    """Не дает auto_now и auto_now_add заменить даты из файла."""
+    fields = [
+        field for field in model._meta.fields
+        if getattr(field, 'auto_now', False)
+        or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def import_table(name, rows, batch_size, ignore_conflicts=False):
+    """Загружает строки пачками, каждая пачка - своя транзакция."""
+    model, fields = TABLES[name]
+    objects = _parse(model, fields, rows)
+    total = 0
+    with _original_dates(model):
+        while True:
+            batch = list(islice(objects, batch_size))
+            if not batch:
+                break
+            with transaction.atomic():
+                model.objects.bulk_create(
+                    batch, ignore_conflicts=ignore_conflicts
+                )
+            total += len(batch)
+    with connection.cursor() as cursor:
+        # следующие id должны идти после загруженных
+        for sql in connection.ops.sequence_reset_sql(no_style(), [model]):
+            cursor.execute(sql)
+    return total
+
+
+@contextmanager
+def without_indexes(names):
+    """Удаляет индексы Meta.indexes таблиц на время загрузки."""
+    models = [TABLES[name][0] for name in names]
+    with connection.schema_editor() as editor:
+        for model in models:
+            for index in model._meta.indexes:
+                editor.remove_index(model, index)
+    try:
+        yield
+    finally:
+        with connection.schema_editor() as editor:
+            for model in models:
+                for index in model._meta.indexes:
+                    editor.add_index(model, index)
+
+
+def rebuild_derived():
+    """Пересобирает данные, которые обычно ведут сигналы."""
+    counters.recount_all()
+    timeline.rebuild_all()
+    search.rebuild()
+    # поколения страниц и версии карточек не знают о загруженных строках
+    cache.clear()
@@ -0,0 +1,127 @@
+"""
+Кэш отрисованных карточек постов.
+
+Карточка хранится под ключом из id поста, версий поста, автора и
+группы и того, выводит ли она ссылки на автора и группу. Изменение
+любого из объектов меняет версию, и старые карточки просто перестают
+читаться; карточки общие для всех лент с одинаковыми ссылками.
+"""
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import prefetch_related_objects
+from django.template import Context
+from django.template.backends.django import Template as DjangoTemplate
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+
+from core import metrics
+
+from . import constants
+
+CARD_TEMPLATE = 'posts/includes/card_post.html'
+
+
+def _version_key(kind, pk):
+    return f'card-version:{kind}:{pk}'
+
+
+def bump(kind, pk):
+    """Сбрасывает карточки, зависящие от объекта (post, author, group)."""
+    cache.set(_version_key(kind, pk), uuid.uuid4().hex, None)
+
+
+def _versions(keys):
+    versions = cache.get_many(keys)
+    for key in set(keys) - set(versions):
+        # версия могла быть вытеснена: заводим новую
+        cache.add(key, uuid.uuid4().hex, None)
+        versions[key] = cache.get(key)
+    return versions
+
+
+def _dependencies(post):
+    return (
+        _version_key('post', post.pk),
+        _version_key('author', post.author_id),
+        _version_key('group', post.group_id),
+    )
+
+
+def post_version(post):
+    """Версия поста вместе с его автором и группой."""
+    keys = _dependencies(post)
+    versions = _versions(keys)
+    return '.'.join(versions[key] for key in keys)
+
+
+def card_options(view_name):
+    """Ссылки карточки: лента не ссылается сама на себя."""
+    return {
+        'show_author': view_name != 'posts:profile',
+        'show_group': view_name != 'posts:group_list',
+    }
+
+
+def render_html(posts, request, show_author=True, show_group=True,
+                template=None):
+    """
+    HTML карточек без кэша.
+
+    Все карточки рисуются в одном контексте: значения страницы (ссылки,
+    request) кладутся в него один раз, а вложенные шаблоны карточки
+    находятся один раз на страницу, а не на каждую карточку.
+    """
+    template = template or get_template(
+        CARD_TEMPLATE, using=settings.FEED_TEMPLATE_ENGINE
+    )
+    page = {
+        'show_author': show_author,
+        'show_group': show_group,
+        'request': request,
+    }
+    if not isinstance(template, DjangoTemplate):
+        # Jinja2: скомпилированный шаблон и общий словарь контекста
+        return [
+            template.template.render({**page, 'post': post})
+            for post in posts
+        ]
+    context = Context(page)
+    html = []
+    for post in posts:
+        with context.push(post=post):
+            html.append(template.template.render(context))
+    return html
+
+
+def render_cards(posts, request):
+    """Возвращает HTML карточек постов, дорисовывая недостающие."""
+    posts = list(posts)
+    options = card_options(request.resolver_match.view_name)
+    links = ''.join(str(int(shown)) for shown in options.values())
+    dependencies = {post.pk: _dependencies(post) for post in posts}
+    versions = _versions(
+        [key for keys in dependencies.values() for key in keys]
+    )
+    card_keys = {
+        post.pk: ':'.join(
+            ['post-card', links, str(post.pk)]
+            + [versions[key] for key in dependencies[post.pk]]
+        )
+        for post in posts
+    }
+    cards = cache.get_many(list(card_keys.values()))
+    uncached = [post for post in posts if card_keys[post.pk] not in cards]
+    # копии картинок нужны только карточкам, которых нет в кэше
+    prefetch_related_objects(uncached, 'variants')
+    missing = dict(zip(
+        (card_keys[post.pk] for post in uncached),
+        render_html(uncached, request, **options),
+    ))
+    cards.update(missing)
+    if missing:
+        cache.set_many(missing, constants.CARD_CACHE_TIMEOUT)
+    metrics.cache_outcome('post_card', 'hit', len(posts) - len(missing))
+    metrics.cache_outcome('post_card', 'miss', len(missing))
+    return [mark_safe(cards[card_keys[post.pk]]) for post in posts]
@@ -0,0 +1,115 @@
+"""
+Условные ответы: ETag, Last-Modified, 304 Not Modified и Cache-Control.
+
+Валидаторы считаются без отрисовки страницы. Last-Modified ленты - дата
+самого нового поста выборки, поста - его последняя правка или последний
+комментарий. ETag дополнительно учитывает поколения данных из
+``page_cache`` и версии карточек из ``cards``, которые меняются при
+правке и удалении постов, поэтому правка старого поста тоже меняет ETag.
+
+Ответы гостям может хранить общий прокси-кэш (``public, s-maxage``),
+ответы вошедшим пользователям - только браузер, с проверкой при каждом
+показе (``private, no-cache``); все ответы зависят от cookie.
+"""
+import calendar
+import hashlib
+from functools import wraps
+
+from django.db.models import Max
+from django.utils.cache import (
+    get_conditional_response, patch_cache_control, patch_vary_headers
+)
+from django.utils.http import http_date, quote_etag
+
+from . import cards, constants, page_cache
+from .models import Post
+
+
+def make_etag(*parts):
+    """ETag из частей, от которых зависит ответ."""
+    return hashlib.md5(
+        ':'.join(str(part) for part in parts).encode()
+    ).hexdigest()
+
+
+def latest_pub_date(posts):
+    """Дата самого нового поста выборки или None."""
+    return posts.aggregate(latest=Max('pub_date'))['latest']
+
+
+def feed_validators(posts, scopes, *extra):
+    """Валидаторы ленты: самый новый пост и поколение ее данных."""
+    latest = latest_pub_date(posts)
+    return make_etag(latest, page_cache.generation(scopes), *extra), latest
+
+
+def post_validators(post_id, *extra):
+    """
+    Валидаторы поста: правка, комментарии, версии автора и группы.
+
+    Для несуществующего поста возвращает None.
+    """
+    post = Post.objects.filter(pk=post_id).annotate(
+        latest_comment=Max('comments__created')
+    ).only('author_id', 'group_id', 'edited', 'comments_count').first()
+    if post is None:
+        return None
+    last_modified = max(filter(None, (post.edited, post.latest_comment)))
+    return (
+        make_etag(
+            post.pk, last_modified, post.comments_count,
+            cards.post_version(post),
+            # счетчики подписчиков автора на странице поста
+            page_cache.generation((f'author:{post.author_id}',)),
+            *extra
+        ),
+        last_modified,
+    )
+
+
+def patch_caching(request, response):
+    """Разрешает хранить ответ гостя прокси, а вошедшего - браузеру."""
+    if request.user.is_authenticated:
+        patch_cache_control(response, private=True, no_cache=True)
+    else:
+        patch_cache_control(
+            response, public=True, max_age=0,
+            s_maxage=constants.PROXY_CACHE_MAX_AGE,
+        )
+    patch_vary_headers(response, ('Cookie',))
+
+
+def conditional(validators):
+    """
+    Отвечает 304, если копия клиента не устарела, и ставит валидаторы.
+
+    ``validators(request, *args, **kwargs)`` возвращает пару
+    ``(etag, last_modified)`` или ``None``, если проверять нечего,
+    например объекта нет и view ответит 404.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            found = validators(request, *args, **kwargs)
+            if found is None:
+                return view(request, *args, **kwargs)
+            etag, last_modified = found
+            etag = quote_etag(etag)
+            timestamp = None
+            if last_modified is not None:
+                timestamp = calendar.timegm(last_modified.utctimetuple())
+            response = get_conditional_response(
+                request, etag=etag, last_modified=timestamp
+            )
+            if response is None:
+                response = view(request, *args, **kwargs)
+            if response.status_code in (200, 304):
+                response['ETag'] = etag
+                if timestamp is not None:
+                    response['Last-Modified'] = http_date(timestamp)
+                patch_caching(request, response)
+            return response
+        return wrapper
+    return decorator
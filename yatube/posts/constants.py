@@ -2,3 +2,46 @@
 
 # количество постов на странице
 COUNT_POSTS_PAGE: int = 10
+
+# сколько номеров страниц показывать с каждой стороны от текущей
+PAGE_WINDOW: int = 2
+
+# количество комментариев на одной странице под постом
+COUNT_COMMENTS_PAGE: int = 20
+
+# число подписчиков, начиная с которого посты автора не раскладываются
+# по лентам при публикации, а подмешиваются в ленту при чтении
+TIMELINE_FANOUT_LIMIT: int = 1000
+
+# время жизни закэшированной карточки поста, секунд
+CARD_CACHE_TIMEOUT: int = 60 * 60 * 24
+
+# время жизни закэшированной страницы ленты, секунд; свежесть
+# обеспечивается сменой поколения данных, а не истечением срока
+FEED_CACHE_TIMEOUT: int = 60 * 60 * 6
+
+# сколько устаревшая страница ленты еще может отдаваться, пока одна из
+# копий перестраивает ее, секунд
+FEED_CACHE_GRACE: int = 60 * 10
+
+# предельное время перестройки страницы ленты под блокировкой, секунд
+FEED_CACHE_LOCK_TIMEOUT: int = 30
+
+# сколько секунд общий прокси-кэш может отдавать страницу гостю
+# без проверки; браузеры проверяют страницу при каждом показе
+PROXY_CACHE_MAX_AGE: int = 60
+
+# размер и параметры миниатюры картинки поста;
+# должны совпадать с тегом thumbnail в шаблонах постов
+THUMBNAIL_GEOMETRY: str = '960x339'
+THUMBNAIL_OPTIONS: dict = {'crop': 'center', 'upscale': True}
+
+# ширины копий картинки поста для srcset; последняя совпадает с миниатюрой
+IMAGE_VARIANT_WIDTHS: tuple = (320, 640, 960)
+
+# вес одного вхождения слова в текст поста и в комментарий при поиске
+SEARCH_TEXT_WEIGHT: int = 3
+SEARCH_COMMENT_WEIGHT: int = 1
+
+# наибольшее число слов запроса, по которым ведется поиск
+SEARCH_MAX_TERMS: int = 10
@@ -0,0 +1,95 @@
+"""
+Денормализованные счетчики постов, комментариев и подписок.
+
+Счетчики меняются атомарными ``UPDATE ... SET n = n + 1`` из обработчиков
+сигналов, а команда ``recount`` пересчитывает их заново при расхождении.
+"""
+from django.contrib.auth import get_user_model
+from django.db import router
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Comment, Follow, Group, Post, UserCounters
+
+User = get_user_model()
+
+
+def _count(queryset, field):
+    """Подзапрос числа строк, связанных с внешней записью по полю."""
+    counted = queryset.filter(**{field: OuterRef('pk')}).order_by().values(
+        field
+    ).annotate(total=Count('pk')).values('total')
+    return Coalesce(Subquery(counted, output_field=IntegerField()), 0)
+
+
+def _user_totals():
+    # первичный ключ UserCounters совпадает с id пользователя
+    return {
+        'posts_count': _count(Post.objects.all(), 'author'),
+        'followers_count': _count(Follow.objects.all(), 'author'),
+        'following_count': _count(Follow.objects.all(), 'user'),
+    }
+
+
+def recount_user(user_id):
+    """Пересчитывает счетчики пользователя с нуля."""
+    # читаем из той же базы, куда пишем: реплика может отставать
+    db = router.db_for_write(UserCounters)
+    if not User.objects.using(db).filter(pk=user_id).exists():
+        return None
+    UserCounters.objects.using(db).get_or_create(user_id=user_id)
+    counters = UserCounters.objects.using(db).filter(user_id=user_id)
+    counters.update(**_user_totals())
+    return counters.get()
+
+
+def create_user(user_id):
+    """Нулевые счетчики нового пользователя."""
+    UserCounters.objects.create(user_id=user_id)
+
+
+def for_user(user):
+    """Счетчики пользователя; строки старых пользователей - при обращении."""
+    counters = UserCounters.objects.filter(user=user).first()
+    return counters or recount_user(user.pk)
+
+
+def add_user(user_id, field, delta):
+    updated = UserCounters.objects.filter(user_id=user_id).update(
+        **{field: F(field) + delta}
+    )
+    if not updated and delta > 0:
+        # строки еще нет: пересчет уже учтет новую запись
+        recount_user(user_id)
+
+
+def add_group(group_id, delta):
+    if group_id is not None:
+        Group.objects.filter(pk=group_id).update(
+            posts_count=F('posts_count') + delta
+        )
+
+
+def add_post_comments(post_id, delta):
+    Post.objects.filter(pk=post_id).update(
+        comments_count=F('comments_count') + delta
+    )
+
+
+def recount_all():
+    """Пересчитывает все счетчики."""
+    Group.objects.update(posts_count=_count(Post.objects.all(), 'group'))
+    Post.objects.update(
+        comments_count=_count(Comment.objects.all(), 'post')
+    )
+    missing = User.objects.filter(counters__isnull=True).values_list(
+        'pk', flat=True
+    )
+    # пачками: созданные строки выпадают из выборки missing,
+    # а явный batch_size в Django 2.2 не учитывает пределы SQLite
+    while True:
+        batch = [UserCounters(user_id=pk) for pk in missing[:1000]]
+        if not batch:
+            break
+        UserCounters.objects.bulk_create(batch, ignore_conflicts=True)
+    UserCounters.objects.update(**_user_totals())
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from posts import timeline
+from posts.models import Follow
+
+
+class Command(BaseCommand):
+    help = 'Заполняет ленты подписок по существующим подпискам.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            help='Пересобрать ленту только этого пользователя (username).',
+        )
+
+    def handle(self, *args, **options):
+        follows = Follow.objects.order_by('pk')
+        if options['user']:
+            follows = follows.filter(user__username=options['user'])
+        timeline.rebuild(follows)
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано подписок: {follows.count()}'
+        ))
@@ -0,0 +1,131 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from django.template.backends.django import DjangoTemplates
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+from posts import cards
+from posts.models import Group, Post
+
+User = get_user_model()
+
+LOADERS = {
+    'uncached': [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ],
+}
+LOADERS['cached'] = [('django.template.loaders.cached.Loader',
+                      LOADERS['uncached'])]
+
+# прежняя отрисовка: include в цикле ленты со ссылками в каждой карточке
+BEFORE = (
+    '{% include "posts/includes/card_post.html" '
+    'with show_author=show_author show_group=show_group %}'
+)
+
+
+def _engine(loaders):
+    return DjangoTemplates({
+        'NAME': 'bench_cards',
+        'DIRS': settings.TEMPLATES[0]['DIRS'],
+        'APP_DIRS': False,
+        'OPTIONS': {'loaders': loaders, 'debug': False},
+    })
+
+
+def _jinja_engine():
+    try:
+        from core.jinja import Jinja2
+    except ImportError:
+        # Jinja2 не установлен: сравниваются только шаблоны Django
+        return None
+    params = dict(settings.JINJA2_TEMPLATES, NAME='bench_cards')
+    del params['BACKEND']
+    return Jinja2(params)
+
+
+def _posts(count):
+    # посты в памяти: замеряется только отрисовка, без базы
+    author = User(username='author', first_name='Лев', last_name='Толстой')
+    group = Group(title='Классика', slug='classics')
+    return [
+        Post(
+            pk=number, author=author, group=group, pub_date=timezone.now(),
+            text=f'Пост номер {number}\nвторая строка',
+        )
+        for number in range(1, count + 1)
+    ]
+
+
+def _renderers(engine, posts, request):
+    before = engine.from_string(BEFORE)
+    options = cards.card_options(request.resolver_match.view_name)
+    return {
+        'before': lambda: [
+            before.render({'post': post, 'request': request, **options})
+            for post in posts
+        ],
+        'after': lambda: cards.render_html(
+            posts, request, **options,
+            template=engine.get_template(cards.CARD_TEMPLATE),
+        ),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает стоимость отрисовки карточек постов на странице '
+        'ленты: прежний include в цикле против общего контекста '
+        'cards.render_html, с кэшем скомпилированных шаблонов и без, '
+        'и те же карточки на Jinja2.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cards', type=int, default=10)
+        parser.add_argument(
+            '--repeat', type=int, default=200,
+            help='Сколько раз отрисовать страницу.'
+        )
+
+    def handle(self, *args, **options):
+        request = RequestFactory().get(reverse('posts:index'))
+        request.resolver_match = resolve(request.path)
+        request.user = AnonymousUser()
+        posts = _posts(options['cards'])
+        self.stdout.write(
+            f'{"loader":<9} {"mode":<7} {"page, ms":>9} {"card, us":>9}'
+        )
+        for loader, loaders in LOADERS.items():
+            renderers = _renderers(_engine(loaders), posts, request)
+            html = {}
+            for mode, render in renderers.items():
+                html[mode] = self.measure(
+                    loader, mode, render, len(posts), options['repeat']
+                )
+            if html['before'] != html['after']:
+                raise CommandError('Карточки до и после различаются.')
+        engine = _jinja_engine()
+        if engine is not None:
+            template = engine.get_template(cards.CARD_TEMPLATE)
+            links = cards.card_options(request.resolver_match.view_name)
+            self.measure('jinja2', 'after', lambda: cards.render_html(
+                posts, request, **links, template=template,
+            ), len(posts), options['repeat'])
+
+    def measure(self, loader, mode, render, count, repeat):
+        html = render()
+        started = time.perf_counter()
+        for _ in range(repeat):
+            render()
+        page = (time.perf_counter() - started) / repeat
+        self.stdout.write(
+            f'{loader:<9} {mode:<7} {page * 1000:>9.3f} '
+            f'{page / count * 10 ** 6:>9.1f}'
+        )
+        return html
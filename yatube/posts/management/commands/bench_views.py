@@ -0,0 +1,162 @@
+import json
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import override_settings
+
+from core.benchmarks import compare, portable
+from posts import benchmarks
+
+# общий эталон в репозитории: только метрики, не зависящие от машины
+BASELINE = os.path.join(settings.BASE_DIR, 'benchmarks', 'bench_views.json')
+
+# эталон этой машины со временем и памятью, в репозиторий не попадает
+LOCAL_BASELINE = os.path.join(
+    settings.BASE_DIR, 'benchmarks', 'bench_views.local.json'
+)
+
+# кэш процесса: замеры чистят кэш и не должны трогать общий
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет view приложения posts на данных разного объема: '
+        'число SQL-запросов, время ответа и отрисовки шаблонов, '
+        'пик памяти. Завершается ошибкой, если запросов стало больше, '
+        'чем в общем эталоне из репозитория. Время и память зависят '
+        'от машины: они сравниваются с эталоном этой машины, который '
+        'снимает --save, и их регрессии только выводятся, а с '
+        '--strict-timings тоже роняют команду. '
+        'Работает с временными базами, рабочая база не меняется.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', nargs='+', choices=benchmarks.SIZES,
+            default=['small', 'medium'],
+        )
+        parser.add_argument(
+            '--views', nargs='+', choices=benchmarks.VIEWS,
+            default=list(benchmarks.VIEWS),
+        )
+        parser.add_argument('--repeat', type=int, default=10)
+        parser.add_argument('--baseline', default=BASELINE)
+        parser.add_argument('--local-baseline', default=LOCAL_BASELINE)
+        parser.add_argument(
+            '--threshold', type=float, default=0.25,
+            help='Допустимый рост времени и памяти, доля от эталона.'
+        )
+        parser.add_argument(
+            '--save', action='store_true',
+            help='Записать результаты в эталоны вместо сравнения.'
+        )
+        parser.add_argument(
+            '--strict-timings', action='store_true',
+            help='Считать ошибкой и регрессии времени и памяти.'
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Замер рассчитан на SQLite.')
+        # без debug toolbar и записи всех SQL, как в боевом профиле
+        settings.DEBUG = False
+        results = {}
+        name = connection.settings_dict['NAME']
+        directory = tempfile.mkdtemp()
+        try:
+            with override_settings(CACHES=CACHES):
+                for size in options['sizes']:
+                    self.use_database(os.path.join(directory, size))
+                    call_command('migrate', verbosity=0)
+                    benchmarks.generate(size)
+                    for view, metrics in benchmarks.run(
+                        options['repeat'], options['views']
+                    ).items():
+                        results[f'{size}/{view}'] = metrics
+        finally:
+            self.use_database(name)
+            shutil.rmtree(directory, ignore_errors=True)
+        self.report(results)
+        baselines = (
+            (options['baseline'], portable(results)),
+            (options['local_baseline'], results),
+        )
+        if options['save']:
+            for path, saved in baselines:
+                self.save(path, self.load(path), saved, options)
+            return
+        problems, timings = (
+            compare(
+                self.comparable(self.load(path), path), compared,
+                options['threshold'],
+            )
+            for path, compared in baselines
+        )
+        # общие метрики уже сравнены с эталоном репозитория
+        timings = [problem for problem in timings if problem not in problems]
+        if timings and not options['strict_timings']:
+            self.stderr.write(
+                'Время и память хуже эталона этой машины (возможен шум):\n'
+                + '\n'.join(timings)
+            )
+            timings = []
+        problems += timings
+        if problems:
+            raise CommandError('Регрессия:\n' + '\n'.join(problems))
+        self.stdout.write(self.style.SUCCESS('Регрессий нет.'))
+
+    def use_database(self, name):
+        connection.close()
+        connection.settings_dict['NAME'] = name
+
+    def report(self, results):
+        self.stdout.write(
+            f'{"scenario":<22} {"queries":>7} {"wall, ms":>9} '
+            f'{"render, ms":>10} {"peak, KiB":>9}'
+        )
+        for scenario, metrics in results.items():
+            self.stdout.write(
+                f'{scenario:<22} {metrics["queries"]:>7} '
+                f'{metrics["wall_ms"]:>9.2f} {metrics["render_ms"]:>10.2f} '
+                f'{metrics["peak_kib"]:>9}'
+            )
+
+    def load(self, path):
+        if not os.path.exists(path):
+            return {'sizes': {}, 'results': {}}
+        with open(path, encoding='utf-8') as stream:
+            return json.load(stream)
+
+    def comparable(self, baseline, path):
+        """Результаты эталона, снятые на данных того же объема."""
+        sizes = {
+            size for size, parameters in baseline['sizes'].items()
+            if parameters == benchmarks.SIZES.get(size)
+        }
+        if not baseline['results']:
+            self.stderr.write(f'Эталона {path} нет, сравнивать не с чем.')
+        return {
+            scenario: metrics
+            for scenario, metrics in baseline['results'].items()
+            if scenario.split('/')[0] in sizes
+        }
+
+    def save(self, path, baseline, results, options):
+        for size in options['sizes']:
+            baseline['sizes'][size] = benchmarks.SIZES[size]
+        baseline['results'].update(results)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as stream:
+            json.dump(baseline, stream, indent=2, sort_keys=True)
+            stream.write('\n')
+        self.stdout.write(self.style.SUCCESS(f'Эталон записан в {path}'))
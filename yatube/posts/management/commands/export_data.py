@@ -0,0 +1,39 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts import bulk
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает пользователей, сообщества, посты, комментарии '
+        'и подписки в файлы JSON Lines или CSV, по файлу на таблицу.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory')
+        parser.add_argument(
+            '--format', choices=bulk.FORMATS, default='jsonl'
+        )
+        parser.add_argument(
+            '--tables', nargs='+', choices=bulk.TABLES,
+            default=list(bulk.TABLES)
+        )
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        os.makedirs(options['directory'], exist_ok=True)
+        for name in options['tables']:
+            path = os.path.join(
+                options['directory'], f'{name}.{options["format"]}'
+            )
+            started = time.perf_counter()
+            with open(path, 'w', encoding='utf-8', newline='') as stream:
+                total = bulk.export_table(
+                    name, stream, options['format'], options['batch_size']
+                )
+            rate = total / max(time.perf_counter() - started, 1e-6)
+            self.stdout.write(f'{name}: {total} строк, {rate:.0f} строк/с')
+        self.stdout.write(self.style.SUCCESS('Выгрузка завершена'))
@@ -0,0 +1,76 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts import bulk
+from posts.synthetic import PASSWORD, Generator
+
+
+class Command(BaseCommand):
+    help = (
+        'Создает большой набор данных со степенными распределениями: '
+        'активные авторы, популярные сообщества и авторы с множеством '
+        'подписчиков, вирусные посты с огромными ветками комментариев.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument('--groups', type=int, default=100)
+        parser.add_argument('--posts', type=int, default=100000)
+        parser.add_argument(
+            '--follows', type=int, default=200000,
+            help='Примерное общее число подписок.'
+        )
+        parser.add_argument('--comments', type=int, default=200000)
+        parser.add_argument('--viral-posts', type=int, default=10)
+        parser.add_argument(
+            '--viral-comments', type=int, default=5000,
+            help='Комментариев под каждым вирусным постом.'
+        )
+        parser.add_argument(
+            '--exponent', type=float, default=1.1,
+            help='Показатель степенных распределений.'
+        )
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='За сколько дней распределены публикации.'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--skip-rebuild', action='store_true',
+            help='Не пересобирать счетчики, ленты и поисковый индекс.'
+        )
+
+    def handle(self, *args, **options):
+        generator = Generator(
+            users=options['users'],
+            groups=options['groups'],
+            posts=options['posts'],
+            follows=options['follows'],
+            comments=options['comments'],
+            viral_posts=options['viral_posts'],
+            viral_comments=options['viral_comments'],
+            exponent=options['exponent'],
+            days=options['days'],
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+        )
+        started = time.perf_counter()
+
+        def report(name, total):
+            nonlocal started
+            rate = total / max(time.perf_counter() - started, 1e-6)
+            self.stdout.write(f'{name}: {total} строк, {rate:.0f} строк/с')
+            started = time.perf_counter()
+
+        generator.run(report)
+        if not options['skip_rebuild']:
+            bulk.rebuild_derived()
+            self.stdout.write(
+                'Производные данные пересобраны за '
+                f'{time.perf_counter() - started:.1f} с'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово. Пароль созданных пользователей: {PASSWORD}'
+        ))
@@ -0,0 +1,75 @@
+import os
+import time
+from contextlib import ExitStack
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import bulk
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает файлы export_data пачками bulk_create, затем '
+        'пересчитывает счетчики, ленты подписок и поисковый индекс.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory')
+        parser.add_argument(
+            '--format', choices=bulk.FORMATS, default='jsonl'
+        )
+        parser.add_argument(
+            '--tables', nargs='+', choices=bulk.TABLES,
+            default=list(bulk.TABLES)
+        )
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument(
+            '--drop-indexes', action='store_true',
+            help='Удалить индексы лент на время загрузки и создать заново.'
+        )
+        parser.add_argument(
+            '--ignore-conflicts', action='store_true',
+            help='Пропускать строки, которые уже есть в базе.'
+        )
+        parser.add_argument(
+            '--skip-rebuild', action='store_true',
+            help='Не пересобирать счетчики, ленты и поисковый индекс.'
+        )
+
+    def handle(self, *args, **options):
+        # загружаем в порядке TABLES, чтобы ссылки находили свои строки
+        names = [name for name in bulk.TABLES if name in options['tables']]
+        paths = {
+            name: os.path.join(
+                options['directory'], f'{name}.{options["format"]}'
+            )
+            for name in names
+        }
+        missing = [path for path in paths.values() if not os.path.exists(path)]
+        if missing:
+            raise CommandError(f'Нет файлов: {", ".join(missing)}')
+        with ExitStack() as stack:
+            if options['drop_indexes']:
+                stack.enter_context(bulk.without_indexes(names))
+            for name in names:
+                self._import(name, paths[name], options)
+        if not options['skip_rebuild']:
+            started = time.perf_counter()
+            bulk.rebuild_derived()
+            self.stdout.write(
+                f'Производные данные пересобраны за '
+                f'{time.perf_counter() - started:.1f} с'
+            )
+        self.stdout.write(self.style.SUCCESS('Загрузка завершена'))
+
+    def _import(self, name, path, options):
+        started = time.perf_counter()
+        with open(path, encoding='utf-8', newline='') as stream:
+            total = bulk.import_table(
+                name,
+                bulk.read_rows(stream, options['format']),
+                options['batch_size'],
+                options['ignore_conflicts'],
+            )
+        rate = total / max(time.perf_counter() - started, 1e-6)
+        self.stdout.write(f'{name}: {total} строк, {rate:.0f} строк/с')
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from posts import search
+from posts.models import Post, SearchPosting
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает поисковый индекс постов и комментариев.'
+
+    def handle(self, *args, **options):
+        search.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Проиндексировано постов: {Post.objects.count()}, '
+            f'записей индекса: {SearchPosting.objects.count()}'
+        ))
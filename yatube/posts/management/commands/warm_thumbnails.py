@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from posts.models import Post
+from posts.thumbnails import pool
+
+
+class Command(BaseCommand):
+    help = 'Заранее готовит миниатюры картинок всех постов.'
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='').only('image').order_by('pk')
+        total = 0
+        for post in posts.iterator():
+            pool.submit_post(post)
+            total += 1
+        pool.join()
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано картинок: {total}'
+        ))
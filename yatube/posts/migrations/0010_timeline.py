@@ -0,0 +1,76 @@
+# Generated by Django 2.2.16 on 2026-10-17 04:19
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count
+
+# TIMELINE_FANOUT_LIMIT на момент миграции
+FANOUT_LIMIT = 1000
+
+
+def fill_timeline(apps, schema_editor):
+    # ленты существующих подписок, как timeline.rebuild_all
+    Follow = apps.get_model('posts', 'Follow')
+    Post = apps.get_model('posts', 'Post')
+    TimelineEntry = apps.get_model('posts', 'TimelineEntry')
+    popular = Follow.objects.values('author_id').annotate(
+        followers=Count('pk')
+    ).filter(followers__gte=FANOUT_LIMIT).values('author_id')
+    Follow.objects.filter(author_id__in=popular).update(fanout=False)
+    quote = schema_editor.connection.ops.quote_name
+    entry, follow, post = (
+        quote(model._meta.db_table)
+        for model in (TimelineEntry, Follow, Post)
+    )
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {entry} (user_id, post_id, author_id, pub_date) '
+            f'SELECT f.user_id, p.id, p.author_id, p.pub_date '
+            f'FROM {follow} f JOIN {post} p ON p.author_id = f.author_id '
+            f'WHERE f.fanout = %s',
+            [True],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0009_auto_20220818_1043'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='follow',
+            name='fanout',
+            field=models.BooleanField(default=True, help_text='Посты автора раскладываются в ленту подписчика', verbose_name='Рассылка при публикации'),
+        ),
+        migrations.CreateModel(
+            name='TimelineEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pub_date', models.DateTimeField(verbose_name='Дата публикации')),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline_entries', to='posts.Post', verbose_name='Пост')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Запись ленты',
+                'verbose_name_plural': 'Лента подписок',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='timelineentry',
+            index=models.Index(fields=['user', '-pub_date', '-post'], name='timeline_user_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='timelineentry',
+            index=models.Index(fields=['user', 'author'], name='timeline_user_author_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='timelineentry',
+            constraint=models.UniqueConstraint(fields=('user', 'post'), name='unique_timeline_entry'),
+        ),
+        migrations.RunPython(fill_timeline, migrations.RunPython.noop),
+    ]
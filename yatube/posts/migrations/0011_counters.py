@@ -0,0 +1,56 @@
+# Generated by Django 2.2.16 on 2026-10-17 04:20
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_counters(apps, schema_editor):
+    Group = apps.get_model('posts', 'Group')
+    Post = apps.get_model('posts', 'Post')
+    Comment = apps.get_model('posts', 'Comment')
+
+    def count(model, field):
+        counted = model.objects.filter(**{field: OuterRef('pk')}).order_by(
+        ).values(field).annotate(total=Count('pk')).values('total')
+        return Coalesce(Subquery(counted, output_field=IntegerField()), 0)
+
+    Group.objects.update(posts_count=count(Post, 'group'))
+    Post.objects.update(comments_count=count(Comment, 'post'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0011_update_proxy_permissions'),
+        ('posts', '0010_timeline'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserCounters',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='counters', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+                ('posts_count', models.IntegerField(default=0, verbose_name='Число постов')),
+                ('followers_count', models.IntegerField(default=0, verbose_name='Число подписчиков')),
+                ('following_count', models.IntegerField(default=0, verbose_name='Число подписок')),
+            ],
+            options={
+                'verbose_name': 'Счетчики пользователя',
+                'verbose_name_plural': 'Счетчики пользователей',
+            },
+        ),
+        migrations.AddField(
+            model_name='group',
+            name='posts_count',
+            field=models.IntegerField(default=0, verbose_name='Число постов'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='comments_count',
+            field=models.IntegerField(default=0, verbose_name='Число комментариев'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 2.2.16 on 2026-10-17 04:32
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0011_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageVariant',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=255, verbose_name='Исходная картинка')),
+                ('image', models.ImageField(max_length=255, upload_to='', verbose_name='Копия')),
+                ('width', models.PositiveIntegerField(verbose_name='Ширина')),
+                ('height', models.PositiveIntegerField(verbose_name='Высота')),
+                ('format', models.CharField(max_length=10, verbose_name='Формат')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='variants', to='posts.Post', verbose_name='Пост')),
+            ],
+            options={
+                'verbose_name': 'Вариант картинки',
+                'verbose_name_plural': 'Варианты картинок',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='imagevariant',
+            constraint=models.UniqueConstraint(fields=('post', 'width', 'format'), name='unique_image_variant'),
+        ),
+    ]
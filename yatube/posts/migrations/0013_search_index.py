@@ -0,0 +1,31 @@
+# Generated by Django 2.2.16 on 2026-10-17 04:34
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0012_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchPosting',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64, verbose_name='Основа слова')),
+                ('weight', models.IntegerField(default=0, verbose_name='Вес')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_postings', to='posts.Post', verbose_name='Пост')),
+            ],
+            options={
+                'verbose_name': 'Запись поискового индекса',
+                'verbose_name_plural': 'Поисковый индекс',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='searchposting',
+            constraint=models.UniqueConstraint(fields=('term', 'post'), name='unique_search_posting'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 2.2.16 on 2026-10-17 04:54
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def copy_pub_date(apps, schema_editor):
+    # старые посты считаются не изменявшимися после публикации
+    Post = apps.get_model('posts', 'Post')
+    Post.objects.update(edited=F('pub_date'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0014_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='edited',
+            field=models.DateTimeField(auto_now=True, verbose_name='Дата изменения'),
+        ),
+        migrations.RunPython(copy_pub_date, migrations.RunPython.noop),
+    ]
@@ -5,7 +5,27 @@ from django.db.models import UniqueConstraint
 User = get_user_model()
 
 
-class Group(models.Model):
+class CountersMixin:
+    """
+    Не перезаписывает денормализованные счетчики при сохранении.
+
+    Счетчики меняются только атомарными UPDATE, поэтому при
+    редактировании записи они исключаются из сохраняемых полей.
+    """
+
+    counter_fields = ()
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.counter_fields
+            ]
+        super().save(*args, **kwargs)
+
+
+class Group(CountersMixin, models.Model):
     """
     Сообщества пользователей.
 
@@ -14,12 +34,16 @@ class Group(models.Model):
     Ключевые аргументы:
     title - имя сообщества
     slug - url
-    description - описание сообщества.
+    description - описание сообщества
+    posts_count - число постов сообщества.
     """
 
     title = models.CharField(max_length=200)
     slug = models.SlugField(max_length=200, unique=True)
     description = models.TextField()
+    posts_count = models.IntegerField('Число постов', default=0)
+
+    counter_fields = ('posts_count',)
 
     class Meta:
         verbose_name = 'Сообщество'
@@ -29,15 +53,18 @@ class Group(models.Model):
         return self.title
 
 
-class Post(models.Model):
+class Post(CountersMixin, models.Model):
     """
     Посты пользователей.
 
     Ключевые аргументы:
     text - текст поста
     pub_date - дата публикации
+    edited - дата последнего изменения
     author - привязка к автору
-    group - привязка к сообществу/группе.
+    group - привязка к сообществу/группе
+    image - картинка поста
+    comments_count - число комментариев.
     """
 
     text = models.TextField(
@@ -47,6 +74,7 @@ class Post(models.Model):
         auto_now_add=True,
         help_text='Дата публикации'
     )
+    edited = models.DateTimeField('Дата изменения', auto_now=True)
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -69,15 +97,57 @@ class Post(models.Model):
         blank=True,
         help_text='Загрузите картинку'
     )
+    comments_count = models.IntegerField('Число комментариев', default=0)
+
+    counter_fields = ('comments_count',)
 
     class Meta:
         ordering = ('-pub_date',)
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
+        # по индексу на каждую ленту в порядке FEED_ORDERING
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-id'],
+                name='post_pub_date_idx'
+            ),
+            models.Index(
+                fields=['group', '-pub_date', '-id'],
+                name='post_group_pub_date_idx'
+            ),
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='post_author_pub_date_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.text[:15]
 
+    def image_srcsets(self):
+        """
+        Атрибуты srcset готовых вариантов картинки по форматам.
+
+        Под ключом src - самая широкая копия в JPEG для браузеров
+        без поддержки srcset. Пока вариантов нет, словарь пуст.
+        """
+        if not self.image:
+            return {}
+        srcsets = {}
+        variants = sorted(
+            (v for v in self.variants.all() if v.source == self.image.name),
+            key=lambda variant: variant.width
+        )
+        for variant in variants:
+            srcsets.setdefault(variant.format, []).append(
+                f'{variant.image.url} {variant.width}w'
+            )
+        srcsets = {key: ', '.join(value) for key, value in srcsets.items()}
+        for variant in variants:
+            if variant.format == 'jpeg':
+                srcsets['src'] = variant.image.url
+        return srcsets
+
 
 class Comment(models.Model):
     """Комментарии пользователей"""
@@ -105,6 +175,15 @@ class Comment(models.Model):
         verbose_name='Дата комментария'
     )
 
+    class Meta:
+        # комментарии поста в порядке COMMENT_ORDERING
+        indexes = [
+            models.Index(
+                fields=['post', 'created', 'id'],
+                name='comment_post_created_idx'
+            ),
+        ]
+
     def __str__(self):
         return self.text
 
@@ -126,6 +205,11 @@ class Follow(models.Model):
         related_name='following',
         help_text='Избранное'
     )
+    fanout = models.BooleanField(
+        'Рассылка при публикации',
+        default=True,
+        help_text='Посты автора раскладываются в ленту подписчика'
+    )
 
     class Meta:
         constraints = [
@@ -134,3 +218,147 @@ class Follow(models.Model):
                 name='unique_follow'
             )
         ]
+
+
+class UserCounters(models.Model):
+    """
+    Счетчики пользователя.
+
+    Поддерживаются сигналами при публикации, удалении и подписках,
+    чтобы страницы не считали COUNT при каждом показе.
+    """
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='counters',
+        verbose_name='Пользователь'
+    )
+    posts_count = models.IntegerField('Число постов', default=0)
+    followers_count = models.IntegerField('Число подписчиков', default=0)
+    following_count = models.IntegerField('Число подписок', default=0)
+
+    class Meta:
+        verbose_name = 'Счетчики пользователя'
+        verbose_name_plural = 'Счетчики пользователей'
+
+
+class TimelineEntry(models.Model):
+    """
+    Запись ленты подписок пользователя.
+
+    Лента заполняется при публикации поста (fan-out-on-write),
+    поэтому страница подписок читается из одного индекса.
+
+    Ключевые аргументы:
+    user - владелец ленты
+    post - пост автора, на которого подписан пользователь
+    author - автор поста, нужен для очистки ленты при отписке
+    pub_date - копия даты публикации поста для сортировки.
+    """
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        verbose_name='Пользователь'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        verbose_name='Пост'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Автор'
+    )
+    pub_date = models.DateTimeField('Дата публикации')
+
+    class Meta:
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Лента подписок'
+        constraints = [
+            UniqueConstraint(
+                fields=['user', 'post'],
+                name='unique_timeline_entry'
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', '-pub_date', '-post'],
+                name='timeline_user_pub_date_idx'
+            ),
+            models.Index(
+                fields=['user', 'author'],
+                name='timeline_user_author_idx'
+            ),
+        ]
+
+
+class ImageVariant(models.Model):
+    """
+    Уменьшенная копия картинки поста.
+
+    Ключевые аргументы:
+    post - пост, к картинке которого относится копия
+    source - имя файла исходной картинки
+    image - файл копии
+    width, height - размеры копии
+    format - формат файла (jpeg, webp).
+    """
+
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='variants',
+        verbose_name='Пост'
+    )
+    source = models.CharField('Исходная картинка', max_length=255)
+    image = models.ImageField('Копия', max_length=255)
+    width = models.PositiveIntegerField('Ширина')
+    height = models.PositiveIntegerField('Высота')
+    format = models.CharField('Формат', max_length=10)
+
+    class Meta:
+        verbose_name = 'Вариант картинки'
+        verbose_name_plural = 'Варианты картинок'
+        constraints = [
+            UniqueConstraint(
+                fields=['post', 'width', 'format'],
+                name='unique_image_variant'
+            )
+        ]
+
+
+class SearchPosting(models.Model):
+    """
+    Запись обратного индекса поиска: основа слова в посте.
+
+    Ключевые аргументы:
+    term - основа слова
+    post - пост, в тексте или комментариях которого встречается слово
+    weight - вес вхождений; слова из текста поста весят больше.
+    """
+
+    term = models.CharField('Основа слова', max_length=64)
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='search_postings',
+        verbose_name='Пост'
+    )
+    weight = models.IntegerField('Вес', default=0)
+
+    class Meta:
+        verbose_name = 'Запись поискового индекса'
+        verbose_name_plural = 'Поисковый индекс'
+        constraints = [
+            UniqueConstraint(
+                fields=['term', 'post'],
+                name='unique_search_posting'
+            )
+        ]
@@ -0,0 +1,146 @@
+"""
+Кэш страниц лент с инвалидацией по поколениям.
+
+Каждая страница зависит от набора областей данных: ``posts`` (все посты),
+``group:<id>``, ``author:<id>``, ``users`` (имена пользователей),
+``groups`` (названия сообществ), ``comments`` (число комментариев,
+которое выводится только в JSON API).
+Изменение данных меняет поколение затронутых областей, и закэшированная
+страница перестает считаться свежей сразу после изменения, поэтому срок
+хранения может быть большим.
+
+Устаревшую страницу перестраивает только один запрос, захвативший
+блокировку; остальные в это время получают прежнюю копию
+(stale-while-revalidate). Страница, прочитанная с реплики, считается
+свежей не дольше ``REPLICA_STICKY_SECONDS``: реплика могла еще не получить
+изменение, сменившее поколение. Исход каждого запроса попадает в заголовок
+``X-Feed-Cache`` и в метрику ``yatube_cache_requests_total`` процесса
+(``cache="feed_page"``): общий счетчик в кэше был бы записью на каждый
+запрос.
+"""
+import hashlib
+import time
+import uuid
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.encoding import iri_to_uri
+from django.utils.translation import get_language
+
+from core import metrics
+from core.db.replicas import reading_from_replica
+
+from . import constants
+
+HIT = 'hit'
+MISS = 'miss'
+STALE = 'stale'
+
+
+def _generation_key(scope):
+    return f'feed-generation:{scope}'
+
+
+def bump(*scopes):
+    """Начинает новое поколение для областей данных."""
+    cache.set_many(
+        {_generation_key(scope): uuid.uuid4().hex for scope in scopes},
+        None
+    )
+
+
+def bump_post_pages(post, *group_ids):
+    """Сбрасывает страницы лент, на которых выводится пост."""
+    group_ids = set(group_ids) | {post.group_id}
+    bump(
+        'posts',
+        f'author:{post.author_id}',
+        *(f'group:{pk}' for pk in group_ids if pk is not None)
+    )
+
+
+def generation(scopes):
+    """Текущее поколение набора областей данных."""
+    keys = [_generation_key(scope) for scope in scopes]
+    generations = cache.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            cache.add(key, uuid.uuid4().hex, None)
+            generations[key] = cache.get(key)
+    return '.'.join(generations[key] for key in keys)
+
+
+def page_key(request):
+    """Ключ страницы: адрес, пользователь и язык."""
+    url = hashlib.md5(
+        iri_to_uri(request.build_absolute_uri()).encode('ascii')
+    ).hexdigest()
+    user_id = request.user.pk if request.user.is_authenticated else 0
+    return f'feed-page:{url}:{user_id}:{get_language()}'
+
+
+def _cacheable(response):
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        and 'private' not in response.get('Cache-Control', ())
+    )
+
+
+def _fresh_until(timeout):
+    if reading_from_replica():
+        # реплика могла отстать от смены поколения
+        timeout = min(timeout, settings.REPLICA_STICKY_SECONDS)
+    return time.time() + timeout
+
+
+def _respond(response, outcome):
+    metrics.cache_outcome('feed_page', outcome)
+    response['X-Feed-Cache'] = outcome
+    return response
+
+
+def cache_feed(scopes, timeout=constants.FEED_CACHE_TIMEOUT):
+    """
+    Кэширует страницу ленты до смены поколения ее данных.
+
+    ``scopes(request, *args, **kwargs)`` возвращает области данных
+    страницы или ``None``, если страницу кэшировать не нужно.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            names = scopes(request, *args, **kwargs)
+            if names is None:
+                return view(request, *args, **kwargs)
+            current = generation(names)
+            key = page_key(request)
+            lock_key = f'{key}:lock'
+            entry = cache.get(key)
+            if entry is not None:
+                entry_generation, fresh_until, response = entry
+                if entry_generation == current and fresh_until > time.time():
+                    return _respond(response, HIT)
+                if not cache.add(
+                    lock_key, 1, constants.FEED_CACHE_LOCK_TIMEOUT
+                ):
+                    # страницу уже перестраивает другой запрос
+                    return _respond(response, STALE)
+            try:
+                response = view(request, *args, **kwargs)
+                if _cacheable(response):
+                    cache.set(
+                        key,
+                        (current, _fresh_until(timeout), response),
+                        timeout + constants.FEED_CACHE_GRACE
+                    )
+            finally:
+                if entry is not None:
+                    cache.delete(lock_key)
+            return _respond(response, MISS)
+        return wrapper
+    return decorator
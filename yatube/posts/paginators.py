@@ -0,0 +1,274 @@
+"""Постраничный вывод лент по курсору (keyset pagination)."""
+import base64
+import binascii
+import datetime
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.db.models import Q
+
+from . import constants
+
+# порядок записей в лентах: сначала новые, при равной дате - по id
+FEED_ORDERING = ('-pub_date', '-pk')
+
+# порядок комментариев: сначала старые
+COMMENT_ORDERING = ('created', 'pk')
+
+
+class InvalidCursor(Exception):
+    """Курсор поврежден или не подходит к выборке."""
+
+
+class CursorPaginator(Paginator):
+    """
+    Паджинатор, листающий выборку по ключу сортировки.
+
+    Страницы, открытые по курсору ``after``/``before``, выбираются условием
+    на ключ сортировки (для лент - ``(pub_date, id)``) вместо ``OFFSET``,
+    поэтому глубокие страницы стоят столько же, сколько первая.
+    Номера страниц ``?page=`` продолжают работать для старых ссылок.
+
+    С ``count_pages=False`` паджинатор не выполняет ``COUNT(*)``: со
+    страницей выбирается одна лишняя запись, по которой видно, есть ли
+    следующая, а ``num_pages`` - число страниц, известных по открытой.
+
+    Страницы остаются обычными ``Page``: курсоры соседних страниц
+    доступны в атрибутах ``next_cursor`` и ``previous_cursor``, окно
+    номеров для навигации - в ``page_window``.
+    """
+
+    def __init__(self, object_list, per_page, ordering=FEED_ORDERING,
+                 count_pages=True, **kwargs):
+        self.ordering = tuple(ordering)
+        self.count_pages = count_pages
+        self.known_pages = 1
+        super().__init__(
+            object_list.order_by(*self.ordering), per_page, **kwargs
+        )
+
+    @property
+    def num_pages(self):
+        if self.count_pages:
+            return super().num_pages
+        return self.known_pages
+
+    def validate_number(self, number):
+        if self.count_pages:
+            return super().validate_number(number)
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('Номер страницы - не целое число')
+        if number < 1:
+            raise EmptyPage('Номер страницы меньше 1')
+        return number
+
+    def get_page(self, number):
+        if self.count_pages:
+            return super().get_page(number)
+        # последняя страница неизвестна: вместо нее открывается первая
+        try:
+            return self.page(number)
+        except (PageNotAnInteger, EmptyPage):
+            return self.page(1)
+
+    def page(self, number):
+        if self.count_pages:
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        objects = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not objects and number > 1:
+            raise EmptyPage('На странице нет результатов')
+        return self._lookahead_page(objects, number)
+
+    def page_window(self, number):
+        """
+        Номера страниц вокруг number и крайние страницы.
+
+        По ``PAGE_WINDOW`` страниц с каждой стороны от текущей, первая
+        и последняя; пропуски обозначены None. Без подсчета записей
+        последняя страница неизвестна, и окно кончается следующей.
+        """
+        last = self.num_pages if self.count_pages else None
+        end = min(number + constants.PAGE_WINDOW, self.num_pages)
+        start = max(number - constants.PAGE_WINDOW, 1)
+        window = list(range(start, end + 1))
+        if start > 1:
+            window[:0] = [1] if start == 2 else [1, None]
+        if last is not None and end < last:
+            window += [last] if end == last - 1 else [None, last]
+        return window
+
+    def _lookahead_page(self, objects, number):
+        """Страница из per_page + 1 записей: лишняя - признак следующей."""
+        has_next = len(objects) > self.per_page
+        self.known_pages = number + has_next
+        return self._get_page(
+            objects[:self.per_page], number, self, has_next=has_next
+        )
+
+    @property
+    def key_fields(self):
+        return [name.lstrip('-') for name in self.ordering]
+
+    def page_after(self, cursor):
+        """
+        Страница, следующая за записью из курсора.
+
+        Есть ли следующая страница, решает лишняя выбранная запись, а не
+        номер из курсора: номер только выводится и мог устареть, если
+        посты добавлялись или удалялись.
+        """
+        number, values = self.decode_cursor(cursor)
+        objects = list(
+            self.object_list.filter(self._seek(values))[:self.per_page + 1]
+        )
+        if not objects:
+            return self._last_page(number, values)
+        has_next = len(objects) > self.per_page
+        if self.count_pages:
+            number = min(number + 1, self.num_pages)
+        else:
+            number += 1
+            self.known_pages = number + has_next
+        return self._get_page(
+            objects[:self.per_page], number, self, has_next=has_next
+        )
+
+    def _last_page(self, number, values):
+        """После записи из курсора ничего нет: страница, кончающаяся ею."""
+        # только filter и order_by: их повторяет и MergedFeed ленты подписок
+        objects = list(self.object_list.filter(
+            self._seek(values, backward=True, inclusive=True)
+        ).order_by(*self._reversed_ordering())[:self.per_page])
+        if not objects:
+            return self.page(1)
+        objects.reverse()
+        if self.count_pages:
+            number = min(number, self.num_pages)
+        else:
+            self.known_pages = number
+        return self._get_page(objects, number, self, has_next=False)
+
+    def page_before(self, cursor):
+        """
+        Страница, предшествующая записи из курсора.
+
+        Первая ли это страница, решает лишняя выбранная запись: по
+        устаревшему номеру из курсора записи перед страницей потерялись
+        бы, поэтому номер не меньше второй.
+        """
+        number, values = self.decode_cursor(cursor)
+        object_list = self.object_list.filter(
+            self._seek(values, backward=True)
+        ).order_by(*self._reversed_ordering())
+        objects = list(object_list[:self.per_page + 1])
+        if len(objects) <= self.per_page:
+            # дальше листать некуда - это первая страница
+            return self.page(1)
+        objects = objects[:self.per_page]
+        objects.reverse()
+        number = max(number - 1, 2)
+        # запись из курсора идет после страницы: следующая есть
+        self.known_pages = number + 1
+        return self._get_page(objects, number, self, has_next=True)
+
+    def _get_page(self, object_list, number, paginator, has_next=None):
+        page = super()._get_page(list(object_list), number, paginator)
+        if has_next is not None:
+            # известно по выбранным записям, а не по номеру страницы
+            page.has_next = lambda: has_next
+        page.page_window = self.page_window(number)
+        page.previous_cursor = None
+        page.next_cursor = None
+        if page.object_list and page.has_previous():
+            page.previous_cursor = self.encode_cursor(
+                number, page.object_list[0]
+            )
+        if page.object_list and page.has_next():
+            page.next_cursor = self.encode_cursor(
+                number, page.object_list[-1]
+            )
+        return page
+
+    def encode_cursor(self, number, obj):
+        """Непрозрачный курсор: номер страницы и ключ записи."""
+        values = []
+        for name in self.key_fields:
+            value = getattr(obj, name)
+            if isinstance(value, datetime.datetime):
+                value = value.isoformat()
+            values.append(value)
+        raw = json.dumps([number, values], separators=(',', ':'))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            number, values = json.loads(raw.decode())
+            number = int(number)
+        except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+            raise InvalidCursor(cursor)
+        if not isinstance(values, list) or (
+            len(values) != len(self.key_fields)
+        ):
+            raise InvalidCursor(cursor)
+        try:
+            values = [
+                self._to_python(name, value)
+                for name, value in zip(self.key_fields, values)
+            ]
+        except ValidationError:
+            raise InvalidCursor(cursor)
+        return max(number, 1), values
+
+    def _to_python(self, name, value):
+        opts = self.object_list.model._meta
+        try:
+            field = opts.pk if name == 'pk' else opts.get_field(name)
+        except FieldDoesNotExist:
+            # аннотация, например ранг поиска
+            return value
+        return field.to_python(value)
+
+    def _seek(self, values, backward=False, inclusive=False):
+        """Условие "строго после ключа" в порядке сортировки."""
+        condition = Q()
+        equal = Q()
+        for name, value in zip(self.ordering, values):
+            descending = name.startswith('-')
+            name = name.lstrip('-')
+            lookup = 'lt' if descending != backward else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        if inclusive:
+            # вместе с самой записью из курсора
+            condition |= equal
+        return condition
+
+    def _reversed_ordering(self):
+        return [
+            name[1:] if name.startswith('-') else f'-{name}'
+            for name in self.ordering
+        ]
+
+
+def paginate(request, object_list, per_page=constants.COUNT_POSTS_PAGE,
+             ordering=FEED_ORDERING, count_pages=True):
+    """Возвращает страницу выборки по параметрам запроса."""
+    paginator = CursorPaginator(
+        object_list, per_page, ordering, count_pages=count_pages
+    )
+    try:
+        if request.GET.get('after'):
+            return paginator.page_after(request.GET['after'])
+        if request.GET.get('before'):
+            return paginator.page_before(request.GET['before'])
+    except InvalidCursor:
+        pass
+    return paginator.get_page(request.GET.get('page'))
@@ -0,0 +1,171 @@
+"""
+Полнотекстовый поиск по постам и комментариям.
+
+Обратный индекс хранится в таблице ``SearchPosting``: для каждой основы
+слова (см. ``stemmer``) - посты, где она встречается, и вес вхождений.
+Индекс поста пересобирается при его сохранении, комментарии добавляют
+и вычитают свои слова. Поиск ранжирует посты по сумме весов найденных
+слов, умноженных на их редкость (IDF), и листается по ключу
+``(rank, id)`` тем же ``CursorPaginator``, что и ленты.
+"""
+import math
+import re
+from collections import Counter
+
+from django.db.models import Case, Count, F, IntegerField, Sum, Value, When
+
+from . import constants
+from .models import Comment, Post, SearchPosting
+from .stemmer import stem
+
+# порядок результатов поиска: сначала самые подходящие
+SEARCH_ORDERING = ('-rank', '-pk')
+
+WORD = re.compile(r'\w+')
+
+# частые слова, которые не помогают искать
+STOP_WORDS = frozenset((
+    'а', 'без', 'бы', 'в', 'во', 'вот', 'все', 'вы', 'да', 'для', 'до',
+    'его', 'ее', 'ей', 'если', 'есть', 'же', 'за', 'и', 'из', 'или', 'им',
+    'их', 'к', 'как', 'ко', 'ли', 'мне', 'мы', 'на', 'не', 'нет', 'ни',
+    'но', 'о', 'об', 'он', 'она', 'они', 'оно', 'от', 'по', 'при', 'с',
+    'со', 'так', 'то', 'ты', 'у', 'уже', 'что', 'это', 'я',
+))
+
+# длина основы ограничена полем term
+MAX_TERM_LENGTH = SearchPosting._meta.get_field('term').max_length
+
+
+def terms(text):
+    """Основы слов текста с числом вхождений."""
+    words = WORD.findall(text.lower().replace('ё', 'е'))
+    return Counter(
+        stem(word)[:MAX_TERM_LENGTH]
+        for word in words if word not in STOP_WORDS
+    )
+
+
+def _weights(text, comments):
+    weights = Counter()
+    for term, count in terms(text).items():
+        weights[term] += count * constants.SEARCH_TEXT_WEIGHT
+    for comment in comments:
+        for term, count in terms(comment).items():
+            weights[term] += count * constants.SEARCH_COMMENT_WEIGHT
+    return weights
+
+
+def index_post(post):
+    """Пересобирает индекс поста вместе с его комментариями."""
+    weights = _weights(
+        post.text, post.comments.values_list('text', flat=True)
+    )
+    SearchPosting.objects.filter(post=post).delete()
+    SearchPosting.objects.bulk_create(
+        SearchPosting(term=term, post=post, weight=weight)
+        for term, weight in weights.items()
+    )
+
+
+def add_comment(comment, sign=1):
+    """Добавляет (sign=1) или вычитает (sign=-1) слова комментария."""
+    weights = {
+        term: count * constants.SEARCH_COMMENT_WEIGHT * sign
+        for term, count in terms(comment.text).items()
+    }
+    postings = SearchPosting.objects.filter(post_id=comment.post_id)
+    existing = set(
+        postings.filter(term__in=weights).values_list('term', flat=True)
+    )
+    if existing:
+        # один UPDATE на все слова вместо запроса на каждое
+        postings.filter(term__in=existing).update(weight=F('weight') + Case(
+            *(When(term=term, then=Value(weights[term])) for term in existing),
+            output_field=IntegerField(),
+        ))
+    if sign > 0:
+        SearchPosting.objects.bulk_create(
+            (
+                SearchPosting(term=term, post_id=comment.post_id, weight=w)
+                for term, w in weights.items() if term not in existing
+            ),
+            ignore_conflicts=True,
+        )
+    else:
+        postings.filter(weight__lte=0).delete()
+
+
+def rebuild(posts=None, batch_size=500):
+    """
+    Пересобирает индекс постов (по умолчанию - всех).
+
+    Посты и их комментарии читаются пачками по ``batch_size``,
+    чтобы не делать запросов на каждый пост.
+    """
+    if posts is None:
+        SearchPosting.objects.all().delete()
+        posts = Post.objects.all()
+    posts = posts.order_by('pk').values_list('pk', 'text')
+    last = 0
+    while True:
+        batch = dict(posts.filter(pk__gt=last)[:batch_size])
+        if not batch:
+            return
+        last = max(batch)
+        comments = {pk: [] for pk in batch}
+        for post_id, text in Comment.objects.filter(
+            post_id__in=batch
+        ).values_list('post_id', 'text'):
+            comments[post_id].append(text)
+        SearchPosting.objects.filter(post_id__in=batch).delete()
+        SearchPosting.objects.bulk_create(
+            SearchPosting(term=term, post_id=pk, weight=weight)
+            for pk, text in batch.items()
+            for term, weight in _weights(text, comments[pk]).items()
+        )
+
+
+def query_terms(query):
+    """Основы слов запроса, не больше SEARCH_MAX_TERMS."""
+    return list(terms(query))[:constants.SEARCH_MAX_TERMS]
+
+
+def search(query):
+    """
+    Посты, подходящие к запросу, с рангом в аннотации ``rank``.
+
+    Ранг - целое число, чтобы ключ курсора сравнивался точно.
+    """
+    nothing = Post.objects.none().annotate(
+        rank=Value(0, output_field=IntegerField())
+    )
+    query = query_terms(query)
+    if not query:
+        return nothing
+    frequencies = dict(
+        SearchPosting.objects.filter(term__in=query).values('term').annotate(
+            posts=Count('pk')
+        ).values_list('term', 'posts')
+    )
+    if not frequencies:
+        return nothing
+    total = max(Post.objects.count(), 1)
+    idf = {
+        term: round(100 * math.log(1 + total / posts))
+        for term, posts in frequencies.items()
+    }
+    return Post.objects.filter(
+        search_postings__term__in=list(idf)
+    ).annotate(
+        rank=Sum(Case(
+            *(
+                When(
+                    search_postings__term=term,
+                    then=F('search_postings__weight') * weight,
+                )
+                for term, weight in idf.items()
+            ),
+            default=0,
+            output_field=IntegerField(),
+        ))
+    )
@@ -0,0 +1,139 @@
+"""Обработчики сигналов моделей постов."""
+import threading
+
+from django.db import transaction
+from django.db.models.signals import (
+    post_delete, post_init, post_save, pre_delete
+)
+from django.dispatch import receiver
+
+from . import cards, counters, page_cache, search, thumbnails, timeline
+from .models import Comment, Follow, Group, Post, User
+
+# поля пользователя, которые выводятся в карточках постов
+USER_CARD_FIELDS = {'username', 'first_name', 'last_name'}
+
+# посты, которые удаляются сейчас вместе с комментариями
+_deleting = threading.local()
+
+
+def _deleting_posts():
+    if not hasattr(_deleting, 'posts'):
+        _deleting.posts = set()
+    return _deleting.posts
+
+
+@receiver(post_init, sender=Post)
+def post_loaded(sender, instance, **kwargs):
+    # группа при загрузке нужна, чтобы заметить перенос поста
+    instance._initial_group_id = instance.group_id
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, raw=False, update_fields=None,
+               **kwargs):
+    if raw:
+        return
+    if created:
+        timeline.fan_out(instance)
+        counters.add_user(instance.author_id, 'posts_count', 1)
+        counters.add_group(instance.group_id, 1)
+    else:
+        cards.bump('post', instance.pk)
+        if instance.group_id != instance._initial_group_id:
+            counters.add_group(instance._initial_group_id, -1)
+            counters.add_group(instance.group_id, 1)
+    page_cache.bump_post_pages(instance, instance._initial_group_id)
+    instance._initial_group_id = instance.group_id
+    if not update_fields or 'text' in update_fields:
+        search.index_post(instance)
+    if instance.image:
+        # миниатюра готовится в фоне, когда пост уже виден другим потокам
+        transaction.on_commit(
+            lambda: thumbnails.pool.submit_post(instance)
+        )
+
+
+@receiver(pre_delete, sender=Post)
+def post_deleting(sender, instance, **kwargs):
+    # комментарии удаляются каскадом раньше поста: их счетчик и поисковый
+    # вес уходят вместе с постом, пересчитывать их незачем
+    _deleting_posts().add(instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    _deleting_posts().discard(instance.pk)
+    counters.add_user(instance.author_id, 'posts_count', -1)
+    counters.add_group(instance.group_id, -1)
+    page_cache.bump_post_pages(instance)
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        counters.add_post_comments(instance.post_id, 1)
+        search.add_comment(instance)
+        page_cache.bump('comments')
+    else:
+        search.index_post(instance.post)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    if instance.post_id in _deleting_posts():
+        return
+    counters.add_post_comments(instance.post_id, -1)
+    search.add_comment(instance, -1)
+    page_cache.bump('comments')
+
+
+@receiver(post_save, sender=Follow)
+def follow_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        timeline.subscribe(instance)
+        counters.add_user(instance.author_id, 'followers_count', 1)
+        counters.add_user(instance.user_id, 'following_count', 1)
+        page_cache.bump(
+            f'author:{instance.author_id}', f'author:{instance.user_id}'
+        )
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    timeline.unsubscribe(instance)
+    counters.add_user(instance.author_id, 'followers_count', -1)
+    counters.add_user(instance.user_id, 'following_count', -1)
+    page_cache.bump(
+        f'author:{instance.author_id}', f'author:{instance.user_id}'
+    )
+
+
+@receiver(post_save, sender=Group)
+def group_saved(sender, instance, created, raw=False, **kwargs):
+    if not created:
+        cards.bump('group', instance.pk)
+        page_cache.bump('groups', f'group:{instance.pk}')
+
+
+@receiver(post_delete, sender=Group)
+def group_deleted(sender, instance, **kwargs):
+    page_cache.bump('groups', f'group:{instance.pk}')
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, raw=False, update_fields=None,
+               **kwargs):
+    if raw:
+        return
+    if created:
+        # строка счетчиков сразу, чтобы первая запись не пересчитывала их
+        counters.create_user(instance.pk)
+        return
+    if update_fields and not USER_CARD_FIELDS & set(update_fields):
+        # например, обновление last_login при входе
+        return
+    cards.bump('author', instance.pk)
+    page_cache.bump('users', f'author:{instance.pk}')
@@ -0,0 +1,147 @@
+"""
+Стеммер русского языка по алгоритму Snowball (Портера).
+
+Отрезает окончания и суффиксы, чтобы разные формы слова
+(«котами», «кота», «кот») сводились к одной основе.
+Слова не на кириллице возвращаются без изменений.
+"""
+import re
+
+VOWELS = 'аеиоуыэюя'
+
+CYRILLIC = re.compile('^[а-я]+$')
+
+# окончания с пометкой: True - должны идти после «а» или «я»
+PERFECTIVE_GERUND = (
+    [(ending, True) for ending in ('в', 'вши', 'вшись')]
+    + [(ending, False) for ending in (
+        'ив', 'ивши', 'ившись', 'ыв', 'ывши', 'ывшись',
+    )]
+)
+
+REFLEXIVE = [(ending, False) for ending in ('ся', 'сь')]
+
+ADJECTIVE = [(ending, False) for ending in (
+    'ее', 'ие', 'ые', 'ое', 'ими', 'ыми', 'ей', 'ий', 'ый', 'ой', 'ем',
+    'им', 'ым', 'ом', 'его', 'ого', 'ему', 'ому', 'их', 'ых', 'ую', 'юю',
+    'ая', 'яя', 'ою', 'ею',
+)]
+
+PARTICIPLE = (
+    [(ending, True) for ending in ('ем', 'нн', 'вш', 'ющ', 'щ')]
+    + [(ending, False) for ending in ('ивш', 'ывш', 'ующ')]
+)
+
+VERB = (
+    [(ending, True) for ending in (
+        'ла', 'на', 'ете', 'йте', 'ли', 'й', 'л', 'ем', 'н', 'ло', 'но',
+        'ет', 'ют', 'ны', 'ть', 'ешь', 'нно',
+    )]
+    + [(ending, False) for ending in (
+        'ила', 'ыла', 'ена', 'ейте', 'уйте', 'ите', 'или', 'ыли', 'ей',
+        'уй', 'ил', 'ыл', 'им', 'ым', 'ен', 'ило', 'ыло', 'ено', 'ят',
+        'ует', 'уют', 'ит', 'ыт', 'ены', 'ить', 'ыть', 'ишь', 'ую', 'ю',
+    )]
+)
+
+NOUN = [(ending, False) for ending in (
+    'а', 'ев', 'ов', 'ие', 'ье', 'е', 'иями', 'ями', 'ами', 'еи', 'ии',
+    'и', 'ией', 'ей', 'ой', 'ий', 'й', 'иям', 'ям', 'ием', 'ем', 'ам',
+    'ом', 'о', 'у', 'ах', 'иях', 'ях', 'ы', 'ь', 'ию', 'ью', 'ю', 'ия',
+    'ья', 'я',
+)]
+
+SUPERLATIVE = [(ending, False) for ending in ('ейше', 'ейш')]
+
+DERIVATIONAL = ('ость', 'ост')
+
+
+def _by_length(endings):
+    return sorted(endings, key=lambda item: len(item[0]), reverse=True)
+
+
+PERFECTIVE_GERUND = _by_length(PERFECTIVE_GERUND)
+REFLEXIVE = _by_length(REFLEXIVE)
+ADJECTIVE = _by_length(ADJECTIVE)
+PARTICIPLE = _by_length(PARTICIPLE)
+VERB = _by_length(VERB)
+NOUN = _by_length(NOUN)
+SUPERLATIVE = _by_length(SUPERLATIVE)
+
+
+def _next_region(word, start):
+    """Начало области после первой пары «гласная, согласная»."""
+    for i in range(start + 1, len(word)):
+        if word[i] not in VOWELS and word[i - 1] in VOWELS:
+            return i + 1
+    return len(word)
+
+
+def _strip(rv, endings):
+    """Отрезает самое длинное подходящее окончание или возвращает None."""
+    for ending, after_a in endings:
+        if not rv.endswith(ending):
+            continue
+        rest = rv[:-len(ending)]
+        if after_a and not rest.endswith(('а', 'я')):
+            continue
+        return rest
+    return None
+
+
+def _strip_optional(rv, endings):
+    rest = _strip(rv, endings)
+    return rv if rest is None else rest
+
+
+def _step1(rv):
+    """Окончания деепричастий, прилагательных, глаголов и существительных."""
+    rest = _strip(rv, PERFECTIVE_GERUND)
+    if rest is not None:
+        return rest
+    rv = _strip_optional(rv, REFLEXIVE)
+    rest = _strip(rv, ADJECTIVE)
+    if rest is not None:
+        return _strip_optional(rest, PARTICIPLE)
+    for endings in (VERB, NOUN):
+        rest = _strip(rv, endings)
+        if rest is not None:
+            return rest
+    return rv
+
+
+def _step4(rv):
+    """Двойная «н», превосходная степень и мягкий знак."""
+    if rv.endswith('нн'):
+        return rv[:-1]
+    rest = _strip(rv, SUPERLATIVE)
+    if rest is not None:
+        return rest[:-1] if rest.endswith('нн') else rest
+    if rv.endswith('ь'):
+        return rv[:-1]
+    return rv
+
+
+def stem(word):
+    """Основа слова."""
+    word = word.lower().replace('ё', 'е')
+    if not CYRILLIC.match(word):
+        return word
+    for i, char in enumerate(word):
+        if char in VOWELS:
+            start = i + 1
+            break
+    else:
+        return word
+    # все окончания ищутся в области RV - после первой гласной
+    prefix, rv = word[:start], word[start:]
+    r2 = _next_region(word, _next_region(word, 0)) - start
+    rv = _step1(rv)
+    if rv.endswith('и'):
+        rv = rv[:-1]
+    # словообразовательный суффикс отрезается только в области R2
+    for ending in DERIVATIONAL:
+        if rv.endswith(ending) and len(rv) - len(ending) >= r2:
+            rv = rv[:-len(ending)]
+            break
+    return prefix + _step4(rv)
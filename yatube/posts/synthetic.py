@@ -0,0 +1,211 @@
+"""
+Генератор больших правдоподобных наборов данных.
+
+Активность и популярность распределены по степенному закону (Ципфа):
+немногие авторы пишут большую часть постов и собирают большую часть
+подписчиков, а у немногих вирусных постов - огромные ветки комментариев.
+Строки создаются потоком и загружаются через ``bulk.import_table``,
+поэтому память не зависит от объема данных.
+"""
+import datetime
+import itertools
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+from faker import Faker
+
+from . import bulk
+from .models import Group, Post, User
+
+# пароль всех созданных пользователей
+PASSWORD = 'yatube-load'
+
+# простой множитель, перемешивающий номера постов
+SHUFFLE = 2654435761
+
+
+class Zipf:
+    """
+    Номер от 0 до n - 1 с вероятностью около 1 / (номер + 1) ** exponent.
+
+    Считается обращением непрерывного степенного распределения, поэтому
+    не хранит таблицу вероятностей и годится для миллионов объектов.
+    """
+
+    def __init__(self, n, exponent, rng):
+        self.n = n
+        self.exponent = exponent
+        self.rng = rng
+
+    def __call__(self):
+        share = self.rng.random()
+        if abs(self.exponent - 1) < 1e-9:
+            value = (self.n + 1) ** share
+        else:
+            power = 1 - self.exponent
+            value = (share * ((self.n + 1) ** power - 1) + 1) ** (1 / power)
+        return min(int(value) - 1, self.n - 1)
+
+
+def _next_id(model):
+    last = model.objects.order_by('-pk').values_list('pk', flat=True).first()
+    return (last or 0) + 1
+
+
+class Generator:
+    """
+    Создает пользователей, сообщества, посты, подписки и комментарии.
+
+    Номера пользователей и сообществ в распределениях - смещения от
+    первого созданного id: самые активные и популярные - первые созданные.
+    Посты идут по времени в порядке id, а популярность постов
+    перемешана, чтобы вирусными были не только самые старые.
+    """
+
+    def __init__(self, users, groups, posts, follows, comments,
+                 viral_posts=0, viral_comments=0, exponent=1.1, days=365,
+                 seed=0, batch_size=5000):
+        self.users = users
+        self.groups = groups
+        self.posts = posts
+        self.follows = follows
+        self.comments = comments
+        self.viral_posts = min(viral_posts, posts)
+        self.viral_comments = viral_comments
+        self.exponent = exponent
+        self.days = days
+        self.batch_size = batch_size
+        self.rng = random.Random(seed)
+        self.fake = Faker('ru_RU')
+        self.fake.seed_instance(seed)
+        self.now = timezone.now()
+
+    def run(self, report=lambda name, total: None):
+        """Создает все таблицы, сообщая число строк каждой."""
+        self.first_user = _next_id(User)
+        self.first_group = _next_id(Group)
+        self.first_post = _next_id(Post)
+        for name, rows in (
+            ('users', self.user_rows()),
+            ('groups', self.group_rows()),
+            ('posts', self.post_rows()),
+            ('follows', self.follow_rows()),
+            ('comments', self.comment_rows()),
+        ):
+            report(name, bulk.import_table(name, rows, self.batch_size))
+
+    def _date(self):
+        return self.now - datetime.timedelta(
+            seconds=self.rng.random() * self.days * 86400
+        )
+
+    def _post_date(self, number):
+        # посты идут по времени в порядке id, как на живом сайте
+        return self.now - datetime.timedelta(
+            seconds=(self.posts - number) / self.posts * self.days * 86400
+        )
+
+    def _post_number(self, rank):
+        if self.posts % SHUFFLE == 0:
+            return rank
+        return rank * SHUFFLE % self.posts
+
+    def user_rows(self):
+        password = make_password(PASSWORD)
+        for number in range(self.users):
+            pk = self.first_user + number
+            yield {
+                'id': pk,
+                'username': f'{self.fake.user_name()}{pk}',
+                'password': password,
+                'first_name': self.fake.first_name(),
+                'last_name': self.fake.last_name(),
+                'email': '',
+                'is_active': True,
+                'is_staff': False,
+                'is_superuser': False,
+                'date_joined': self._date(),
+            }
+
+    def group_rows(self):
+        for number in range(self.groups):
+            pk = self.first_group + number
+            yield {
+                'id': pk,
+                'title': self.fake.catch_phrase()[:200],
+                'slug': f'group-{pk}',
+                'description': self.fake.paragraph(nb_sentences=2),
+            }
+
+    def post_rows(self):
+        authors = Zipf(self.users, self.exponent, self.rng)
+        groups = Zipf(self.groups, self.exponent, self.rng) if self.groups \
+            else None
+        for number in range(self.posts):
+            pub_date = self._post_date(number)
+            group = None
+            # примерно половина постов публикуется в сообществах
+            if groups and self.rng.random() < 0.5:
+                group = self.first_group + groups()
+            yield {
+                'id': self.first_post + number,
+                'text': self.fake.paragraph(
+                    nb_sentences=self.rng.randint(1, 6)
+                ),
+                'pub_date': pub_date,
+                'edited': pub_date,
+                'author_id': self.first_user + authors(),
+                'group_id': group,
+                'image': '',
+            }
+
+    def follow_rows(self):
+        if self.users < 2:
+            return
+        authors = Zipf(self.users, self.exponent, self.rng)
+        # подписки пользователя идут подряд: повторы отсекаются множеством
+        per_user = self.follows / self.users
+        for number in range(self.users):
+            user = self.first_user + number
+            # число подписок тоже с тяжелым хвостом, в среднем per_user
+            wanted = min(
+                int(self.rng.expovariate(1 / per_user)) if per_user else 0,
+                self.users - 1,
+            )
+            chosen = set()
+            for _ in range(wanted * 3):
+                if len(chosen) >= wanted:
+                    break
+                author = self.first_user + authors()
+                if author != user:
+                    chosen.add(author)
+            for author in sorted(chosen):
+                yield {'user_id': user, 'author_id': author}
+
+    def comment_rows(self):
+        if not self.posts:
+            return
+        posts = Zipf(self.posts, self.exponent, self.rng)
+        commenters = Zipf(self.users, self.exponent, self.rng)
+        # вирусные посты - случайные, а не только самые старые
+        viral = self.rng.sample(range(self.posts), self.viral_posts)
+        targets = itertools.chain(
+            (self._post_number(posts()) for _ in range(self.comments)),
+            (
+                number for number in viral
+                for _ in range(self.viral_comments)
+            ),
+        )
+        for number in targets:
+            published = self._post_date(number)
+            yield {
+                'post_id': self.first_post + number,
+                'author_id': self.first_user + commenters(),
+                'text': self.fake.sentence(
+                    nb_words=self.rng.randint(3, 20)
+                ),
+                'created': published + (self.now - published) * (
+                    self.rng.random()
+                ),
+            }
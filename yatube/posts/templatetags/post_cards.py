@@ -0,0 +1,11 @@
+from django import template
+
+from posts import cards
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def post_cards(context, posts):
+    """Закэшированные карточки постов страницы ленты."""
+    return cards.render_cards(posts, context['request'])
@@ -0,0 +1,29 @@
+from django.test import TestCase
+from django.urls import resolve
+
+from posts import benchmarks, bulk
+from posts.synthetic import Generator
+
+
+class BenchmarksTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        Generator(
+            users=10, groups=2, posts=40, follows=30, comments=40,
+            viral_posts=1, viral_comments=20,
+        ).run()
+        bulk.rebuild_derived()
+
+    def test_measures_every_view(self):
+        """Замер проходит по всем view и укладывается в их бюджеты."""
+        _, requests = benchmarks._requests()
+        results = benchmarks.run(repeat=1)
+        self.assertEqual(set(results), set(benchmarks.VIEWS))
+        for name, metrics in results.items():
+            budget = resolve(requests[name][1]).func.query_budget
+            self.assertLessEqual(metrics['queries'], budget, name)
+            self.assertGreater(metrics['wall_ms'], 0, name)
+            self.assertGreater(metrics['peak_kib'], 0, name)
+        self.assertGreater(results['index']['render_ms'], 0)
+        self.assertEqual(results['post_create']['render_ms'], 0)
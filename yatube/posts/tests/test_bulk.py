@@ -0,0 +1,117 @@
+import datetime
+import io
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TransactionTestCase
+from django.utils import timezone
+
+from posts import search
+from posts.models import (
+    Comment, Follow, Group, Post, TimelineEntry, UserCounters
+)
+
+User = get_user_model()
+
+OLD = timezone.now() - datetime.timedelta(days=365)
+
+
+class BulkImportExportTest(TransactionTestCase):
+    # загрузка ведет свои транзакции и меняет схему
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.author = User.objects.create_user(
+            username='author', first_name='Лев'
+        )
+        self.reader = User.objects.create_user(username='reader')
+        self.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание, "в кавычках"'
+        )
+        self.post = Post.objects.create(
+            author=self.author, group=self.group, text='Кот\nна окне'
+        )
+        Post.objects.create(author=self.author, text='Без группы')
+        Post.objects.filter(pk=self.post.pk).update(pub_date=OLD, edited=OLD)
+        Comment.objects.create(
+            post=self.post, author=self.reader, text='Хороший кот'
+        )
+        Follow.objects.create(user=self.reader, author=self.author)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def snapshot(self):
+        return {
+            'users': list(User.objects.order_by('pk').values_list(
+                'pk', 'username', 'first_name', 'password'
+            )),
+            'groups': list(Group.objects.values_list(
+                'pk', 'slug', 'description'
+            )),
+            'posts': list(Post.objects.order_by('pk').values_list(
+                'pk', 'text', 'pub_date', 'edited', 'author', 'group'
+            )),
+            'comments': list(Comment.objects.values_list(
+                'pk', 'post', 'author', 'text', 'created'
+            )),
+            'follows': list(Follow.objects.values_list(
+                'pk', 'user', 'author'
+            )),
+        }
+
+    def round_trip(self, *options, import_options=()):
+        before = self.snapshot()
+        call_command(
+            'export_data', self.directory, *options, stdout=io.StringIO()
+        )
+        for model in (Follow, Comment, Post, Group, User):
+            model.objects.all().delete()
+        call_command(
+            'import_data', self.directory, *options, *import_options,
+            stdout=io.StringIO()
+        )
+        self.assertEqual(self.snapshot(), before)
+
+    def test_round_trip_jsonl(self):
+        """JSON Lines переносит все строки без изменений."""
+        self.round_trip('--format', 'jsonl', '--batch-size', '2')
+
+    def test_round_trip_csv(self):
+        """CSV переносит строки с переводами строк, кавычками и NULL."""
+        self.round_trip('--format', 'csv', '--batch-size', '2')
+
+    def test_derived_data_rebuilt(self):
+        """После загрузки пересчитаны счетчики, ленты и индекс поиска."""
+        self.round_trip()
+        self.assertEqual(
+            UserCounters.objects.get(user=self.author).posts_count, 2
+        )
+        self.assertEqual(
+            UserCounters.objects.get(user=self.author).followers_count, 1
+        )
+        self.assertEqual(Post.objects.get(pk=self.post.pk).comments_count, 1)
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=self.reader).count(), 2
+        )
+        self.assertEqual(list(search.search('кот')), [self.post])
+
+    def test_indexes_restored(self):
+        """Удаленные на время загрузки индексы создаются заново."""
+        self.round_trip(import_options=['--drop-indexes'])
+        with connection.cursor() as cursor:
+            indexes = connection.introspection.get_constraints(
+                cursor, Post._meta.db_table
+            )
+        for index in Post._meta.indexes:
+            with self.subTest(index=index.name):
+                self.assertIn(index.name, indexes)
+
+    def test_new_ids_follow_imported(self):
+        """Новые записи получают id после загруженных."""
+        self.round_trip()
+        post = Post.objects.create(author=self.author, text='Новый')
+        self.assertGreater(post.pk, self.post.pk)
@@ -0,0 +1,116 @@
+import io
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, RequestFactory, TestCase
+from django.urls import reverse
+
+from posts import cards
+from posts.models import Follow, Group, Post
+
+User = get_user_model()
+
+
+class PostCardCacheTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(
+            username='author', first_name='Лев', last_name='Толстой'
+        )
+        cls.group = Group.objects.create(title='Классика', slug='classic')
+        cls.post = Post.objects.create(
+            author=cls.author,
+            text='Все счастливые семьи похожи друг на друга',
+            group=cls.group,
+        )
+
+    def setUp(self):
+        self.client = Client()
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+        self.profile_url = reverse(
+            'posts:profile', kwargs={'username': self.author.username}
+        )
+
+        cache.clear()
+
+    def get_html(self):
+        return self.client.get(self.profile_url).content.decode()
+
+    def test_card_reused_until_post_edited(self):
+        """Карточка берется из кэша, пока пост не отредактирован."""
+        self.get_html()
+        Post.objects.filter(pk=self.post.pk).update(text='Другой текст')
+        self.assertIn(self.post.text, self.get_html())
+        self.author_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': self.post.pk}),
+            data={'text': 'Новый текст', 'group': self.group.pk},
+        )
+        html = self.get_html()
+        self.assertIn('Новый текст', html)
+        self.assertNotIn(self.post.text, html)
+
+    def test_card_invalidated_by_group_change(self):
+        """Переименование группы сбрасывает карточки ее постов."""
+        self.get_html()
+        self.group.title = 'Новая классика'
+        self.group.save()
+        self.assertIn('Новая классика', self.get_html())
+
+    def test_card_invalidated_by_author_rename(self):
+        """Смена имени автора сбрасывает карточки его постов."""
+        group_url = reverse('posts:group_list', kwargs={'slug': 'classic'})
+        self.client.get(group_url)
+        self.author.first_name = 'Алексей'
+        self.author.save()
+        html = self.client.get(group_url).content.decode()
+        self.assertIn('Алексей Толстой', html)
+
+    def test_card_shared_between_feeds(self):
+        """Ленты с одинаковыми ссылками берут карточку из одного кэша."""
+        reader = User.objects.create_user(username='reader')
+        Follow.objects.create(user=reader, author=self.author)
+        self.client.get(reverse('posts:index'))
+        Post.objects.filter(pk=self.post.pk).update(text='Другой текст')
+        self.client.force_login(reader)
+        html = self.client.get(
+            reverse('posts:follow_index')
+        ).content.decode()
+        self.assertIn(self.post.text, html)
+        self.assertIn(self.profile_url, html)
+        # в профиле карточка без ссылки на автора
+        self.assertNotIn(self.post.text, self.get_html())
+
+
+class RenderHtmlTest(TestCase):
+
+    def test_links_from_page(self):
+        """Ссылки на автора и группу задаются страницей, а не карточкой."""
+        author = User(username='author', first_name='Лев')
+        group = Group(title='Классика', slug='classic')
+        posts = [
+            Post(pk=number, author=author, group=group, text=f'Пост {number}')
+            for number in (1, 2)
+        ]
+        request = RequestFactory().get('/')
+        profile_url = reverse('posts:profile', args=['author'])
+        group_url = reverse('posts:group_list', args=['classic'])
+        index_cards = cards.render_html(posts, request)
+        profile_cards = cards.render_html(
+            posts, request, **cards.card_options('posts:profile')
+        )
+        self.assertEqual(len(index_cards), 2)
+        self.assertIn('Пост 2', index_cards[1])
+        self.assertIn(profile_url, index_cards[1])
+        self.assertIn(group_url, index_cards[1])
+        self.assertNotIn(profile_url, profile_cards[1])
+        self.assertIn(group_url, profile_cards[1])
+
+    def test_benchmark_matches_previous_rendering(self):
+        """Замер bench_cards сверяет карточки до и после."""
+        output = io.StringIO()
+        call_command('bench_cards', cards=3, repeat=1, stdout=output)
+        self.assertEqual(len(output.getvalue().splitlines()), 6)
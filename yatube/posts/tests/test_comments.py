@@ -0,0 +1,78 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts import constants
+from posts.models import Comment, Post
+
+User = get_user_model()
+
+TOTAL_COMMENTS = constants.COUNT_COMMENTS_PAGE + 5
+
+
+class CommentPagesTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.post = Post.objects.create(author=cls.author, text='Пост')
+        User.objects.bulk_create(
+            User(username=f'reader{i}') for i in range(TOTAL_COMMENTS)
+        )
+        # bulk_create не возвращает id в SQLite, перечитываем авторов
+        readers = User.objects.filter(username__startswith='reader')
+        Comment.objects.bulk_create(
+            Comment(post=cls.post, author=reader, text=f'Комментарий {i}')
+            for i, reader in enumerate(readers.order_by('pk'))
+        )
+
+    def setUp(self):
+        self.client = Client()
+        self.detail_url = reverse(
+            'posts:post_detail', kwargs={'post_id': self.post.pk}
+        )
+        self.fragment_url = reverse(
+            'posts:comments', kwargs={'post_id': self.post.pk}
+        )
+
+    def test_detail_shows_first_comment_page(self):
+        """Под постом выводится только первая страница комментариев."""
+        response = self.client.get(self.detail_url)
+        comments = response.context['comments']
+        self.assertEqual(len(comments), constants.COUNT_COMMENTS_PAGE)
+        self.assertEqual(comments[0].text, 'Комментарий 0')
+        self.assertContains(response, self.fragment_url + '?after=')
+
+    def test_fragment_continues_after_cursor(self):
+        """Фрагмент отдает следующие комментарии без повторов."""
+        first = self.client.get(self.detail_url).context['comments']
+        response = self.client.get(
+            self.fragment_url, {'after': first.next_cursor}
+        )
+        rest = response.context['comments']
+        self.assertEqual(
+            [comment.text for comment in list(first) + list(rest)],
+            [f'Комментарий {i}' for i in range(TOTAL_COMMENTS)]
+        )
+        self.assertNotContains(response, '<html')
+        self.assertNotContains(response, 'js-more-comments')
+
+    def test_authors_fetched_with_comments(self):
+        """Авторы комментариев читаются тем же запросом."""
+        # пост, подсчет страниц и страница комментариев с авторами
+        with self.assertNumQueries(3):
+            self.client.get(self.fragment_url)
+
+    def test_post_delete_skips_comment_bookkeeping(self):
+        """Число запросов при удалении поста не растет с комментариями."""
+        single = Post.objects.create(author=self.author, text='Один')
+        Comment.objects.create(post=single, author=self.author, text='Кот')
+        with CaptureQueriesContext(connection) as one_comment:
+            single.delete()
+        with CaptureQueriesContext(connection) as many_comments:
+            self.post.delete()
+        self.assertEqual(len(many_comments), len(one_comment))
+        self.assertFalse(Comment.objects.exists())
@@ -0,0 +1,125 @@
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+
+from posts import constants
+from posts.models import Comment, Group, Post
+
+User = get_user_model()
+
+
+class ConditionalResponseTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        cls.post = Post.objects.create(
+            author=cls.author, group=cls.group, text='Пост'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.reader)
+        self.detail = reverse(
+            'posts:post_detail', kwargs={'post_id': self.post.pk}
+        )
+
+    def urls(self):
+        return (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': 'group'}),
+            reverse('posts:profile', kwargs={'username': 'author'}),
+            self.detail,
+        )
+
+    def test_not_modified_without_rendering(self):
+        """Неизменная страница отдается ответом 304 без тела."""
+        for url in self.urls():
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                again = self.guest_client.get(
+                    url, HTTP_IF_NONE_MATCH=response['ETag']
+                )
+                self.assertEqual(again.status_code, 304)
+                self.assertEqual(again.content, b'')
+                self.assertNotIn('X-Feed-Cache', again)
+
+    def test_guest_pages_cacheable_by_proxy(self):
+        """Страницы гостя может хранить общий кэш."""
+        response = self.guest_client.get(reverse('posts:index'))
+        cache_control = response['Cache-Control']
+        self.assertIn('public', cache_control)
+        self.assertIn(
+            f's-maxage={constants.PROXY_CACHE_MAX_AGE}', cache_control
+        )
+        self.assertIn('Cookie', response['Vary'])
+
+    def test_user_pages_private(self):
+        """Страницы вошедшего пользователя проверяются браузером."""
+        for url in self.urls() + (reverse('posts:follow_index'),):
+            with self.subTest(url=url):
+                response = self.authorized_client.get(url)
+                self.assertIn('private', response['Cache-Control'])
+                self.assertIn('no-cache', response['Cache-Control'])
+                self.assertIn('Cookie', response['Vary'])
+
+    def test_etag_depends_on_user(self):
+        """Гость и пользователь получают разные ETag одной страницы."""
+        url = reverse('posts:index')
+        self.assertNotEqual(
+            self.guest_client.get(url)['ETag'],
+            self.authorized_client.get(url)['ETag'],
+        )
+
+    def test_post_last_modified(self):
+        """Last-Modified поста - его правка или последний комментарий."""
+        later = timezone.now() + datetime.timedelta(days=1)
+        Post.objects.filter(pk=self.post.pk).update(edited=later)
+        response = self.guest_client.get(self.detail)
+        self.assertEqual(
+            response['Last-Modified'], http_date(later.timestamp())
+        )
+        comment = Comment.objects.create(
+            post=self.post, author=self.reader, text='Комментарий'
+        )
+        latest = later + datetime.timedelta(days=1)
+        Comment.objects.filter(pk=comment.pk).update(created=latest)
+        again = self.guest_client.get(
+            self.detail, HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(again.status_code, 200)
+        self.assertEqual(again['Last-Modified'], http_date(latest.timestamp()))
+
+    def test_edit_changes_etag(self):
+        """Правка поста меняет ETag его страницы и ленты."""
+        etags = {
+            url: self.guest_client.get(url)['ETag'] for url in self.urls()
+        }
+        self.post.text = 'Правка'
+        self.post.save()
+        for url, etag in etags.items():
+            with self.subTest(url=url):
+                response = self.guest_client.get(
+                    url, HTTP_IF_NONE_MATCH=etag
+                )
+                self.assertEqual(response.status_code, 200)
+
+    def test_missing_page_without_validators(self):
+        """Для несуществующей страницы валидаторы не ставятся."""
+        response = self.guest_client.get(
+            reverse('posts:group_list', kwargs={'slug': 'missing'})
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn('ETag', response)
@@ -0,0 +1,97 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts import counters
+from posts.models import Comment, Follow, Group, Post, UserCounters
+
+User = get_user_model()
+
+
+class CountersTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(title='Группа', slug='group')
+        cls.other_group = Group.objects.create(title='Другая', slug='other')
+
+    def setUp(self):
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+
+    def assertCounters(self, user, **expected):
+        user_counters = counters.for_user(user)
+        for field, value in expected.items():
+            with self.subTest(field=field):
+                self.assertEqual(getattr(user_counters, field), value)
+
+    def test_post_counters(self):
+        """Публикация, перенос и удаление поста меняют счетчики."""
+        self.author_client.post(
+            reverse('posts:post_create'),
+            data={'text': 'Пост', 'group': self.group.pk},
+        )
+        post = Post.objects.get()
+        self.assertCounters(self.author, posts_count=1)
+        self.author_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': post.pk}),
+            data={'text': 'Пост', 'group': self.other_group.pk},
+        )
+        self.group.refresh_from_db()
+        self.other_group.refresh_from_db()
+        self.assertEqual(self.group.posts_count, 0)
+        self.assertEqual(self.other_group.posts_count, 1)
+        post.refresh_from_db()
+        post.delete()
+        self.other_group.refresh_from_db()
+        self.assertEqual(self.other_group.posts_count, 0)
+        self.assertCounters(self.author, posts_count=0)
+
+    def test_comment_counters(self):
+        """Комментарий увеличивает счетчик, каскадное удаление уменьшает."""
+        post = Post.objects.create(author=self.author, text='Пост')
+        commenter = User.objects.create_user(username='commenter')
+        commenter_client = Client()
+        commenter_client.force_login(commenter)
+        commenter_client.post(
+            reverse('posts:add_comment', kwargs={'post_id': post.pk}),
+            data={'text': 'Комментарий'},
+        )
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        # редактирование поста не затирает счетчик
+        post.text = 'Новый текст'
+        post.comments_count = 0
+        post.save()
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        commenter.delete()
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 0)
+        self.assertFalse(Comment.objects.exists())
+
+    def test_follow_counters(self):
+        """Подписка и отписка меняют счетчики обоих пользователей."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.assertCounters(self.author, followers_count=1)
+        self.assertCounters(self.reader, following_count=1)
+        Follow.objects.all().delete()
+        self.assertCounters(self.author, followers_count=0)
+        self.assertCounters(self.reader, following_count=0)
+
+    def test_recount_command(self):
+        """Команда recount исправляет расхождения."""
+        Post.objects.create(author=self.author, text='Пост', group=self.group)
+        Follow.objects.create(user=self.reader, author=self.author)
+        Group.objects.update(posts_count=10)
+        UserCounters.objects.update(posts_count=10, followers_count=10)
+        call_command('recount', stdout=mock.MagicMock())
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.posts_count, 1)
+        self.assertCounters(self.author, posts_count=1, followers_count=1)
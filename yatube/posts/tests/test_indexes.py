@@ -0,0 +1,98 @@
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+
+from posts import constants, timeline
+from posts.models import Comment, Follow, Group, Post
+from posts.paginators import COMMENT_ORDERING, CursorPaginator
+
+User = get_user_model()
+
+
+@skipUnless(connection.vendor == 'sqlite', 'план запроса в формате SQLite')
+class FeedIndexTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(title='Группа', slug='group')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        cls.post = Post.objects.create(
+            author=cls.author, text='Пост', group=cls.group
+        )
+        Comment.objects.create(
+            post=cls.post, author=cls.reader, text='Комментарий'
+        )
+
+    def plan(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            return '\n'.join(row[-1] for row in cursor.fetchall())
+
+    def assertIndexScan(self, queryset, index):
+        plan = self.plan(queryset)
+        self.assertIn(index, plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+        self.assertNoFullScan(plan)
+
+    def assertNoFullScan(self, plan):
+        # полный просмотр таблицы - SCAN без USING INDEX
+        scans = [
+            line for line in plan.splitlines()
+            if line.startswith('SCAN') and 'USING' not in line
+        ]
+        self.assertEqual(scans, [])
+
+    def pages(self, queryset, ordering=None):
+        """Первая страница и страница после курсора, как в paginate."""
+        paginator = CursorPaginator(
+            queryset, constants.COUNT_POSTS_PAGE,
+            **({'ordering': ordering} if ordering else {})
+        )
+        _, values = paginator.decode_cursor(
+            paginator.encode_cursor(1, paginator.object_list[0])
+        )
+        first = paginator.object_list[:paginator.per_page]
+        after = paginator.object_list.filter(
+            paginator._seek(values)
+        )[:paginator.per_page]
+        return first, after
+
+    def test_feeds_use_indexes(self):
+        """Ленты читаются по индексу без сортировки всей таблицы."""
+        feeds = {
+            'post_pub_date_idx': Post.objects.select_related(
+                'author', 'group'
+            ),
+            'post_group_pub_date_idx': self.group.posts.select_related(
+                'author', 'group'
+            ),
+            'post_author_pub_date_idx': self.author.posts.select_related(
+                'author', 'group'
+            ),
+        }
+        for index, queryset in feeds.items():
+            for page in self.pages(queryset):
+                with self.subTest(index=index, sql=str(page.query)):
+                    self.assertIndexScan(page, index)
+
+    def test_comments_use_index(self):
+        """Комментарии поста читаются по индексу."""
+        comments = self.post.comments.select_related('author')
+        for page in self.pages(comments, COMMENT_ORDERING):
+            with self.subTest(sql=str(page.query)):
+                self.assertIndexScan(page, 'comment_post_created_idx')
+
+    def test_follow_feed_uses_index(self):
+        """Страница ленты подписок читается из индекса ленты по порядку."""
+        feed = timeline.feed_for(self.reader).select_related(
+            'author', 'group'
+        )
+        for page in self.pages(feed, timeline.FEED_ORDERING):
+            with self.subTest(sql=str(page.query)):
+                self.assertIndexScan(page, 'timeline_user_pub_date_idx')
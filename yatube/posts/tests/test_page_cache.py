@@ -0,0 +1,65 @@
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, RequestFactory, TestCase
+from django.urls import reverse
+
+from core import metrics
+from posts import page_cache
+from posts.models import Post
+
+User = get_user_model()
+
+
+class FeedPageCacheTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.post = Post.objects.create(author=cls.author, text='Первый пост')
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.url = reverse('posts:index')
+
+        cache.clear()
+        metrics.reset()
+
+    def lock_page(self):
+        request = RequestFactory().get(self.url)
+        request.user = AnonymousUser()
+        cache.add(f'{page_cache.page_key(request)}:lock', 1)
+
+    def test_second_request_hits_cache(self):
+        """Повторный запрос отдается из кэша."""
+        first = self.guest_client.get(self.url)
+        second = self.guest_client.get(self.url)
+        self.assertEqual(first['X-Feed-Cache'], page_cache.MISS)
+        self.assertEqual(second['X-Feed-Cache'], page_cache.HIT)
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(
+            {
+                dict(labels)['outcome']: count
+                for labels, count in metrics.CACHE.series.items()
+                if dict(labels)['cache'] == 'feed_page'
+            },
+            {page_cache.HIT: 1, page_cache.MISS: 1}
+        )
+
+    def test_stale_page_served_while_rebuilding(self):
+        """Пока страницу перестраивают, отдается прежняя копия."""
+        old = self.guest_client.get(self.url).content
+        Post.objects.create(author=self.author, text='Второй пост')
+        self.lock_page()
+        response = self.guest_client.get(self.url)
+        self.assertEqual(response['X-Feed-Cache'], page_cache.STALE)
+        self.assertEqual(response.content, old)
+
+    def test_changed_page_rebuilt_by_lock_holder(self):
+        """Без конкурентов устаревшая страница перестраивается сразу."""
+        self.guest_client.get(self.url)
+        Post.objects.create(author=self.author, text='Второй пост')
+        response = self.guest_client.get(self.url)
+        self.assertEqual(response['X-Feed-Cache'], page_cache.MISS)
+        self.assertIn('Второй пост', response.content.decode())
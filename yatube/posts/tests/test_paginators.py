@@ -0,0 +1,169 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.constants import COUNT_POSTS_PAGE, PAGE_WINDOW
+from posts.models import Post
+from posts.paginators import CursorPaginator
+
+User = get_user_model()
+
+
+class CursorPaginatorTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        for i in range(25):
+            Post.objects.create(text=f'Тестовая запись {i}', author=cls.author)
+        # половина записей с одинаковой датой: порядок держится на id
+        Post.objects.filter(pk__lte=12).update(pub_date=timezone.now())
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.ordered = list(Post.objects.order_by('-pub_date', '-pk'))
+
+        cache.clear()
+
+    def get_page(self, **params):
+        response = self.guest_client.get(reverse('posts:index'), params)
+        return response.context['page_obj']
+
+    def test_after_cursor_matches_page_number(self):
+        """Курсор ``after`` открывает ту же страницу, что и ``?page=``."""
+        first = self.get_page()
+        second = self.get_page(after=first.next_cursor)
+        third = self.get_page(after=second.next_cursor)
+        self.assertEqual(second.number, 2)
+        self.assertEqual(list(second), self.get_page(page=2).object_list)
+        self.assertEqual(list(third), self.ordered[2 * COUNT_POSTS_PAGE:])
+        self.assertIsNone(third.next_cursor)
+
+    def test_before_cursor_returns_previous_page(self):
+        """Курсор ``before`` возвращает предыдущую страницу."""
+        third = self.get_page(page=3)
+        second = self.get_page(before=third.previous_cursor)
+        first = self.get_page(before=second.previous_cursor)
+        self.assertEqual(second.number, 2)
+        self.assertEqual(
+            list(second),
+            self.ordered[COUNT_POSTS_PAGE:2 * COUNT_POSTS_PAGE]
+        )
+        self.assertEqual(first.number, 1)
+        self.assertIsNone(first.previous_cursor)
+
+    def test_invalid_cursor_falls_back_to_first_page(self):
+        """Поврежденный курсор открывает первую страницу."""
+        page = self.get_page(after='not-a-cursor')
+        self.assertEqual(page.number, 1)
+        self.assertEqual(list(page), self.ordered[:COUNT_POSTS_PAGE])
+
+    def test_cursor_roundtrip(self):
+        """Курсор сохраняет номер страницы и точный ключ записи."""
+        paginator = CursorPaginator(Post.objects.all(), COUNT_POSTS_PAGE)
+        post = self.ordered[0]
+        number, values = paginator.decode_cursor(
+            paginator.encode_cursor(4, post)
+        )
+        self.assertEqual(number, 4)
+        self.assertEqual(values, [post.pub_date, post.pk])
+
+    def test_page_window(self):
+        """Окно номеров: соседи текущей страницы и крайние страницы."""
+        paginator = CursorPaginator(Post.objects.all(), 2)
+        self.assertEqual(paginator.num_pages, 13)
+        self.assertEqual(PAGE_WINDOW, 2)
+        windows = {
+            1: [1, 2, 3, None, 13],
+            4: [1, 2, 3, 4, 5, 6, None, 13],
+            7: [1, None, 5, 6, 7, 8, 9, None, 13],
+            13: [1, None, 11, 12, 13],
+        }
+        for number, window in windows.items():
+            with self.subTest(number=number):
+                self.assertEqual(paginator.page(number).page_window, window)
+
+    def test_count_free_pages(self):
+        """Без подсчета записей следующая страница видна по лишней записи."""
+        paginator = CursorPaginator(
+            Post.objects.all(), COUNT_POSTS_PAGE, count_pages=False
+        )
+        with CaptureQueriesContext(connection) as queries:
+            first = paginator.get_page(1)
+            self.assertTrue(first.has_next())
+            second = paginator.page_after(first.next_cursor)
+            self.assertTrue(second.has_next())
+            third = paginator.page_after(second.next_cursor)
+            self.assertFalse(third.has_next())
+            previous = paginator.page_before(third.previous_cursor)
+            self.assertTrue(previous.has_next())
+            missing = paginator.get_page(100)
+        self.assertFalse(any(
+            'COUNT(' in query['sql'].upper() for query in queries
+        ))
+        self.assertEqual(list(second), self.ordered[10:20])
+        self.assertEqual(list(third), self.ordered[20:])
+        self.assertIsNone(third.next_cursor)
+        self.assertEqual(third.page_window, [1, 2, 3])
+        self.assertEqual(second.page_window, [1, 2, 3])
+        self.assertEqual(list(previous), list(second))
+        self.assertEqual(missing.number, 1)
+
+    def test_feed_navigation_is_bounded(self):
+        """Лента выводит окно номеров, а не ссылку на каждую страницу."""
+        Post.objects.bulk_create(
+            Post(text=f'Запись {i}', author=self.author) for i in range(200)
+        )
+        html = self.guest_client.get(
+            reverse('posts:index'), {'page': 12}
+        ).content.decode()
+        self.assertEqual(html.count('class="page-item'), 9)
+        self.assertIn('?page=13', html)
+        self.assertNotIn('?page=14', html)
+        self.assertNotIn('Последняя', html)
+
+    def test_next_page_decided_by_rows_not_number(self):
+        """Устаревший номер в курсоре не лишает ссылки на следующую."""
+        paginator = CursorPaginator(Post.objects.all(), COUNT_POSTS_PAGE)
+        # курсор выдан, когда запись была в конце третьей страницы
+        cursor = paginator.encode_cursor(3, self.ordered[4])
+        page = paginator.page_after(cursor)
+        self.assertEqual(list(page), self.ordered[5:15])
+        self.assertEqual(page.number, 3)
+        self.assertTrue(page.has_next())
+        self.assertIsNotNone(page.next_cursor)
+        self.assertEqual(
+            list(paginator.page_after(page.next_cursor)), self.ordered[15:]
+        )
+
+    def test_previous_page_decided_by_rows_not_number(self):
+        """Устаревший номер в курсоре не делает страницу первой."""
+        paginator = CursorPaginator(Post.objects.all(), COUNT_POSTS_PAGE)
+        # курсор выдан, когда запись открывала вторую страницу
+        cursor = paginator.encode_cursor(2, self.ordered[15])
+        page = paginator.page_before(cursor)
+        self.assertEqual(list(page), self.ordered[5:15])
+        self.assertEqual(page.number, 2)
+        self.assertTrue(page.has_previous())
+        self.assertEqual(
+            list(paginator.page_before(page.previous_cursor)),
+            self.ordered[:COUNT_POSTS_PAGE],
+        )
+
+    def test_cursor_past_deleted_rows(self):
+        """Если записи после курсора удалены, страница кончается курсором."""
+        paginator = CursorPaginator(Post.objects.all(), COUNT_POSTS_PAGE)
+        cursor = paginator.encode_cursor(2, self.ordered[19])
+        # удалены и записи после курсора, и часть записей перед ним
+        Post.objects.filter(pk__in=[
+            post.pk for post in self.ordered[:5] + self.ordered[20:]
+        ]).delete()
+        page = paginator.page_after(cursor)
+        self.assertEqual(list(page), self.ordered[10:20])
+        self.assertFalse(page.has_next())
+        self.assertIsNone(page.next_cursor)
@@ -0,0 +1,169 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from core.query_budget import (
+    QueryBudgetExceeded, QueryBudgetMiddleware, query_budget, unbudgeted
+)
+from core.testing import QueryBudgetTestMixin
+from posts import constants, timeline
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+# больше строк, чем помещается на страницу, чтобы N+1 был заметен
+ROWS = constants.COUNT_POSTS_PAGE + 3
+
+
+@override_settings(QUERY_BUDGET_STRICT=True)
+class QueryBudgetTest(QueryBudgetTestMixin, TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(title='Группа', slug='group')
+        for i in range(ROWS):
+            author = User.objects.create_user(
+                username=f'author{i}', first_name='Автор', last_name=str(i)
+            )
+            Follow.objects.create(user=cls.reader, author=author)
+            group = Group.objects.create(title=f'Группа {i}', slug=f'g{i}')
+            Post.objects.create(author=author, text=f'Кот {i}', group=group)
+            Post.objects.create(
+                author=author, text=f'Кот в группе {i}', group=cls.group
+            )
+        cls.post = Post.objects.create(
+            author=cls.reader, text='Кот читателя', group=cls.group
+        )
+        for i in range(ROWS):
+            Comment.objects.create(
+                post=cls.post,
+                author=User.objects.get(username=f'author{i}'),
+                text=f'Комментарий {i}',
+            )
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.reader)
+        cache.clear()
+
+    def test_pages_within_budget(self):
+        """Страницы укладываются в бюджет и не повторяют запросы."""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': 'author0'}),
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}),
+            reverse('posts:comments', kwargs={'post_id': self.post.pk}),
+            reverse('posts:search') + '?q=кот',
+            reverse('posts:follow_index'),
+            reverse('posts:post_create'),
+            reverse('posts:post_edit', kwargs={'post_id': self.post.pk}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                # при превышении middleware поднимает QueryBudgetExceeded
+                self.assertEqual(self.client.get(url).status_code, 200)
+        # подписка на автора, чьи посты подмешиваются при чтении
+        timeline.read_at_view_time(
+            User.objects.get(username='author0').pk
+        )
+        cache.clear()
+        with self.subTest(url='merged follow feed'):
+            response = self.client.get(reverse('posts:follow_index'))
+            self.assertIsInstance(
+                response.context['page_obj'].paginator.object_list,
+                timeline.MergedFeed,
+            )
+
+    def test_writes_within_budget(self):
+        """Изменяющие view укладываются в бюджет."""
+        requests = (
+            ('posts:add_comment', {'post_id': self.post.pk},
+             {'text': 'Кот кота котами в комментарии'}),
+            ('posts:profile_unfollow', {'username': 'author1'}, None),
+            ('posts:profile_follow', {'username': 'author1'}, None),
+            ('posts:post_create', {}, {'text': 'Пост'}),
+            ('posts:post_edit', {'post_id': self.post.pk},
+             {'text': 'Правка', 'group': self.group.pk}),
+        )
+        for name, kwargs, data in requests:
+            with self.subTest(view=name):
+                response = self.client.post(
+                    reverse(name, kwargs=kwargs), data
+                )
+                self.assertEqual(response.status_code, 302)
+
+    def test_fan_out_cost_does_not_grow(self):
+        """Раскладка по сотням подписчиков и постов стоит одного запроса."""
+        author = User.objects.create_user(username='popular')
+        # больше, чем помещалось в одну пачку bulk_create на SQLite
+        followers = User.objects.bulk_create(
+            User(username=f'follower{i}') for i in range(450)
+        )
+        Follow.objects.bulk_create(
+            Follow(user=user, author=author)
+            for user in User.objects.filter(username__in=[
+                user.username for user in followers
+            ])
+        )
+        Post.objects.bulk_create(
+            Post(author=author, text=f'Пост {i}') for i in range(450)
+        )
+        self.client.force_login(author)
+        response = self.client.post(
+            reverse('posts:post_create'),
+            {'text': 'Всем подписчикам', 'group': self.group.pk},
+        )
+        self.assertEqual(response.status_code, 302)
+        post = Post.objects.get(text='Всем подписчикам')
+        self.assertEqual(post.timeline_entries.count(), 450)
+        self.client.force_login(self.reader)
+        response = self.client.post(
+            reverse('posts:profile_follow', kwargs={'username': 'popular'})
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(
+            self.reader.timeline.filter(author=author).count(), 451
+        )
+
+    def test_repeated_queries_detected(self):
+        """Запрос автора для каждого поста считается N+1."""
+        with self.assertRaises(AssertionError):
+            with self.assertQueryBudget():
+                for post in Post.objects.all()[:ROWS]:
+                    post.author.username
+
+    def test_middleware_enforces_declared_budget(self):
+        """View, превысившая бюджет, роняет запрос."""
+        @query_budget(0)
+        def view(request):
+            Post.objects.exists()
+            return HttpResponse()
+
+        middleware = QueryBudgetMiddleware(
+            lambda request: middleware.process_view(
+                request, view, (), {}
+            ) or view(request)
+        )
+        with self.assertRaises(QueryBudgetExceeded):
+            middleware(RequestFactory().get('/'))
+
+    def test_unbudgeted_queries_not_counted(self):
+        """Запросы внутри unbudgeted() не входят в бюджет view."""
+        @query_budget(0)
+        def view(request):
+            with unbudgeted():
+                Post.objects.exists()
+            return HttpResponse()
+
+        middleware = QueryBudgetMiddleware(
+            lambda request: middleware.process_view(
+                request, view, (), {}
+            ) or view(request)
+        )
+        response = middleware(RequestFactory().get('/'))
+        self.assertEqual(response['X-Query-Count'], '0')
@@ -0,0 +1,111 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections
+from django.test import Client, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.db.replicas import STICKY_COOKIE
+from core.query_budget import QueryBudgetExceeded
+from posts import views
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRoutingTest(TransactionTestCase):
+    # реплика в тестах - зеркало default через отдельное соединение,
+    # оно видит только зафиксированные данные
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='reader')
+        self.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        self.post = Post.objects.create(
+            author=self.user, group=self.group, text='Пост'
+        )
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def replica_queries(self, url, method='get', **data):
+        with CaptureQueriesContext(connections['replica']) as queries:
+            response = getattr(self.client, method)(url, data)
+        self.assertIn(response.status_code, (200, 302))
+        return len(queries)
+
+    def test_feeds_read_from_replica(self):
+        """Ленты, профиль и пост читаются с реплики."""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': 'reader'}),
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}),
+            reverse('posts:follow_index'),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertGreater(self.replica_queries(url), 0)
+
+    def test_other_views_use_primary(self):
+        """Остальные view и запись не обращаются к реплике."""
+        self.assertEqual(
+            self.replica_queries(reverse('posts:post_create')), 0
+        )
+        self.assertEqual(self.replica_queries(
+            reverse('posts:add_comment', kwargs={'post_id': self.post.pk}),
+            method='post', text='Комментарий',
+        ), 0)
+
+    def test_reads_stick_to_primary_after_write(self):
+        """После записи автор читает из основной базы."""
+        self.client.post(reverse('posts:post_create'), {'text': 'Новый'})
+        self.assertIn(STICKY_COOKIE, self.client.cookies)
+        self.assertEqual(self.replica_queries(reverse('posts:index')), 0)
+        self.assertContains(self.client.get(reverse('posts:index')), 'Новый')
+
+    def test_reads_stick_to_primary_after_follow(self):
+        """Подписка по GET тоже закрепляет читателя за основной базой."""
+        User.objects.create_user(username='author')
+        response = self.client.get(
+            reverse('posts:profile_follow', kwargs={'username': 'author'})
+        )
+        self.assertIn(STICKY_COOKIE, response.cookies)
+        self.assertEqual(
+            self.replica_queries(reverse('posts:follow_index')), 0
+        )
+
+    def test_reads_without_writes_are_not_sticky(self):
+        """Чтение страниц не закрепляет за основной базой."""
+        response = self.client.get(reverse('posts:index'))
+        self.assertNotIn(STICKY_COOKIE, response.cookies)
+
+    def test_replica_queries_count_against_budget(self):
+        """Запросы к реплике входят в бюджет и заголовок X-Query-Count."""
+        url = reverse('posts:index')
+        self.assertGreater(self.replica_queries(url), 0)
+        cache.clear()
+        with_replica = int(self.client.get(url)['X-Query-Count'])
+        cache.clear()
+        with override_settings(DATABASE_REPLICAS=[]):
+            primary_only = int(self.client.get(url)['X-Query-Count'])
+        self.assertGreater(with_replica, 0)
+        self.assertEqual(with_replica, primary_only)
+        cache.clear()
+        with override_settings(QUERY_BUDGET_STRICT=True):
+            with mock.patch.object(views.index, 'query_budget', 0):
+                with self.assertRaises(QueryBudgetExceeded):
+                    self.client.get(url)
+
+    def test_sticky_cookie_expires(self):
+        """Закрепление за основной базой действует ограниченное время."""
+        self.client.post(reverse('posts:post_create'), {'text': 'Новый'})
+        cookie = self.client.cookies[STICKY_COOKIE]
+        self.assertEqual(cookie['max-age'], 10)
+        del self.client.cookies[STICKY_COOKIE]
+        self.assertGreater(self.replica_queries(reverse('posts:index')), 0)
@@ -0,0 +1,108 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts import search
+from posts.models import Comment, Post, SearchPosting
+from posts.stemmer import stem
+
+User = get_user_model()
+
+
+class StemmerTest(TestCase):
+
+    def test_word_forms_share_stem(self):
+        """Формы одного слова сводятся к одной основе."""
+        forms = {
+            'кот': ('кот', 'кота', 'котами', 'коты'),
+            'красив': ('красивая', 'красивые', 'красивейший'),
+            'вдохновен': ('вдохновение', 'вдохновения', 'Вдохновением'),
+        }
+        for expected, words in forms.items():
+            for word in words:
+                with self.subTest(word=word):
+                    self.assertEqual(stem(word), expected)
+
+    def test_latin_word_kept(self):
+        """Слова не на кириллице не меняются."""
+        self.assertEqual(stem('Django'), 'django')
+
+
+class SearchTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+
+    def setUp(self):
+        self.client = Client()
+        self.url = reverse('posts:search')
+        cache.clear()
+
+    def found(self, query):
+        return list(search.search(query).order_by(*search.SEARCH_ORDERING))
+
+    def test_post_indexed_on_save_and_edit(self):
+        """Пост ищется по формам слов и переиндексируется при правке."""
+        post = Post.objects.create(author=self.author, text='Рыжие котики')
+        self.assertEqual(self.found('котик'), [post])
+        post.text = 'Серые собаки'
+        post.save()
+        self.assertEqual(self.found('котик'), [])
+        self.assertEqual(self.found('собака'), [post])
+
+    def test_comments_indexed_incrementally(self):
+        """Слова комментария добавляются в индекс и убираются из него."""
+        post = Post.objects.create(author=self.author, text='Про погоду')
+        comment = Comment.objects.create(
+            post=post, author=self.reader, text='Отличные снегопады'
+        )
+        self.assertEqual(self.found('снегопад'), [post])
+        comment.delete()
+        self.assertEqual(self.found('снегопад'), [])
+        self.assertFalse(SearchPosting.objects.filter(weight__lte=0).exists())
+
+    def test_results_ranked(self):
+        """Пост, где слово в тексте, выше поста, где оно в комментарии."""
+        in_comment = Post.objects.create(author=self.author, text='Заметка')
+        Comment.objects.create(
+            post=in_comment, author=self.reader, text='Про жирафа'
+        )
+        in_text = Post.objects.create(author=self.author, text='Жирафы')
+        Post.objects.create(author=self.author, text='Слоны')
+        self.assertEqual(self.found('жираф'), [in_text, in_comment])
+
+    def test_search_view_pages_by_rank(self):
+        """Страницы выдачи листаются по курсору без повторов и пропусков."""
+        posts = [
+            Post.objects.create(
+                author=self.author, text='Коты ' + 'кот ' * (i % 3)
+            )
+            for i in range(15)
+        ]
+        first = self.client.get(self.url, {'q': 'кот'})
+        page_obj = first.context['page_obj']
+        self.assertIn(
+            'q=%D0%BA%D0%BE%D1%82&amp;after=', first.content.decode()
+        )
+        second = self.client.get(
+            self.url, {'q': 'кот', 'after': page_obj.next_cursor}
+        ).context['page_obj']
+        shown = list(page_obj) + list(second)
+        self.assertEqual(len(shown), len(posts))
+        self.assertEqual(set(shown), set(posts))
+        ranks = [post.rank for post in shown]
+        self.assertEqual(ranks, sorted(ranks, reverse=True))
+        back = self.client.get(
+            self.url, {'q': 'кот', 'before': second.previous_cursor}
+        ).context['page_obj']
+        self.assertEqual(list(back), list(page_obj))
+
+    def test_empty_query(self):
+        """Пустой запрос показывает пустую выдачу."""
+        Post.objects.create(author=self.author, text='Текст')
+        response = self.client.get(self.url, {'q': ' и '})
+        self.assertEqual(len(response.context['page_obj']), 0)
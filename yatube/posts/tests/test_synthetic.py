@@ -0,0 +1,96 @@
+import io
+import random
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models import F
+from django.test import TestCase
+
+from posts.models import Comment, Follow, Group, Post, UserCounters
+from posts.synthetic import PASSWORD, Zipf
+
+User = get_user_model()
+
+
+class ZipfTest(TestCase):
+
+    def test_skewed_and_bounded(self):
+        """Первые номера выпадают чаще всего, все номера в границах."""
+        pick = Zipf(100, 1.1, random.Random(0))
+        counts = Counter(pick() for _ in range(10000))
+        self.assertTrue(all(0 <= number < 100 for number in counts))
+        self.assertEqual(counts.most_common(1)[0][0], 0)
+        self.assertGreater(counts[0], 10 * counts[50])
+
+
+class GenerateDataTest(TestCase):
+
+    def generate(self, **options):
+        output = io.StringIO()
+        call_command(
+            'generate_data', users=30, groups=3, posts=200, follows=100,
+            comments=300, viral_posts=2, viral_comments=50, seed=1,
+            batch_size=64, stdout=output, **options
+        )
+        return output.getvalue()
+
+    def test_creates_skewed_data(self):
+        """Создаются все таблицы, популярность распределена неравномерно."""
+        output = self.generate()
+        self.assertIn('posts: 200', output)
+        self.assertEqual(User.objects.count(), 30)
+        self.assertEqual(Group.objects.count(), 3)
+        self.assertEqual(Post.objects.count(), 200)
+        self.assertEqual(Comment.objects.count(), 300 + 2 * 50)
+        self.assertTrue(Follow.objects.exists())
+        self.assertFalse(Follow.objects.filter(user=F('author')).exists())
+        posts = Counter(Post.objects.values_list('author', flat=True))
+        self.assertGreater(posts.most_common(1)[0][1], 200 / 30 * 3)
+        self.assertGreaterEqual(
+            Post.objects.order_by('-comments_count').first().comments_count,
+            50,
+        )
+        user = User.objects.first()
+        self.assertTrue(user.check_password(PASSWORD))
+
+    def test_rebuilds_derived_data(self):
+        """Счетчики и ленты соответствуют созданным данным."""
+        self.generate()
+        counters = UserCounters.objects.get(user=User.objects.first())
+        self.assertEqual(
+            counters.posts_count,
+            Post.objects.filter(author=counters.user).count(),
+        )
+        follow = Follow.objects.first()
+        self.assertEqual(
+            follow.user.timeline.count(),
+            Post.objects.filter(
+                author__following__user=follow.user
+            ).count(),
+        )
+
+    def test_continues_existing_ids(self):
+        """Повторный запуск добавляет данные, а не затирает их."""
+        self.generate(skip_rebuild=True)
+        self.generate(skip_rebuild=True)
+        self.assertEqual(User.objects.count(), 60)
+        self.assertEqual(Post.objects.count(), 400)
+
+
+class LoadTestTest(TestCase):
+
+    def test_reports_every_route(self):
+        """Нагрузочный прогон в одном процессе проходит без ошибок."""
+        call_command(
+            'generate_data', users=10, groups=2, posts=30, follows=20,
+            comments=30, seed=2, stdout=io.StringIO()
+        )
+        output = io.StringIO()
+        call_command(
+            'loadtest', workers=1, requests=60, sessions=3, stdout=output
+        )
+        lines = output.getvalue().splitlines()
+        self.assertIn('Всего 60 запросов', lines[-1])
+        for line in lines[1:-1]:
+            self.assertEqual(line.split()[-1], '0', line)
@@ -0,0 +1,144 @@
+import shutil
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts import constants, thumbnails
+from posts.models import ImageVariant, Post
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, THUMBNAIL_WORKERS=2)
+class ThumbnailTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.post = Post.objects.create(
+            author=cls.author,
+            text='Пост с картинкой',
+            image=SimpleUploadedFile(
+                name='small.gif', content=SMALL_GIF, content_type='image/gif'
+            ),
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.client = Client()
+        self.url = reverse(
+            'posts:post_detail', kwargs={'post_id': self.post.pk}
+        )
+        cache.clear()
+
+    def test_placeholder_until_thumbnail_ready(self):
+        """Пока миниатюры нет, выводится заглушка, затем картинка."""
+        html = self.client.get(self.url).content.decode()
+        self.assertIn('aspect-ratio: 960 / 339', html)
+        self.assertNotIn('<img class="card-img', html)
+        with override_settings(THUMBNAIL_WORKERS=0):
+            thumbnails.pool.submit_post(self.post)
+        html = self.client.get(self.url).content.decode()
+        self.assertIn('<img class="card-img', html)
+
+    def test_ready_thumbnail_resets_feed_cards(self):
+        """Готовая миниатюра сбрасывает карточку с заглушкой."""
+        index = reverse('posts:index')
+        self.assertNotIn(
+            '<img class="card-img', self.client.get(index).content.decode()
+        )
+        with override_settings(THUMBNAIL_WORKERS=0):
+            thumbnails.pool.submit_post(self.post)
+        self.assertIn(
+            '<img class="card-img', self.client.get(index).content.decode()
+        )
+
+    def test_variants_rendered_as_srcset(self):
+        """Копии всех ширин и форматов попадают в srcset."""
+        with override_settings(THUMBNAIL_WORKERS=0):
+            thumbnails.pool.submit_post(self.post)
+        formats = thumbnails.variant_formats()
+        variants = ImageVariant.objects.filter(post=self.post)
+        self.assertEqual(
+            variants.count(),
+            len(constants.IMAGE_VARIANT_WIDTHS) * len(formats)
+        )
+        html = self.client.get(self.url).content.decode()
+        for variant in variants:
+            with self.subTest(width=variant.width, format=variant.format):
+                self.assertIn(f'{variant.image.url} {variant.width}w', html)
+        if 'WEBP' in formats:
+            self.assertIn('type="image/webp"', html)
+
+    def test_variants_replaced_with_image(self):
+        """После замены картинки копии прежней удаляются."""
+        with override_settings(THUMBNAIL_WORKERS=0):
+            thumbnails.pool.submit_post(self.post)
+            post = Post.objects.get(pk=self.post.pk)
+            post.image = SimpleUploadedFile(
+                name='other.gif', content=SMALL_GIF, content_type='image/gif'
+            )
+            post.save()
+            thumbnails.pool.submit_post(post)
+        sources = set(
+            ImageVariant.objects.values_list('source', flat=True)
+        )
+        self.assertEqual(sources, {post.image.name})
+
+    def test_pool_skips_duplicate_jobs(self):
+        """Одинаковые задания в очереди выполняются один раз."""
+        pool = thumbnails.ThumbnailPool()
+        generate = mock.MagicMock()
+        with mock.patch.object(thumbnails, 'generate', generate):
+            # потоки запускаются, когда оба задания уже отправлены
+            with mock.patch('threading.Thread.start'):
+                pool.submit('posts/a.gif', '10x10', {})
+                pool.submit('posts/a.gif', '10x10', {})
+            for thread in pool._threads:
+                thread.start()
+            pool.join()
+        generate.assert_called_once_with('posts/a.gif', '10x10', {})
+
+    def test_post_reset_once_per_upload(self):
+        """Карточки и страницы поста сбрасываются раз на все копии."""
+        bump = mock.MagicMock()
+        with override_settings(THUMBNAIL_WORKERS=0), \
+                mock.patch.object(thumbnails.cards, 'bump', bump):
+            thumbnails.pool.submit_post(self.post)
+        self.assertGreater(ImageVariant.objects.count(), 1)
+        bump.assert_called_once_with('post', self.post.pk)
+
+    def test_pool_resets_post_after_last_job(self):
+        """Пул сбрасывает пост после последнего задания по картинке."""
+        pool = thumbnails.ThumbnailPool()
+        generate = mock.MagicMock(return_value=[self.post])
+        reset_posts = mock.MagicMock()
+        with mock.patch.object(thumbnails, 'generate', generate), \
+                mock.patch.object(thumbnails, 'reset_posts', reset_posts):
+            pool.submit_post(self.post)
+            pool.join()
+        self.assertGreater(generate.call_count, 1)
+        reset_posts.assert_called_once()
+        self.assertEqual(list(reset_posts.call_args[0][0]), [self.post])
@@ -0,0 +1,149 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from posts import timeline
+from posts.models import Follow, Post, TimelineEntry
+from posts.paginators import CursorPaginator
+
+User = get_user_model()
+
+
+class TimelineTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.follower = User.objects.create_user(username='follower')
+        cls.author = User.objects.create_user(username='author')
+        cls.other = User.objects.create_user(username='other')
+        cls.old_post = Post.objects.create(
+            author=cls.author,
+            text='Пост до подписки',
+        )
+
+    def feed(self):
+        return list(timeline.feed_for(self.follower))
+
+    def test_follow_backfills_timeline(self):
+        """Подписка переносит в ленту уже опубликованные посты."""
+        Follow.objects.create(user=self.follower, author=self.author)
+        self.assertEqual(self.feed(), [self.old_post])
+
+    def test_new_post_fanned_out_to_followers(self):
+        """Новый пост раскладывается только по лентам подписчиков."""
+        Follow.objects.create(user=self.follower, author=self.author)
+        post = Post.objects.create(author=self.author, text='Новый пост')
+        self.assertTrue(TimelineEntry.objects.filter(
+            user=self.follower, post=post).exists()
+        )
+        self.assertFalse(TimelineEntry.objects.filter(
+            user=self.other, post=post).exists()
+        )
+
+    def test_unfollow_clears_timeline(self):
+        """После отписки посты автора пропадают из ленты."""
+        Follow.objects.create(user=self.follower, author=self.author)
+        Follow.objects.filter(user=self.follower, author=self.author).delete()
+        self.assertEqual(self.feed(), [])
+        self.assertFalse(TimelineEntry.objects.exists())
+
+    @mock.patch('posts.constants.TIMELINE_FANOUT_LIMIT', 1)
+    def test_big_author_read_on_demand(self):
+        """Посты популярного автора подмешиваются в ленту при чтении."""
+        follow = Follow.objects.create(user=self.follower, author=self.author)
+        post = Post.objects.create(author=self.author, text='Новый пост')
+        follow.refresh_from_db()
+        self.assertFalse(follow.fanout)
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertEqual(self.feed(), [post, self.old_post])
+
+    @mock.patch('posts.constants.TIMELINE_FANOUT_LIMIT', 2)
+    def test_limit_switches_whole_author(self):
+        """Достигнутый предел переводит в чтение всех подписчиков автора."""
+        first = Follow.objects.create(user=self.follower, author=self.author)
+        self.assertTrue(TimelineEntry.objects.exists())
+        Follow.objects.create(user=self.other, author=self.author)
+        first.refresh_from_db()
+        self.assertFalse(first.fanout)
+        self.assertFalse(Follow.objects.filter(fanout=True).exists())
+        self.assertFalse(TimelineEntry.objects.exists())
+        post = Post.objects.create(author=self.author, text='Новый пост')
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertEqual(self.feed(), [post, self.old_post])
+
+    @mock.patch('posts.constants.TIMELINE_FANOUT_LIMIT', 2)
+    def test_merged_feed_pages(self):
+        """Страницы смешанной ленты идут по дате без пропусков и повторов."""
+        Follow.objects.create(user=self.follower, author=self.author)
+        Follow.objects.create(user=self.other, author=self.author)
+        Follow.objects.create(user=self.follower, author=self.other)
+        for i in range(5):
+            Post.objects.create(author=self.author, text=f'Автор {i}')
+            Post.objects.create(author=self.other, text=f'Другой {i}')
+        expected = list(Post.objects.filter(
+            author__in=(self.author, self.other)
+        ).order_by('-pub_date', '-pk'))
+        paginator = CursorPaginator(
+            timeline.feed_for(self.follower), 3, timeline.FEED_ORDERING,
+            count_pages=False,
+        )
+        page = paginator.get_page(1)
+        pages = [list(page)]
+        while page.has_next():
+            page = paginator.page_after(page.next_cursor)
+            pages.append(list(page))
+        self.assertEqual(sum(pages, []), expected)
+        self.assertEqual(
+            list(paginator.page_before(page.previous_cursor)), pages[-2]
+        )
+        self.assertEqual(list(paginator.get_page(2)), pages[1])
+
+    @mock.patch('posts.constants.TIMELINE_FANOUT_LIMIT', 2)
+    def test_merged_feed_after_last_row(self):
+        """Курсор последней записи смешанной ленты открывает ее страницу."""
+        Follow.objects.create(user=self.follower, author=self.author)
+        Follow.objects.create(user=self.other, author=self.author)
+        Follow.objects.create(user=self.follower, author=self.other)
+        for i in range(4):
+            Post.objects.create(author=self.author, text=f'Автор {i}')
+            Post.objects.create(author=self.other, text=f'Другой {i}')
+        feed = timeline.feed_for(self.follower)
+        self.assertIsInstance(feed, timeline.MergedFeed)
+        paginator = CursorPaginator(
+            feed, 3, timeline.FEED_ORDERING, count_pages=False
+        )
+        rows = list(feed)
+        cursor = paginator.encode_cursor(3, rows[-1])
+        page = paginator.page_after(cursor)
+        self.assertEqual(list(page), rows[-3:])
+        self.assertFalse(page.has_next())
+
+    def test_backfill_command(self):
+        """Команда backfill_timeline восстанавливает ленты."""
+        Follow.objects.create(user=self.follower, author=self.author)
+        TimelineEntry.objects.all().delete()
+        call_command('backfill_timeline', stdout=mock.MagicMock())
+        self.assertEqual(self.feed(), [self.old_post])
+
+    @mock.patch('posts.constants.TIMELINE_FANOUT_LIMIT', 2)
+    def test_rebuild_all(self):
+        """rebuild_all раскладывает посты и переводит популярных в чтение."""
+        Follow.objects.create(user=self.follower, author=self.author)
+        Follow.objects.create(user=self.follower, author=self.other)
+        Follow.objects.create(user=self.other, author=self.author)
+        other_post = Post.objects.create(author=self.other, text='Другой')
+        TimelineEntry.objects.all().delete()
+        Follow.objects.update(fanout=True)
+        timeline.rebuild_all()
+        self.assertEqual(
+            set(Follow.objects.values_list('author', 'fanout')),
+            {(self.author.pk, False), (self.other.pk, True)},
+        )
+        self.assertEqual(
+            list(TimelineEntry.objects.values_list('user', 'post')),
+            [(self.follower.pk, other_post.pk)],
+        )
+        self.assertEqual(self.feed(), [other_post, self.old_post])
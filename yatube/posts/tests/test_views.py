@@ -346,7 +346,8 @@ class PaginatorViewsTest(TestCase):
         """Проверяет работу кэша главной страницы."""
         response = self.authorized_client.get(reverse('posts:index'))
         full_page = response.content
-        Post.objects.all().delete()
+        # изменение в обход моделей не сбрасывает кэш
+        Post.objects.update(text='Измененный текст')
         response = self.authorized_client.get(reverse('posts:index'))
         cached_page = response.content
         self.assertEqual(
@@ -360,3 +361,12 @@ class PaginatorViewsTest(TestCase):
             full_page,
             cleaned_page
         )
+
+    def test_cache_index_invalidated_on_change(self):
+        """Кэш главной страницы сбрасывается при удалении поста."""
+        response = self.authorized_client.get(reverse('posts:index'))
+        full_page = response.content
+        Post.objects.all().delete()
+        response = self.authorized_client.get(reverse('posts:index'))
+        self.assertNotEqual(full_page, response.content)
+        self.assertEqual(len(response.context['page_obj']), 0)
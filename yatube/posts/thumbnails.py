@@ -0,0 +1,263 @@
+"""
+Фоновая подготовка миниатюр картинок постов.
+
+Бэкенд sorl-thumbnail ``QueuedThumbnailBackend`` отдает в шаблон только
+уже готовые миниатюры. Недостающая миниатюра ставится в локальную очередь,
+которую разбирает пул потоков, а шаблон до ее готовности выводит заглушку
+из блока ``{% empty %}``. Миниатюры новых картинок ставятся в очередь
+сразу при сохранении поста. Задания уходят в очередь после фиксации
+транзакции, чтобы поток видел сохраненные данные.
+
+Тем же пулом для каждой картинки поста готовятся копии нескольких ширин
+(``IMAGE_VARIANT_WIDTHS``) в JPEG и, если Pillow его поддерживает, в WebP.
+Готовые копии записываются в ``ImageVariant``, по ним шаблоны строят
+``srcset``.
+
+Число потоков задает настройка ``THUMBNAIL_WORKERS``; при нуле миниатюры
+создаются прямо во время запроса, как в обычном sorl-thumbnail.
+"""
+import logging
+import os
+import queue
+import threading
+
+from django.conf import settings
+from PIL import features
+from django.db import close_old_connections, transaction
+from sorl.thumbnail import default
+from sorl.thumbnail.base import ThumbnailBackend
+from sorl.thumbnail.conf import defaults as sorl_defaults
+from sorl.thumbnail.conf import settings as sorl_settings
+from sorl.thumbnail.images import ImageFile
+
+from core import metrics
+from core.query_budget import unbudgeted
+
+from . import cards, constants, page_cache
+from .models import ImageVariant, Post
+
+logger = logging.getLogger(__name__)
+
+
+class TimedThumbnailBackend(ThumbnailBackend):
+    """Записывает в метрики время создания каждой миниатюры."""
+
+    def _create_thumbnail(self, *args, **kwargs):
+        with metrics.thumbnail_timer():
+            return super()._create_thumbnail(*args, **kwargs)
+
+
+class QueuedThumbnailBackend(TimedThumbnailBackend):
+    """Отдает готовые миниатюры, недостающие ставит в очередь."""
+
+    def get_thumbnail(self, file_, geometry_string, **options):
+        if not settings.THUMBNAIL_WORKERS:
+            # без пула миниатюра делается в запросе, но в бюджет view
+            # не входит: в рабочем режиме ее создает поток пула
+            with unbudgeted():
+                return super().get_thumbnail(
+                    file_, geometry_string, **options
+                )
+        thumbnail = default.kvstore.get(
+            self.thumbnail_file(file_, geometry_string, options)
+        )
+        if thumbnail is None:
+            name = ImageFile(file_).name
+            transaction.on_commit(
+                lambda: pool.submit(name, geometry_string, options)
+            )
+        return thumbnail
+
+    def thumbnail_file(self, file_, geometry_string, options):
+        """Файл миниатюры с теми же параметрами, что и у sorl."""
+        source = ImageFile(file_)
+        options = dict(options)
+        if sorl_settings.THUMBNAIL_PRESERVE_FORMAT:
+            options.setdefault('format', self._get_format(source))
+        for key, value in self.default_options.items():
+            options.setdefault(key, value)
+        for key, attr in self.extra_options:
+            value = getattr(sorl_settings, attr)
+            if value != getattr(sorl_defaults, attr):
+                options.setdefault(key, value)
+        name = self._get_thumbnail_filename(source, geometry_string, options)
+        return ImageFile(name, default.storage)
+
+
+def variant_geometries():
+    """Размеры копий картинки с пропорциями основной миниатюры."""
+    width, height = map(int, constants.THUMBNAIL_GEOMETRY.split('x'))
+    return [
+        f'{variant}x{round(variant * height / width)}'
+        for variant in constants.IMAGE_VARIANT_WIDTHS
+    ]
+
+
+def variant_formats():
+    """Форматы копий, доступные установленному Pillow."""
+    if features.check('webp'):
+        return ('JPEG', 'WEBP')
+    return ('JPEG',)
+
+
+def generate(name, geometry_string, options):
+    """
+    Создает миниатюру и записывает ее в варианты картинок постов.
+
+    Возвращает посты, у которых появилась новая копия картинки.
+    """
+    source = ImageFile(name, default.storage)
+    thumbnail_file = QueuedThumbnailBackend().thumbnail_file(
+        source, geometry_string, options
+    )
+    thumbnail = default.kvstore.get(thumbnail_file)
+    if thumbnail is None:
+        TimedThumbnailBackend().get_thumbnail(
+            source, geometry_string, **options
+        )
+        thumbnail = default.kvstore.get(thumbnail_file)
+    if thumbnail is None:
+        # исходного файла нет, sorl не создал миниатюру
+        return []
+    image_format = options.get('format', sorl_settings.THUMBNAIL_FORMAT)
+    return [
+        post for post in Post.objects.filter(image=name)
+        if record_variant(post, thumbnail, image_format.lower())
+    ]
+
+
+def record_variant(post, thumbnail, image_format):
+    """Записывает копию картинки; False, если она уже была записана."""
+    variants = ImageVariant.objects.filter(post=post)
+    if variants.filter(
+        source=post.image.name, image=thumbnail.name
+    ).exists():
+        return False
+    # копии прежней картинки после ее замены больше не нужны
+    variants.exclude(source=post.image.name).delete()
+    ImageVariant.objects.update_or_create(
+        post=post,
+        width=thumbnail.width,
+        format=image_format,
+        defaults={
+            'source': post.image.name,
+            'image': thumbnail.name,
+            'height': thumbnail.height,
+        },
+    )
+    return True
+
+
+def reset_posts(posts):
+    """Сбрасывает карточки и страницы лент постов с новыми копиями."""
+    for post in posts:
+        cards.bump('post', post.pk)
+        page_cache.bump_post_pages(post)
+
+
+class ThumbnailPool:
+    """
+    Очередь заданий на миниатюры и пул разбирающих ее потоков.
+
+    Карточки и страницы поста сбрасываются один раз, когда готовы все
+    задания по его картинке, а не после каждой копии.
+    """
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._queue = queue.Queue()
+        self._threads = []
+        self._pending = set()
+        # посты с новыми копиями по имени картинки
+        self._changed = {}
+        self._lock = threading.Lock()
+
+    def submit(self, name, geometry_string, options):
+        self._submit(name, [(geometry_string, options)])
+
+    def submit_post(self, post):
+        """Ставит в очередь все копии картинки поста."""
+        if not post.image:
+            return
+        self._submit(post.image.name, [
+            (
+                geometry_string,
+                {**constants.THUMBNAIL_OPTIONS, 'format': image_format},
+            )
+            for geometry_string in variant_geometries()
+            for image_format in variant_formats()
+        ])
+
+    def _submit(self, name, tasks):
+        workers = settings.THUMBNAIL_WORKERS
+        if not workers:
+            # работа пула и без потоков не входит в бюджет view
+            with unbudgeted():
+                for geometry_string, options in tasks:
+                    self._generate(name, geometry_string, options)
+                self._finish(name)
+            return
+        jobs = [
+            (name, geometry_string, tuple(sorted(options.items())))
+            for geometry_string, options in tasks
+        ]
+        with self._lock:
+            if self._pid != os.getpid():
+                # потоки не переживают fork
+                self._reset()
+            # все задания картинки попадают в очередь разом, чтобы посты
+            # не сбрасывались до готовности последнего из них
+            jobs = [job for job in jobs if job not in self._pending]
+            self._pending.update(jobs)
+            while jobs and len(self._threads) < workers:
+                thread = threading.Thread(
+                    target=self._work,
+                    name=f'thumbnails-{len(self._threads)}',
+                    daemon=True,
+                )
+                thread.start()
+                self._threads.append(thread)
+        for job in jobs:
+            self._queue.put(job)
+
+    def _generate(self, name, geometry_string, options):
+        posts = generate(name, geometry_string, options)
+        with self._lock:
+            changed = self._changed.setdefault(name, {})
+            changed.update((post.pk, post) for post in posts)
+
+    def _finish(self, name):
+        with self._lock:
+            if any(job[0] == name for job in self._pending):
+                return
+            changed = self._changed.pop(name, {})
+        reset_posts(changed.values())
+
+    def join(self):
+        """Ждет, пока очередь не опустеет."""
+        self._queue.join()
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            name, geometry_string, options = job
+            close_old_connections()
+            try:
+                self._generate(name, geometry_string, dict(options))
+            except Exception:
+                logger.exception('Не удалось создать миниатюру %s', name)
+            with self._lock:
+                self._pending.discard(job)
+            try:
+                self._finish(name)
+            except Exception:
+                logger.exception('Не удалось сбросить посты %s', name)
+            finally:
+                close_old_connections()
+                self._queue.task_done()
+
+
+pool = ThumbnailPool()
@@ -0,0 +1,217 @@
+"""
+Лента подписок с раскладкой постов при публикации (fan-out-on-write).
+
+Пост автора сразу записывается в ленты его подписчиков, и страница
+подписок читается из индекса ``TimelineEntry`` по пользователю.
+Для авторов с большим числом подписчиков раскладка не выполняется:
+все подписки на такого автора помечены ``Follow.fanout = False``, и его
+посты подмешиваются в ленту при чтении (fan-out-on-read).
+"""
+import heapq
+from functools import reduce
+from itertools import islice
+from operator import or_
+
+from django.db import connection
+from django.db.models import Count, F, Q
+
+from . import constants
+from .models import Follow, Post, TimelineEntry
+
+# порядок ленты подписок: по копиям даты и id поста в TimelineEntry,
+# чтобы страница читалась из индекса timeline_user_pub_date_idx
+FEED_ORDERING = ('-feed_date', '-feed_post')
+
+
+def _insert_entries(select, params):
+    """
+    Записывает в ленты строки выборки одним ``INSERT ... SELECT``.
+
+    select выбирает user_id, post_id, author_id и pub_date; уже
+    разложенные посты пропускаются. Число запросов не зависит от числа
+    подписчиков и постов.
+    """
+    ops = connection.ops
+    quote = ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'{ops.insert_statement(ignore_conflicts=True)} '
+            f'{quote(TimelineEntry._meta.db_table)} '
+            f'(user_id, post_id, author_id, pub_date) {select} '
+            f'{ops.ignore_conflicts_suffix_sql(ignore_conflicts=True)}',
+            params,
+        )
+
+
+def _tables():
+    quote = connection.ops.quote_name
+    return (quote(model._meta.db_table) for model in (Follow, Post))
+
+
+def fan_out(post):
+    """Раскладывает новый пост по лентам подписчиков автора."""
+    follow, posts = _tables()
+    _insert_entries(
+        f'SELECT f.user_id, p.id, p.author_id, p.pub_date '
+        f'FROM {follow} f JOIN {posts} p ON p.author_id = f.author_id '
+        f'WHERE p.id = %s AND f.fanout = %s',
+        [post.pk, True],
+    )
+
+
+def subscribe(follow):
+    """
+    Заполняет ленту подписчика постами автора.
+
+    Когда у автора набирается ``TIMELINE_FANOUT_LIMIT`` подписчиков,
+    в режим чтения переводятся все подписки на него, как в
+    ``rebuild_all``, и лента не заполняется.
+    """
+    followers = Follow.objects.filter(author_id=follow.author_id)
+    if followers.count() >= constants.TIMELINE_FANOUT_LIMIT:
+        read_at_view_time(follow.author_id)
+        follow.fanout = False
+        return
+    _, posts = _tables()
+    _insert_entries(
+        f'SELECT %s, p.id, p.author_id, p.pub_date '
+        f'FROM {posts} p WHERE p.author_id = %s',
+        [follow.user_id, follow.author_id],
+    )
+
+
+def read_at_view_time(author_id):
+    """Переводит все подписки на автора в режим чтения."""
+    followers = Follow.objects.filter(author_id=author_id)
+    if followers.filter(fanout=True).update(fanout=False):
+        # посты автора больше не нужны в лентах: они подмешиваются
+        TimelineEntry.objects.filter(
+            user_id__in=followers.values('user_id'), author_id=author_id
+        ).delete()
+
+
+def unsubscribe(follow):
+    """Убирает посты автора из ленты бывшего подписчика."""
+    TimelineEntry.objects.filter(
+        user_id=follow.user_id, author_id=follow.author_id
+    ).delete()
+
+
+def rebuild(follows):
+    """Пересобирает ленты по переданным подпискам."""
+    for follow in follows.iterator():
+        unsubscribe(follow)
+        Follow.objects.filter(pk=follow.pk).update(fanout=True)
+        subscribe(follow)
+
+
+def rebuild_all():
+    """
+    Пересобирает все ленты разом, без запросов на каждую подписку.
+
+    Подписки на авторов с числом подписчиков от ``TIMELINE_FANOUT_LIMIT``
+    переводятся в режим чтения, остальные раскладываются одним
+    ``INSERT ... SELECT``. Нужна после массовой загрузки данных.
+    """
+    TimelineEntry.objects.all().delete()
+    popular = Follow.objects.values('author_id').annotate(
+        followers=Count('pk')
+    ).filter(
+        followers__gte=constants.TIMELINE_FANOUT_LIMIT
+    ).values('author_id')
+    Follow.objects.update(fanout=True)
+    Follow.objects.filter(author_id__in=popular).update(fanout=False)
+    follow, posts = _tables()
+    _insert_entries(
+        f'SELECT f.user_id, p.id, p.author_id, p.pub_date '
+        f'FROM {follow} f JOIN {posts} p ON p.author_id = f.author_id '
+        f'WHERE f.fanout = %s',
+        [True],
+    )
+
+
+class MergedFeed:
+    """
+    Разложенные посты ленты вместе с постами авторов, читаемых при показе.
+
+    Повторяет ту часть QuerySet, которая нужна паджинатору и валидаторам:
+    ``filter``, ``order_by`` и срез применяются к каждой выборке, а
+    строки сливаются по ключу сортировки. Сортировка - по убыванию или
+    по возрастанию всех полей сразу, как ``FEED_ORDERING``.
+    """
+
+    model = Post
+
+    def __init__(self, *parts, ordering=FEED_ORDERING):
+        self.parts = parts
+        self.ordering = tuple(ordering)
+
+    def _apply(self, method, *args, **kwargs):
+        return MergedFeed(
+            *(getattr(part, method)(*args, **kwargs) for part in self.parts),
+            ordering=self.ordering,
+        )
+
+    def filter(self, *args, **kwargs):
+        return self._apply('filter', *args, **kwargs)
+
+    def select_related(self, *fields):
+        return self._apply('select_related', *fields)
+
+    def order_by(self, *fields):
+        feed = self._apply('order_by', *fields)
+        feed.ordering = fields
+        return feed
+
+    def count(self):
+        return sum(part.count() for part in self.parts)
+
+    def aggregate(self, **aggregates):
+        """Агрегаты по постам всех выборок одним запросом."""
+        posts = reduce(or_, (
+            Q(pk__in=part.order_by().values('pk')) for part in self.parts
+        ))
+        return Post.objects.filter(posts).aggregate(**aggregates)
+
+    def _key(self, obj):
+        return tuple(getattr(obj, name.lstrip('-')) for name in self.ordering)
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+        start, stop = key.start or 0, key.stop
+        rows = heapq.merge(
+            *(part[:stop] if stop is not None else part
+              for part in self.parts),
+            key=self._key,
+            reverse=self.ordering[0].startswith('-'),
+        )
+        return list(islice(rows, start, stop))
+
+    def __iter__(self):
+        return iter(self[0:None])
+
+
+def feed_for(user):
+    """
+    Посты ленты подписок пользователя в порядке ``FEED_ORDERING``.
+
+    Разложенные посты выбираются соединением с ``TimelineEntry`` и
+    сортируются по ее полям, поэтому страница читается из индекса ленты.
+    Посты авторов в режиме чтения подмешиваются, только если такие
+    подписки есть.
+    """
+    fanned_out = Post.objects.filter(timeline_entries__user=user).annotate(
+        feed_date=F('timeline_entries__pub_date'),
+        feed_post=F('timeline_entries__post_id'),
+    ).order_by(*FEED_ORDERING)
+    read_time = list(Follow.objects.filter(
+        user=user, fanout=False
+    ).values_list('author_id', flat=True))
+    if not read_time:
+        return fanned_out
+    return MergedFeed(fanned_out, Post.objects.filter(
+        author_id__in=read_time
+    ).annotate(
+        feed_date=F('pub_date'), feed_post=F('pk')
+    ).order_by(*FEED_ORDERING))
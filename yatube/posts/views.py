@@ -1,49 +1,137 @@
-from django.core.paginator import Paginator
+from django.conf import settings
 from django.shortcuts import render, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import redirect
-from django.views.decorators.cache import cache_page
+from django.utils.http import urlencode
 
-from . import constants
+from core.db.replicas import replica_reads
+from core.query_budget import query_budget
+
+from . import constants, counters, search, timeline
+from .conditional import conditional, feed_validators, post_validators
 from .models import Post, Group, User, Follow
 from .forms import PostForm, CommentForm
+from .page_cache import cache_feed
+from .paginators import COMMENT_ORDERING, paginate
+from .search import SEARCH_ORDERING
+
+
+def render_feed(request, template_name, context):
+    """Страница ленты на движке FEED_TEMPLATE_ENGINE."""
+    return render(
+        request, template_name, context,
+        using=settings.FEED_TEMPLATE_ENGINE,
+    )
+
+
+def index_scopes(request):
+    return ('posts', 'users', 'groups')
+
+
+def group_scopes(request, slug):
+    group_id = Group.objects.filter(slug=slug).values_list(
+        'pk', flat=True
+    ).first()
+    return None if group_id is None else (f'group:{group_id}', 'users')
+
+
+def profile_scopes(request, username):
+    author_id = User.objects.filter(username=username).values_list(
+        'pk', flat=True
+    ).first()
+    return None if author_id is None else (f'author:{author_id}', 'groups')
+
+
+# страницы зависят от пользователя (шапка, подписка), поэтому
+# его id входит в ETag
+
+def index_validators(request):
+    return feed_validators(
+        Post.objects.all(), index_scopes(request), request.user.pk
+    )
+
+
+def group_validators(request, slug):
+    scopes = group_scopes(request, slug)
+    if scopes is None:
+        return None
+    return feed_validators(
+        Post.objects.filter(group__slug=slug), scopes, request.user.pk
+    )
+
+
+def profile_validators(request, username):
+    scopes = profile_scopes(request, username)
+    if scopes is None:
+        return None
+    return feed_validators(
+        Post.objects.filter(author__username=username), scopes,
+        request.user.pk,
+    )
+
+
+def post_detail_validators(request, post_id):
+    return post_validators(post_id, request.user.pk)
+
+
+def follow_scopes(request):
+    # лента меняется при публикации и правке постов и при подписках
+    return ('posts', 'users', 'groups', f'author:{request.user.pk}')
 
 
-@cache_page(20, key_prefix='index_page')
+def follow_feed(request):
+    """Лента подписок запроса: валидаторы и view получают одну выборку."""
+    if not hasattr(request, 'follow_feed'):
+        request.follow_feed = timeline.feed_for(request.user)
+    return request.follow_feed
+
+
+def follow_validators(request):
+    return feed_validators(
+        follow_feed(request), follow_scopes(request),
+        request.user.pk,
+    )
+
+
+@replica_reads
+@query_budget(6)
+@conditional(index_validators)
+@cache_feed(index_scopes)
 def index(request):
     post_list = Post.objects.select_related('author', 'group').all()
-    paginator = Paginator(post_list, constants.COUNT_POSTS_PAGE)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = paginate(request, post_list, count_pages=False)
     context = {
-        'page_number': page_number,
         'page_obj': page_obj,
     }
 
-    return render(request, 'posts/index.html', context)
+    return render_feed(request, 'posts/index.html', context)
 
 
+@replica_reads
+@query_budget(9)
+@conditional(group_validators)
+@cache_feed(group_scopes)
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
-    paginator = Paginator(posts, constants.COUNT_POSTS_PAGE)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    posts = group.posts.select_related('author', 'group')
+    page_obj = paginate(request, posts)
     context = {
         'group': group,
         'page_obj': page_obj,
     }
 
-    return render(request, 'posts/group_list.html', context)
+    return render_feed(request, 'posts/group_list.html', context)
 
 
+@replica_reads
+@query_budget(11)
+@conditional(profile_validators)
+@cache_feed(profile_scopes)
 def profile(request, username):
     author = get_object_or_404(User, username=username)
     user = request.user
     post_list_user = author.posts.select_related('author', 'group')
-    paginator = Paginator(post_list_user, constants.COUNT_POSTS_PAGE)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = paginate(request, post_list_user)
 
     following = False
     if user.is_authenticated:
@@ -56,22 +144,68 @@ def profile(request, username):
         'page_obj': page_obj,
         'author': author,
         'following': following,
+        'counters': counters.for_user(author),
     }
-    return render(request, 'posts/profile.html', context)
+    return render_feed(request, 'posts/profile.html', context)
+
+
+def comments_page(request, post):
+    """Страница комментариев поста вместе с их авторами."""
+    return paginate(
+        request,
+        post.comments.select_related('author'),
+        constants.COUNT_COMMENTS_PAGE,
+        COMMENT_ORDERING,
+    )
 
 
+@replica_reads
+@query_budget(9)
+@conditional(post_detail_validators)
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_object_or_404(
+        Post.objects.select_related('author', 'group'), pk=post_id
+    )
     form = CommentForm(request.POST or None)
-    comments = post.comments.all()
+    comments = comments_page(request, post)
     context = {
         'post': post,
         'form': form,
         'comments': comments,
+        'counters': counters.for_user(post.author),
     }
     return render(request, 'posts/post_detail.html', context)
 
 
+@query_budget(7)
+def post_search(request):
+    query = request.GET.get('q', '').strip()
+    page_obj = paginate(
+        request,
+        search.search(query).select_related('author', 'group'),
+        ordering=SEARCH_ORDERING,
+    )
+    context = {
+        'query': query,
+        'page_obj': page_obj,
+        # параметры запроса для ссылок паджинатора
+        'page_query': urlencode({'q': query}) + '&' if query else '',
+    }
+    return render(request, 'posts/search.html', context)
+
+
+@query_budget(3)
+def post_comments(request, post_id):
+    # следующие страницы комментариев подгружаются фрагментами HTML
+    post = get_object_or_404(Post, pk=post_id)
+    context = {
+        'post': post,
+        'comments': comments_page(request, post),
+    }
+    return render(request, 'posts/includes/comment_list.html', context)
+
+
+@query_budget(11)
 @login_required
 def post_create(request):
     form = PostForm(request.POST or None, files=request.FILES or None)
@@ -88,12 +222,14 @@ def post_create(request):
     return redirect('posts:profile', request.user)
 
 
+# перенос в другую группу меняет счетчики обеих групп
+@query_budget(11)
 @login_required
 def post_edit(request, post_id):
     post = get_object_or_404(Post, id=post_id)
 
     # Проверка на авторство.
-    if request.user != post.author:
+    if request.user.pk != post.author_id:
         return redirect('posts:post_detail', post_id=post.id)
 
     form = PostForm(
@@ -114,6 +250,7 @@ def post_edit(request, post_id):
     return render(request, 'posts/create_post.html', context)
 
 
+@query_budget(7)
 @login_required
 def add_comment(request, post_id):
     post = get_object_or_404(Post, id=post_id)
@@ -126,18 +263,25 @@ def add_comment(request, post_id):
     return redirect('posts:post_detail', post_id=post_id)
 
 
+# с авторами в режиме чтения страница выбирается из двух выборок
+@replica_reads
+@query_budget(7)
 @login_required
+@conditional(follow_validators)
 def follow_index(request):
-    post_list = Post.objects.filter(
-        author__following__user=request.user)
-    paginator = Paginator(post_list, constants.COUNT_POSTS_PAGE)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    post_list = follow_feed(request).select_related(
+        'author', 'group'
+    )
+    page_obj = paginate(
+        request, post_list, ordering=timeline.FEED_ORDERING,
+        count_pages=False,
+    )
 
     context = {'page_obj': page_obj, }
-    return render(request, 'posts/follow.html', context)
+    return render_feed(request, 'posts/follow.html', context)
 
 
+@query_budget(10)
 @login_required
 def profile_follow(request, username):
     author = get_object_or_404(User, username=username)
@@ -150,6 +294,7 @@ def profile_follow(request, username):
     return redirect('posts:profile', username=username)
 
 
+@query_budget(8)
 @login_required
 def profile_unfollow(request, username):
     author = get_object_or_404(User, username=username)
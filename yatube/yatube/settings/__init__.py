@@ -0,0 +1,23 @@
+"""
+Настройки проекта по профилям: dev, test и prod.
+
+Профиль задает переменная окружения YATUBE_PROFILE; без нее
+``manage.py test`` и pytest получают профиль test, остальное - dev.
+"""
+import os
+import sys
+
+from django.core.exceptions import ImproperlyConfigured
+
+TESTING = sys.argv[1:2] == ['test'] or 'pytest' in sys.modules
+
+PROFILE = os.environ.get('YATUBE_PROFILE') or ('test' if TESTING else 'dev')
+
+if PROFILE == 'dev':
+    from .dev import *  # noqa: F401,F403
+elif PROFILE == 'test':
+    from .test import *  # noqa: F401,F403
+elif PROFILE == 'prod':
+    from .prod import *  # noqa: F401,F403
+else:
+    raise ImproperlyConfigured(f'Неизвестный профиль настроек: {PROFILE}')
@@ -0,0 +1,192 @@
+"""Общие настройки всех профилей."""
+import os
+
+BASE_DIR = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+
+SECRET_KEY = 'r=(63qo)7h-@@=90xizdu-zy9fj+8r36!t+(y1nn$&12rm&*!h'
+
+DEBUG = False
+
+ALLOWED_HOSTS = [
+    'localhost',
+    '127.0.0.1',
+    '[::1]',
+    'testserver',
+    'www.OlesyaChursina.pythonanywhere.com',
+    'OlesyaChursina.pythonanywhere.com',
+]
+
+INSTALLED_APPS = [
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'posts.apps.PostsConfig',
+    'users.apps.UsersConfig',
+    'core.apps.CoreConfig',
+    'about.apps.AboutConfig',
+    'api.apps.ApiConfig',
+    'sorl.thumbnail',
+]
+
+MIDDLEWARE = [
+    'core.metrics.MetricsMiddleware',
+    'core.profiling.ProfilerMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'core.query_budget.QueryBudgetMiddleware',
+    'core.db.replicas.ReplicaMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+ROOT_URLCONF = 'yatube.urls'
+
+TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [TEMPLATES_DIR],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+                'core.context_processors.year.year',
+            ],
+        },
+    },
+]
+
+# движок шаблонов лент (core.jinja): django или jinja2 (нужен пакет Jinja2)
+FEED_TEMPLATE_ENGINE = os.environ.get('YATUBE_FEED_TEMPLATES', 'django')
+JINJA2_TEMPLATES = {
+    'BACKEND': 'core.jinja.Jinja2',
+    'NAME': 'jinja2',
+    'DIRS': [os.path.join(BASE_DIR, 'jinja2')],
+    'APP_DIRS': False,
+    'OPTIONS': {
+        'environment': 'core.jinja.environment',
+        'context_processors': TEMPLATES[0]['OPTIONS']['context_processors'],
+    },
+}
+if FEED_TEMPLATE_ENGINE == 'jinja2':
+    TEMPLATES.append(JINJA2_TEMPLATES)
+
+WSGI_APPLICATION = 'yatube.wsgi.application'
+
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+    }
+}
+
+# PRAGMA для каждого нового соединения с SQLite (core.db.sqlite)
+SQLITE_PRAGMAS = {
+    # читатели не ждут писателя, запись не ждет fsync на каждый коммит
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    # сколько ждать блокировку записи, мс
+    'busy_timeout': 5000,
+    # кэш страниц 20 МБ (отрицательное значение - в КБ)
+    'cache_size': -20000,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+# чтение view с @replica_reads уходит в реплики, запись - в default
+DATABASE_ROUTERS = ['core.db.replicas.ReplicaRouter']
+# алиасы баз-реплик из DATABASES; пустой список - читать из default
+DATABASE_REPLICAS = []
+# столько секунд после записи пользователь читает из default
+REPLICA_STICKY_SECONDS = 10
+
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+
+LANGUAGE_CODE = 'ru'
+
+TIME_ZONE = 'UTC'
+
+USE_I18N = True
+
+USE_L10N = True
+
+USE_TZ = True
+
+
+STATIC_URL = '/static/'
+STATICFILES_DIRS = [os.path.join(BASE_DIR, "static")]
+
+LOGIN_URL = 'users:login'
+LOGIN_REDIRECT_URL = 'posts:index'
+# LOGOUT_REDIRECT_URL = 'posts:logout'
+
+EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+
+CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
+
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# общий для всех рабочих процессов кэш в файле SQLite
+CACHES = {
+    'default': {
+        'BACKEND': 'core.cache.sqlite.SQLiteCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache.sqlite3'),
+        'OPTIONS': {
+            'MAX_ENTRIES': 100000,
+            'MAX_SIZE': 256 * 1024 * 1024,
+        },
+    }
+}
+
+# миниатюры готовятся в фоне, пока шаблон выводит заглушку
+THUMBNAIL_BACKEND = 'posts.thumbnails.QueuedThumbnailBackend'
+# число потоков подготовки миниатюр; 0 - создавать во время запроса
+THUMBNAIL_WORKERS = 2
+
+# падать на превышении бюджета SQL-запросов view вместо записи в лог
+QUERY_BUDGET_STRICT = False
+
+# токен метрик /metrics/ (core.metrics) для заголовка
+# "Authorization: Bearer <токен>"; без него метрики видят только сотрудники
+METRICS_TOKEN = None
+
+# выборочное профилирование запросов (core.profiling)
+PROFILER_DIR = os.path.join(BASE_DIR, 'profiles')
+# профилировать в среднем один запрос из N; 0 - только по токену
+PROFILER_SAMPLE_RATE = 0
+# период снятия стеков, секунд
+PROFILER_INTERVAL = 0.005
+# сколько последних профилей хранить
+PROFILER_MAX_FILES = 200
+# срок действия токена профилирования, секунд
+PROFILER_TOKEN_MAX_AGE = 3600
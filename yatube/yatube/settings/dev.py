@@ -0,0 +1,28 @@
+"""
+Профиль разработки: отладка и debug toolbar.
+
+С YATUBE_LOCAL_REPLICA=1 чтение лент идет из второго файла SQLite.
+"""
+import os
+
+from .base import *  # noqa: F401,F403
+from .base import BASE_DIR, DATABASES, INSTALLED_APPS, MIDDLEWARE
+
+DEBUG = True
+
+INTERNAL_IPS = [
+    '127.0.0.1',
+]
+
+INSTALLED_APPS = INSTALLED_APPS + ['debug_toolbar']
+
+MIDDLEWARE = MIDDLEWARE + ['debug_toolbar.middleware.DebugToolbarMiddleware']
+
+# локальная реплика: второй файл SQLite, который догоняет основной
+# командой sync_replica
+if os.environ.get('YATUBE_LOCAL_REPLICA'):
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'db.replica.sqlite3'),
+    }
+    DATABASE_REPLICAS = ['replica']
@@ -0,0 +1,57 @@
+"""
+Боевой профиль.
+
+Секретный ключ берется из YATUBE_SECRET_KEY, токен метрик - из
+YATUBE_METRICS_TOKEN. Если задана POSTGRES_DB,
+используется PostgreSQL с пулом соединений, иначе SQLite
+с постоянными соединениями. Шаблоны кэшируются в памяти процесса.
+"""
+import os
+
+from .base import *  # noqa: F401,F403
+from .base import DATABASES, TEMPLATES
+
+DEBUG = False
+
+# шаблоны компилируются один раз на процесс и хранятся в памяти
+TEMPLATES = [{
+    **TEMPLATES[0],
+    'APP_DIRS': False,
+    'OPTIONS': {
+        **TEMPLATES[0]['OPTIONS'],
+        'debug': False,
+        'loaders': [(
+            'django.template.loaders.cached.Loader',
+            [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ],
+        )],
+    },
+}, *TEMPLATES[1:]]
+
+SECRET_KEY = os.environ['YATUBE_SECRET_KEY']
+
+# Prometheus передает его в authorization.credentials
+METRICS_TOKEN = os.environ.get('YATUBE_METRICS_TOKEN')
+
+if os.environ.get('POSTGRES_DB'):
+    DATABASES = {
+        'default': {
+            'ENGINE': 'core.db.backends.postgresql_pool',
+            'NAME': os.environ['POSTGRES_DB'],
+            'USER': os.environ.get('POSTGRES_USER', ''),
+            'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+            'HOST': os.environ.get('POSTGRES_HOST', ''),
+            'PORT': os.environ.get('POSTGRES_PORT', ''),
+            # соединение возвращается в пул в конце каждого запроса
+            'CONN_MAX_AGE': 0,
+            'OPTIONS': {
+                'pool_min': int(os.environ.get('POSTGRES_POOL_MIN', 2)),
+                'pool_max': int(os.environ.get('POSTGRES_POOL_MAX', 20)),
+            },
+        }
+    }
+else:
+    # соединение с SQLite живет между запросами рабочего процесса
+    DATABASES['default']['CONN_MAX_AGE'] = 60
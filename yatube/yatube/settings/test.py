@@ -0,0 +1,42 @@
+"""Профиль тестов: все в памяти процесса, без фоновых потоков."""
+import atexit
+import shutil
+import tempfile
+
+from .base import *  # noqa: F401,F403
+from .base import DATABASES
+
+# реплика в тестах - зеркало default; маршрутизация в нее включается
+# в тестах реплик через DATABASE_REPLICAS
+DATABASES = {
+    **DATABASES,
+    'replica': {
+        **DATABASES['default'],
+        'TEST': {'MIRROR': 'default'},
+    },
+}
+
+# файловый кэш общий с разработкой, тесты не должны его чистить
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# загрузки и миниатюры тестов не попадают в media репозитория
+MEDIA_ROOT = tempfile.mkdtemp(prefix='yatube-media-')
+atexit.register(shutil.rmtree, MEDIA_ROOT, True)
+
+# база тестов в памяти: WAL и mmap к ней неприменимы
+SQLITE_PRAGMAS = {}
+
+# миниатюры создаются во время запроса, как в обычном sorl-thumbnail
+THUMBNAIL_WORKERS = 0
+
+# быстрый хеш паролей для create_user в тестах
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.MD5PasswordHasher',
+]
+
+# превышение бюджета запросов роняет тест, а не пишется в лог
+QUERY_BUDGET_STRICT = True
@@ -5,6 +5,8 @@ from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 
+from core import views as core_views
+
 
 urlpatterns = [
     path('', include('posts.urls', namespace='posts')),
@@ -12,6 +14,9 @@ urlpatterns = [
     path('auth/', include('users.urls')),
     path('auth/', include('django.contrib.auth.urls')),
     path('about/', include('about.urls', namespace='about')),
+    path('api/v1/', include('api.urls', namespace='api')),
+    path('metrics/', core_views.metrics, name='metrics'),
+    path('profiling/', include('core.urls', namespace='core')),
 ]
 
 handler404 = 'core.views.page_not_found'